@@ -0,0 +1,62 @@
+"""Re-grade an archive of recorded answers
+
+    python batch_grade.py ANSWERS_DIR results.jsonl [--workers 4] [--concurrency 8] [--offline]
+
+ANSWERS_DIR is searched recursively for ``*.wav`` recordings and for
+``*.txt`` transcripts without a recording. Results are appended to a
+JSONL or CSV file (chosen by extension); re-running the same command
+resumes where the previous run stopped. ``--offline`` replaces Azure
+Speech with sidecar ``.txt`` transcripts and Azure OpenAI with a
+deterministic local scorer.
+"""
+from pathlib import Path
+import argparse
+import asyncio
+import logging
+
+from modules.batch_grader import BatchGrader, SpeechToTextTranscriber
+from modules.evaluation_cache import get_evaluation_cache
+from modules.local_services import LocalChatClient, SidecarTranscriber
+from modules.scoring import ScoringEngine
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Batch grade recorded IELTS answers")
+    parser.add_argument('input_dir', type=Path, help="Directory of WAV recordings or transcripts")
+    parser.add_argument('output', type=Path, help="Results file (.jsonl or .csv)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Processes for audio decoding (default: CPU count)")
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help="Concurrent transcription/scoring requests")
+    parser.add_argument('--offline', action='store_true',
+                        help="Use local stand-ins instead of the Azure services")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.offline:
+        transcriber = SidecarTranscriber()
+        # No remote quota to protect, so do not throttle the local scorer
+        scoring_engine = ScoringEngine(client=LocalChatClient(), requests_per_minute=100_000)
+    else:
+        from modules.speech_to_text import SpeechToText
+        transcriber = SpeechToTextTranscriber(SpeechToText())
+        # Re-grades reuse earlier evaluations; set EVALUATION_CACHE_DB to keep them across runs
+        scoring_engine = ScoringEngine(cache=get_evaluation_cache())
+
+    grader = BatchGrader(transcriber, scoring_engine,
+                         workers=args.workers, api_concurrency=args.concurrency)
+    stats = asyncio.run(grader.run(args.input_dir, args.output))
+    print(f"Graded {stats['graded']}, failed {stats['failed']}, "
+          f"skipped {stats['skipped']} already in {args.output}")
+    if scoring_engine.cache is not None:
+        cache_stats = scoring_engine.cache.stats()
+        print(f"Evaluation cache hit rate {cache_stats['hit_rate']:.0%}, "
+              f"saved {cache_stats['saved_seconds']:.0f}s of LLM time")
+
+
+if __name__ == "__main__":
+    main()
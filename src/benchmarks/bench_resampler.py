@@ -0,0 +1,79 @@
+"""Compare the polyphase resampler with the previous np.interp implementation
+
+Run from the ``src`` directory:
+
+    python -m benchmarks.bench_resampler
+"""
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from modules.resampler import StreamingResampler, resample_poly  # noqa: E402
+
+
+TARGET_SR = 16000
+CLIP_SECONDS = 60
+
+
+def legacy_resample(audio_data: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """The linear-interpolation resampler previously used by SpeechToText"""
+    return np.interp(
+        np.linspace(0, len(audio_data), int(len(audio_data) * target_sr / orig_sr)),
+        np.arange(len(audio_data)),
+        audio_data
+    )
+
+
+def streaming_resample(audio_data: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    resampler = StreamingResampler(orig_sr, target_sr)
+    blocks = [resampler.process(audio_data[start:start + 4096])
+              for start in range(0, len(audio_data), 4096)]
+    blocks.append(resampler.flush())
+    return np.concatenate(blocks)
+
+
+def tone(frequency: float, sample_rate: int, seconds: float) -> np.ndarray:
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    return 10000 * np.sin(2 * np.pi * frequency * t)
+
+
+def aliasing_db(resample, orig_sr: int) -> float:
+    """Energy left after resampling a tone above the target Nyquist, in dB"""
+    source = tone(0.7 * orig_sr / 2, orig_sr, 1.0)
+    output = resample(source, orig_sr, TARGET_SR)[200:-200]
+    return 10 * np.log10(np.mean(output ** 2) / np.mean(source ** 2))
+
+
+def passband_error_db(resample, orig_sr: int) -> float:
+    """Error against an ideal 1kHz tone at the target rate, in dB"""
+    output = resample(tone(1000, orig_sr, 1.0), orig_sr, TARGET_SR)
+    reference = tone(1000, TARGET_SR, len(output) / TARGET_SR)[:len(output)]
+    error = (output - reference)[200:-200]
+    return 10 * np.log10(np.mean(error ** 2) / np.mean(reference ** 2))
+
+
+def main():
+    implementations = {
+        'np.interp (legacy)': legacy_resample,
+        'polyphase': resample_poly,
+        'polyphase, 4096-sample blocks': streaming_resample,
+    }
+    rng = np.random.default_rng(0)
+
+    for orig_sr in (44100, 48000):
+        clip = rng.normal(0, 3000, orig_sr * CLIP_SECONDS)
+        print(f"\n{orig_sr} Hz -> {TARGET_SR} Hz, {CLIP_SECONDS}s clip")
+        print(f"{'implementation':32} {'time (ms)':>10} {'aliasing (dB)':>14} {'passband err (dB)':>18}")
+        for name, resample in implementations.items():
+            runs = timeit.repeat(lambda: resample(clip, orig_sr, TARGET_SR), number=1, repeat=5)
+            print(f"{name:32} {min(runs) * 1000:10.1f} "
+                  f"{aliasing_db(resample, orig_sr):14.1f} "
+                  f"{passband_error_db(resample, orig_sr):18.1f}")
+
+
+if __name__ == '__main__':
+    main()
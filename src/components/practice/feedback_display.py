@@ -3,24 +3,31 @@ import streamlit as st
 
 
 def render_feedback_modal(feedback_data):
-    """Display feedback in a modal dialog"""
+    """Display feedback in a modal dialog
+
+    Also renders partial feedback while an evaluation is streaming;
+    criteria that have not arrived yet show as pending.
+    """
     if not feedback_data:
         return
         
     with st.container():
         st.markdown("### Your Response Analysis")
+        if feedback_data.get('failed_criteria'):
+            st.warning("Some criteria could not be scored right now and show an estimate: "
+                       + ", ".join(feedback_data['failed_criteria']))
         
         cols = st.columns(4)
         metrics = {
-            "Fluency": feedback_data['scores']['fluency'],
-            "Vocabulary": feedback_data['scores']['lexical'],
-            "Grammar": feedback_data['scores']['grammar'],
-            "Pronunciation": feedback_data['scores']['pronunciation']
+            "Fluency": feedback_data['scores'].get('fluency'),
+            "Vocabulary": feedback_data['scores'].get('lexical'),
+            "Grammar": feedback_data['scores'].get('grammar'),
+            "Pronunciation": feedback_data['scores'].get('pronunciation')
         }
 
         for col, (category, score) in zip(cols, metrics.items()):
             with col:
-                st.metric(category, f"{score:.1f}/9.0")
+                st.metric(category, "…" if score is None else f"{score:.1f}/9.0")
 
         st.markdown("### Detailed Feedback")
         for category, details in feedback_data['feedback'].items():
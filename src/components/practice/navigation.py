@@ -18,6 +18,8 @@ async def render_navigation_buttons():
 
 async def _handle_end_session():
     """Handle end session button click"""
+    if 'practice_manager' in st.session_state:
+        st.session_state.practice_manager.end_session()
     st.session_state.practice_active = False
     st.session_state.show_feedback_modal = False
     st.session_state.conversation_history = []
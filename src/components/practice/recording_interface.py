@@ -1,7 +1,10 @@
 import streamlit as st
+import hashlib
 import logging
 from modules.practice_manager import PracticeModeManager
 from components.practice.chat_interface import update_conversation_history
+from components.practice.session_state import get_learner_id
+from components.practice.feedback_display import render_feedback_modal
 import asyncio
 
 logging.basicConfig(level=logging.INFO)
@@ -16,7 +19,7 @@ def init_recording_state():
             'recorded_audio': None
         }
     if 'practice_manager' not in st.session_state:
-        st.session_state.practice_manager = PracticeModeManager()
+        st.session_state.practice_manager = PracticeModeManager(get_learner_id())
 
 async def render_recording_interface():
     init_recording_state()
@@ -26,19 +29,32 @@ async def render_recording_interface():
                                key=f"audio_recorder_{st.session_state.current_turn}",
                                help="Click to start/stop recording")
     
-    if (audio_data is not None and 
-        not st.session_state.audio_state['processing'] and 
-        audio_data != st.session_state.audio_state['last_processed']):
-        
+    if audio_data is None or st.session_state.audio_state['processing']:
+        return
+
+    # Compare by content: reruns hand back a new object for the same recording
+    audio_digest = hashlib.sha256(audio_data.getvalue()).hexdigest()
+    if audio_digest != st.session_state.audio_state['last_processed']:
         st.session_state.audio_state['processing'] = True
-        st.session_state.audio_state['last_processed'] = audio_data
+        st.session_state.audio_state['last_processed'] = audio_digest
         await process_recorded_audio(audio_data)
 
 async def process_recorded_audio(audio_data):
     """Process recorded audio and update conversation"""
     try:
+        # Criteria appear here one by one while the evaluation streams in
+        feedback_placeholder = st.empty()
+        partial_feedback = {'scores': {}, 'feedback': {}}
+
+        def show_feedback(criterion, details):
+            partial_feedback['scores'][criterion] = details['score']
+            partial_feedback['feedback'][criterion] = details
+            with feedback_placeholder.container():
+                render_feedback_modal(partial_feedback)
+
         with st.spinner("Processing your response..."):
-            success, result = await st.session_state.practice_manager.handle_response(audio_data)
+            success, result = await st.session_state.practice_manager.handle_response(
+                audio_data, on_feedback=show_feedback)
 
         if success and result and 'transcription' in result:
             # Update conversation state
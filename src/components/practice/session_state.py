@@ -1,6 +1,33 @@
+import re
+import uuid
 import streamlit as st
+from modules.exam_session import ExamModeManager
 from modules.practice_manager import PracticeModeManager
 
+# Query parameter that keeps an anonymous learner's id in the page URL
+LEARNER_PARAM = 'learner'
+
+
+def get_learner_id() -> str:
+    """Identify the learner using this browser tab
+
+    Signed-in users are identified by their account. Anyone else gets a
+    random id kept in the URL, so a reload or reconnect finds their own
+    history and never someone else's.
+    """
+    if st.user.get('is_logged_in'):
+        return f"user:{st.user.get('sub') or st.user.get('email')}"
+    if 'learner_id' not in st.session_state:
+        learner = st.query_params.get(LEARNER_PARAM, '')
+        # Only accept ids this app could have issued, so they stay unguessable
+        if not re.fullmatch(r'[0-9a-f]{32}', learner):
+            learner = uuid.uuid4().hex
+        st.session_state.learner_id = learner
+    # Page switches drop query parameters, so put it back on every run
+    st.query_params[LEARNER_PARAM] = st.session_state.learner_id
+    return f"anon:{st.session_state.learner_id}"
+
+
 def init_session_state(mode: str):
     """Initialize session state based on mode"""
     if mode == 'practice':
@@ -11,7 +38,7 @@ def init_session_state(mode: str):
 def init_practice_state():
     """Initialize practice mode state"""
     if 'practice_manager' not in st.session_state:
-        st.session_state.practice_manager = PracticeModeManager()
+        st.session_state.practice_manager = PracticeModeManager(get_learner_id())
 
     practice_state = {
         'practice_active': False,
@@ -32,6 +59,9 @@ def init_practice_state():
 
 def init_test_state():
     """Initialize test mode state"""
+    if 'test_manager' not in st.session_state:
+        st.session_state.test_manager = ExamModeManager()
+
     test_state = {
         'test_active': False,
         'test_part': 1,
@@ -1,5 +1,6 @@
 import streamlit as st
 from components.practice.session_state import reset_turn_state
+from modules.question_pool import get_question_pool
 
 
 async def render_topic_selector():
@@ -56,6 +57,15 @@ async def render_topic_selector():
         },
     }
 
+    # Opening questions are generated in the background while the user chooses
+    get_question_pool().warm(topics)
+
+    # A session left by a reconnect or a restart can be picked up again
+    unfinished = st.session_state.practice_manager.resumable_session()
+    if unfinished and st.button(f"↩️ Resume your {unfinished['topic']} session",
+                                use_container_width=True):
+        await resume_practice_session(unfinished)
+
     cols = st.columns(3)
     for idx, (topic, info) in enumerate(topics.items()):
         with cols[idx % 3]:
@@ -87,3 +97,24 @@ async def start_practice_session(topic):
     else:
         st.error("Failed to get initial question")
     # st.rerun()
+
+
+async def resume_practice_session(session):
+    """Restore a stored session and continue with a new question"""
+    exchanges = st.session_state.practice_manager.resume_session(session)
+    st.session_state.practice_active = True
+    st.session_state.current_topic = session['topic']
+    st.session_state.conversation_history = [
+        {'turn': turn, 'question': exchange['question'], 'response': exchange['response'],
+         'feedback': exchange['evaluation']}
+        for turn, exchange in enumerate(exchanges)
+    ]
+    st.session_state.current_turn = len(exchanges)
+    reset_turn_state()
+
+    success, question = await st.session_state.practice_manager.get_next_question()
+    if success:
+        st.session_state.current_question = question
+        st.rerun()
+    else:
+        st.error("Failed to get the next question")
@@ -1,35 +1,89 @@
 import streamlit as st
+from components.practice.feedback_display import render_feedback_modal
 
 
-def _render_test_mode():
-    """Render the test mode interface"""
+def _render_timer():
+    """Show the time left in the current phase, from the server-side clock"""
+    minutes, seconds = divmod(int(st.session_state.test_manager.session.remaining()), 60)
+    st.write(f"Time remaining: {minutes}:{seconds:02d}")
 
-    st.header("Test Mode")
 
-    # Instructions
-    st.info("""
-    The IELTS Speaking Test consists of 3 parts:
-    1. Introduction and interview (4-5 minutes)
-    2. Individual long turn (3-4 minutes)
-    3. Two-way discussion (4-5 minutes)
-    """)
+async def _render_recorder(question: str):
+    """Record an answer to ``question`` and add it to the test"""
+    session = st.session_state.test_manager.session
+    answer_number = len(session.answers)
+    audio_data = st.audio_input("Click to record your answer",
+                                key=f"test_audio_{answer_number}",
+                                help="Click to start/stop recording")
+    if audio_data is None:
+        return
 
-    # Start test button
-    if st.button("Start Test"):
-        st.subheader("Part 1: Introduction and Interview")
+    with st.spinner("Saving your answer..."):
+        success, result = await st.session_state.test_manager.submit_answer(question, audio_data)
+    if success:
+        st.session_state.responses.append(result)
+        st.rerun()
+    else:
+        st.error(f"Could not record your answer: {result['error']}")
 
-        # Timer
-        st.write("Time remaining: 5:00")
 
-        # Question
-        st.write("First, let me ask you some questions about yourself.")
+async def render_part_one():
+    """Part 1: short interview questions"""
+    st.subheader("Part 1: Introduction and Interview")
+    _render_timer()
+    question = st.session_state.test_manager.session.current_question()
+    st.markdown(f"**{question}**")
+    await _render_recorder(question)
 
-        # Record button
-        st.button("🎤 Start Recording")
 
-        # Response area
-        st.empty()  # Placeholder for transcribed text
+async def render_part_two():
+    """Part 2: one minute of preparation, then up to two minutes on the cue card"""
+    session = st.session_state.test_manager.session
+    st.subheader("Part 2: Individual Long Turn")
+    _render_timer()
 
-        # Progress
-        st.progress(0.33)
-        st.caption("Part 1 of 3")
+    cue_card = session.script.cue_card
+    st.markdown(f"**{cue_card.task}**")
+    st.markdown("You should say:\n" + "\n".join(f"- {point}" for point in cue_card.points))
+
+    if session.phase == 'part2_prep':
+        st.info("You have one minute to prepare. You can make notes.")
+        if st.button("I'm ready to speak", type="primary"):
+            session.finish_preparation()
+            st.rerun()
+    else:
+        await _render_recorder(cue_card.task)
+
+
+async def render_part_three():
+    """Part 3: discussion questions linked to the cue card"""
+    st.subheader("Part 3: Two-way Discussion")
+    _render_timer()
+    question = st.session_state.test_manager.session.current_question()
+    st.markdown(f"**{question}**")
+    await _render_recorder(question)
+
+
+async def render_test_report():
+    """Score the whole test at once and show the band report"""
+    st.subheader("Test Complete")
+    with st.spinner("Scoring your test..."):
+        report = await st.session_state.test_manager.finish()
+    st.session_state.test_complete = True
+
+    if report.get('unanswered'):
+        st.warning(f"{report['unanswered']} answers had no recognizable speech.")
+    if report.get('unscored'):
+        st.warning(f"{report['unscored']} answers could not be scored and are left out "
+                   "of your bands.")
+    if report['overall_score'] is None:
+        st.error("None of your answers could be scored, so no band is reported.")
+        return
+
+    st.metric("Overall Band", f"{report['overall_score']:.1f}")
+    if report['parts']:
+        cols = st.columns(len(report['parts']))
+        for col, (part, part_report) in zip(cols, report['parts'].items()):
+            with col:
+                st.metric(f"Part {part}", f"{part_report['overall_score']:.1f}")
+    render_feedback_modal(report)
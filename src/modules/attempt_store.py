@@ -0,0 +1,261 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import atexit
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS sessions (
+           session_id TEXT PRIMARY KEY,
+           user_id TEXT NOT NULL,
+           mode TEXT NOT NULL,
+           topic TEXT,
+           started_at REAL NOT NULL,
+           ended_at REAL)""",
+    "CREATE INDEX IF NOT EXISTS sessions_user_time ON sessions (user_id, started_at)",
+    """CREATE TABLE IF NOT EXISTS attempts (
+           id INTEGER PRIMARY KEY,
+           user_id TEXT NOT NULL,
+           session_id TEXT NOT NULL,
+           topic TEXT,
+           question TEXT,
+           transcript TEXT NOT NULL,
+           evaluation TEXT,
+           audio_duration REAL NOT NULL,
+           created_at REAL NOT NULL)""",
+    "CREATE INDEX IF NOT EXISTS attempts_user_time ON attempts (user_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS attempts_user_topic_time ON attempts (user_id, topic, created_at)",
+    "CREATE INDEX IF NOT EXISTS attempts_session ON attempts (session_id, id)"
+]
+
+_STOP = object()
+
+
+def _json_default(value):
+    # numpy scalars from local measurements become plain numbers
+    return value.item() if hasattr(value, 'item') else str(value)
+
+
+@dataclass(frozen=True)
+class Attempt:
+    """One answered question, as stored"""
+    user_id: str
+    session_id: str
+    topic: Optional[str]
+    question: Optional[str]
+    transcript: str
+    evaluation: Optional[Dict]
+    audio_duration: float
+    created_at: float = field(default_factory=time.time)
+
+
+class AttemptStore:
+    """Append-only history of sessions and attempts in SQLite (WAL mode)
+
+    Writes are queued and committed by a background thread, up to
+    ``batch_size`` per transaction, so recording an attempt never waits
+    on the disk. Reads use one connection per thread and, thanks to WAL,
+    are not blocked by the writer. Queued writes become visible once
+    committed; call ``flush`` first when a read must see them.
+    """
+
+    def __init__(self, db_path: str, batch_size: int = 128, linger: float = 0.05):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.linger = linger
+        self.written = 0
+        self.batches = 0
+        self.logger = logging.getLogger(__name__)
+        self._queue: queue.Queue = queue.Queue()
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._local = threading.local()
+
+        db = self._connect()
+        # WAL is a property of the database file, so every later connection uses it
+        db.execute("PRAGMA journal_mode=WAL")
+        for statement in SCHEMA:
+            db.execute(statement)
+        db.close()
+
+        self._writer = threading.Thread(target=self._run, name="attempt-store", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.db_path, timeout=10.0, isolation_level=None)
+        # Durable at every checkpoint; a crash can only lose the last few batches
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _reader(self) -> sqlite3.Connection:
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = self._local.db = self._connect()
+        return db
+
+    def _enqueue(self, statement: str, parameters: Tuple) -> None:
+        with self._idle:
+            self._pending += 1
+        self._queue.put((statement, parameters))
+
+    def start_session(self, session_id: str, user_id: str, topic: Optional[str],
+                      mode: str = 'practice') -> None:
+        self._enqueue("INSERT OR IGNORE INTO sessions VALUES (?, ?, ?, ?, ?, NULL)",
+                      (session_id, user_id, mode, topic, time.time()))
+
+    def end_session(self, session_id: str) -> None:
+        self._enqueue("UPDATE sessions SET ended_at = ? WHERE session_id = ? AND ended_at IS NULL",
+                      (time.time(), session_id))
+
+    def record(self, attempt: Attempt) -> None:
+        """Queue ``attempt`` for writing; returns at once"""
+        evaluation = None
+        if attempt.evaluation is not None:
+            evaluation = json.dumps(attempt.evaluation, default=_json_default)
+        self._enqueue(
+            """INSERT INTO attempts (user_id, session_id, topic, question, transcript,
+                                     evaluation, audio_duration, created_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            (attempt.user_id, attempt.session_id, attempt.topic, attempt.question,
+             attempt.transcript, evaluation, attempt.audio_duration, attempt.created_at))
+
+    def _run(self) -> None:
+        db = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            # Wait briefly so writes arriving together share one commit
+            deadline = time.monotonic() + self.linger
+            while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            writes = [item for item in batch if item is not _STOP]
+            if writes:
+                self._write(db, writes)
+            if batch[-1] is _STOP:
+                db.close()
+                return
+
+    @staticmethod
+    def _commit(db: sqlite3.Connection, writes: List[Tuple[str, Tuple]]) -> None:
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            for statement, parameters in writes:
+                db.execute(statement, parameters)
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+
+    def _write(self, db: sqlite3.Connection, writes: List[Tuple[str, Tuple]]) -> None:
+        try:
+            self._commit(db, writes)
+            self.written += len(writes)
+            self.batches += 1
+        except sqlite3.Error as e:
+            if len(writes) == 1:
+                self.logger.warning(f"Dropped an attempt store write: {str(e)}")
+            else:
+                # One bad row must not cost the rest of the batch; retry each on its own
+                self.logger.warning(f"Attempt store batch failed, writing rows singly: {str(e)}")
+                for write in writes:
+                    try:
+                        self._commit(db, [write])
+                        self.written += 1
+                        self.batches += 1
+                    except sqlite3.Error as e:
+                        self.logger.warning(f"Dropped an attempt store write: {str(e)}")
+        finally:
+            with self._idle:
+                self._pending -= len(writes)
+                self._idle.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued write is committed; False on timeout"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def close(self) -> None:
+        self._queue.put(_STOP)
+        self._writer.join()
+
+    @staticmethod
+    def _to_attempt(row: Tuple) -> Attempt:
+        user_id, session_id, topic, question, transcript, evaluation, duration, created_at = row
+        return Attempt(user_id, session_id, topic, question, transcript,
+                       json.loads(evaluation) if evaluation is not None else None,
+                       duration, created_at)
+
+    def session_attempts(self, session_id: str, user_id: str) -> List[Attempt]:
+        """Attempts ``user_id`` made in one session, in the order they were made"""
+        rows = self._reader().execute(
+            """SELECT user_id, session_id, topic, question, transcript, evaluation,
+                      audio_duration, created_at
+               FROM attempts WHERE session_id = ? AND user_id = ? ORDER BY id""",
+            (session_id, user_id)).fetchall()
+        return [self._to_attempt(row) for row in rows]
+
+    def history(self, user_id: str, topic: Optional[str] = None, since: float = 0.0,
+                limit: int = 100) -> List[Attempt]:
+        """A learner's most recent attempts, newest first"""
+        statement = """SELECT user_id, session_id, topic, question, transcript, evaluation,
+                              audio_duration, created_at
+                       FROM attempts WHERE user_id = ? AND created_at >= ?"""
+        parameters: Tuple = (user_id, since)
+        if topic is not None:
+            statement += " AND topic = ?"
+            parameters += (topic,)
+        statement += " ORDER BY created_at DESC LIMIT ?"
+        rows = self._reader().execute(statement, parameters + (limit,)).fetchall()
+        return [self._to_attempt(row) for row in rows]
+
+    def open_session(self, user_id: str, mode: str = 'practice') -> Optional[Dict]:
+        """The learner's latest session that was never ended, if any"""
+        row = self._reader().execute(
+            """SELECT session_id, topic, started_at FROM sessions
+               WHERE user_id = ? AND mode = ? AND ended_at IS NULL
+               ORDER BY started_at DESC LIMIT 1""", (user_id, mode)).fetchone()
+        if row is None:
+            return None
+        return {'session_id': row[0], 'topic': row[1], 'started_at': row[2]}
+
+    def stats(self) -> Dict:
+        with self._idle:
+            pending = self._pending
+        return {
+            'written': self.written,
+            'batches': self.batches,
+            'pending': pending,
+            'average_batch': self.written / self.batches if self.batches else 0.0
+        }
+
+
+_shared_store: Optional[AttemptStore] = None
+_shared_lock = threading.Lock()
+
+
+def get_attempt_store() -> Optional[AttemptStore]:
+    """Process-wide attempt store, or None when persistence is off
+
+    Set ``ATTEMPT_STORE_DB`` to the SQLite file that keeps sessions and
+    attempts across reconnects and restarts.
+    """
+    global _shared_store
+    with _shared_lock:
+        db_path = os.getenv('ATTEMPT_STORE_DB')
+        if _shared_store is None and db_path:
+            try:
+                _shared_store = AttemptStore(db_path)
+                # Commit whatever is still queued when the server shuts down
+                atexit.register(_shared_store.close)
+            except sqlite3.Error as e:
+                logging.getLogger(__name__).warning(
+                    f"Attempt store unavailable, history is not kept: {str(e)}")
+        return _shared_store
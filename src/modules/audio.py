@@ -0,0 +1,234 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Tuple
+import io
+import struct
+import wave
+import numpy as np
+from .resampler import StreamingResampler, resample_poly, to_int16
+
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+@dataclass(frozen=True)
+class DecodedAudio:
+    """Decoded 16-bit PCM audio shared across the response pipeline
+
+    ``samples`` is an int16 array of shape ``(frames, channels)``. When
+    produced by ``decode_audio`` it is a read-only view over the uploaded
+    bytes, so handing the object around never copies the audio.
+    """
+    samples: np.ndarray
+    sample_rate: int
+
+    @property
+    def channels(self) -> int:
+        return self.samples.shape[1]
+
+    @property
+    def frames(self) -> int:
+        return self.samples.shape[0]
+
+    @property
+    def duration(self) -> float:
+        """Length of the recording in seconds"""
+        return self.frames / float(self.sample_rate)
+
+    @property
+    def pcm(self) -> memoryview:
+        """Interleaved little-endian PCM bytes without a WAV header"""
+        return memoryview(np.ascontiguousarray(self.samples)).cast('B')
+
+    def to_mono(self) -> 'DecodedAudio':
+        """Average all channels into one"""
+        if self.channels == 1:
+            return self
+        mono = self.samples.mean(axis=1, dtype=np.float32)
+        return DecodedAudio(to_int16(mono)[:, np.newaxis], self.sample_rate)
+
+    def resample(self, target_sr: int) -> 'DecodedAudio':
+        """Resample a mono recording to ``target_sr``"""
+        if self.sample_rate == target_sr:
+            return self
+        resampled = resample_poly(self.to_mono().samples[:, 0], self.sample_rate, target_sr)
+        return DecodedAudio(to_int16(resampled)[:, np.newaxis], target_sr)
+
+    def to_wav_bytes(self) -> bytes:
+        """Encode as a WAV file"""
+        output = io.BytesIO()
+        with wave.open(output, 'wb') as out_wav:
+            out_wav.setnchannels(self.channels)
+            out_wav.setsampwidth(2)
+            out_wav.setframerate(self.sample_rate)
+            out_wav.writeframes(self.pcm)
+        return output.getvalue()
+
+
+def decode_audio(audio_file) -> DecodedAudio:
+    """Decode a WAV upload in a single pass
+
+    Accepts a file-like object, raw WAV bytes or an already decoded
+    ``DecodedAudio``. The returned samples view the original buffer.
+    """
+    if isinstance(audio_file, DecodedAudio):
+        return audio_file
+
+    if isinstance(audio_file, (bytes, bytearray, memoryview)):
+        data = audio_file
+    elif hasattr(audio_file, 'getvalue'):
+        # BytesIO (and Streamlit's UploadedFile) hand back their buffer without copying
+        data = audio_file.getvalue()
+    else:
+        data = audio_file.read()
+
+    channels, sample_rate, offset, size = _parse_wav_header(memoryview(data))
+    frame_count = size // (2 * channels)
+    samples = np.frombuffer(data, dtype='<i2', count=frame_count * channels, offset=offset)
+    return DecodedAudio(samples.reshape(frame_count, channels), sample_rate)
+
+
+def _parse_wav_header(view: memoryview):
+    """Return ``(channels, sample_rate, data_offset, data_size)`` of a 16-bit PCM WAV"""
+    stream = _ViewReader(view)
+    channels, sample_rate, size = read_wav_header(stream)
+    offset = stream.position
+    # Streaming recorders sometimes leave the size as a placeholder
+    return channels, sample_rate, offset, min(size, len(view) - offset)
+
+
+class _ViewReader:
+    """Minimal file-like reader over a memoryview; BytesIO would copy the buffer"""
+
+    def __init__(self, view: memoryview):
+        self.view = view
+        self.position = 0
+
+    def read(self, size: int) -> bytes:
+        data = bytes(self.view[self.position:self.position + size])
+        self.position += len(data)
+        return data
+
+
+def read_wav_header(stream) -> Tuple[int, int, int]:
+    """Read a 16-bit PCM WAV header, leaving ``stream`` at the first sample
+
+    Returns ``(channels, sample_rate, data_size)``; the size may be a
+    placeholder larger than the real data for recordings still being written.
+    """
+    riff = _read_exactly(stream, 12)
+    if len(riff) < 12 or riff[0:4] != b'RIFF' or riff[8:12] != b'WAVE':
+        raise ValueError("Audio is not a WAV file")
+
+    fmt = None
+    while True:
+        header = _read_exactly(stream, 8)
+        if len(header) < 8:
+            raise ValueError("WAV file has no data chunk")
+        chunk_id, chunk_size = header[0:4], int.from_bytes(header[4:8], 'little')
+
+        if chunk_id == b'data':
+            if fmt is None:
+                raise ValueError("WAV data chunk precedes its format chunk")
+            audio_format, channels, sample_rate, _, _, bits = fmt
+            if audio_format not in (WAVE_FORMAT_PCM, WAVE_FORMAT_EXTENSIBLE) or bits != 16:
+                raise ValueError(f"Unsupported WAV encoding: format {audio_format}, {bits}-bit")
+            return channels, sample_rate, chunk_size
+
+        body = _read_exactly(stream, chunk_size + (chunk_size & 1))
+        if chunk_id == b'fmt ':
+            fmt = struct.unpack_from('<HHIIHH', body)
+
+
+def _read_exactly(stream, size: int) -> bytes:
+    """Read ``size`` bytes, retrying short reads until end of stream"""
+    data = stream.read(size)
+    while len(data) < size:
+        more = stream.read(size - len(data))
+        if not more:
+            break
+        data += more
+    return data
+
+
+def iter_converted_blocks(audio_file, target_sr: int,
+                          block_frames: int = 16384) -> Iterator[np.ndarray]:
+    """Decode, downmix and resample a WAV file one block of frames at a time
+
+    Peak memory is set by ``block_frames`` and the resampler history, not by
+    the clip length. Joined together the int16 blocks are the same samples as
+    ``decode_audio(audio_file).to_mono().resample(target_sr)``.
+    """
+    if isinstance(audio_file, DecodedAudio):
+        yield from _convert_blocks(
+            (audio_file.samples[start:start + block_frames]
+             for start in range(0, audio_file.frames, block_frames)),
+            audio_file.sample_rate, target_sr)
+        return
+
+    if isinstance(audio_file, (str, Path)):
+        with open(audio_file, 'rb') as stream:
+            yield from iter_converted_blocks(stream, target_sr, block_frames)
+        return
+
+    stream = io.BytesIO(audio_file) if isinstance(audio_file, (bytes, bytearray)) else audio_file
+    if hasattr(stream, 'seek'):
+        stream.seek(0)
+    channels, sample_rate, remaining = read_wav_header(stream)
+    yield from _convert_blocks(_read_blocks(stream, channels, remaining, block_frames),
+                               sample_rate, target_sr)
+
+
+def _read_blocks(stream, channels: int, remaining: int, block_frames: int) -> Iterator[np.ndarray]:
+    """Yield ``(frames, channels)`` int16 blocks read from the data chunk"""
+    frame_bytes = 2 * channels
+    leftover = b''
+    while remaining > 0:
+        data = stream.read(min(block_frames * frame_bytes, remaining))
+        if not data:
+            break
+        remaining -= len(data)
+        data = leftover + data
+        usable = len(data) - len(data) % frame_bytes
+        leftover = data[usable:]
+        if usable:
+            yield np.frombuffer(data, dtype='<i2', count=usable // 2).reshape(-1, channels)
+
+
+def _convert_blocks(blocks: Iterator[np.ndarray], sample_rate: int,
+                    target_sr: int) -> Iterator[np.ndarray]:
+    resampler = StreamingResampler(sample_rate, target_sr) if sample_rate != target_sr else None
+    for block in blocks:
+        mono = DecodedAudio(block, sample_rate).to_mono().samples[:, 0]
+        if resampler is None:
+            yield mono
+            continue
+        output = resampler.process(mono)
+        if len(output):
+            yield to_int16(output)
+    if resampler is not None:
+        tail = resampler.flush()
+        if len(tail):
+            yield to_int16(tail)
+
+
+def frame_rms(samples: np.ndarray, frame_length: int) -> np.ndarray:
+    """Root-mean-square energy of consecutive non-overlapping frames
+
+    A trailing partial frame is dropped. Works on a reshaped view, so the
+    only allocation is the per-frame result.
+    """
+    samples = samples.reshape(-1)
+    frame_count = len(samples) // frame_length
+    frames = samples[:frame_count * frame_length].reshape(frame_count, frame_length)
+    return np.sqrt(np.einsum('ij,ij->i', frames, frames, dtype=np.float64) / frame_length)
+
+
+def zero_crossing_rate(samples: np.ndarray, frame_length: int) -> np.ndarray:
+    """Fraction of sign changes within each non-overlapping frame"""
+    samples = samples.reshape(-1)
+    frame_count = len(samples) // frame_length
+    frames = samples[:frame_count * frame_length].reshape(frame_count, frame_length)
+    signs = np.signbit(frames)
+    return np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frame_length - 1)
@@ -0,0 +1,39 @@
+from typing import Awaitable, Optional
+import asyncio
+import concurrent.futures
+import threading
+
+
+class BackgroundLoop:
+    """An event loop running in a daemon thread
+
+    Streamlit finishes each script run's ``asyncio.run`` before the next
+    interaction, cancelling anything still pending on it. Work that must
+    outlive a rerun, such as speculative requests, is submitted here.
+    """
+
+    def __init__(self, name: str = 'background-loop'):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, coroutine: Awaitable) -> concurrent.futures.Future:
+        """Schedule ``coroutine`` on the background loop; safe to call from any thread"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+
+
+_shared_loop: Optional[BackgroundLoop] = None
+_shared_lock = threading.Lock()
+
+
+def get_background_loop() -> BackgroundLoop:
+    """Process-wide background loop"""
+    global _shared_loop
+    with _shared_lock:
+        if _shared_loop is None:
+            _shared_loop = BackgroundLoop()
+        return _shared_loop
@@ -0,0 +1,208 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+import asyncio
+import csv
+import json
+import logging
+import numpy as np
+from .audio import DecodedAudio, decode_audio
+from .fluency import FluencyFeatureExtractor
+from .scoring import ScoringEngine
+from .speech_to_text import SPEECH_SAMPLE_RATE
+from .vad import TimingMap, VoiceActivityDetector
+
+
+# Typical IELTS speaking pace, used when a transcript has no recording
+ESTIMATED_WORDS_PER_MINUTE = 150
+CSV_FIELDS = ['id', 'transcript', 'audio_duration', 'overall_score',
+              'fluency', 'lexical', 'grammar', 'pronunciation']
+
+
+def discover_items(input_dir: Path) -> List[Path]:
+    """Recordings (``*.wav``) plus transcripts that have no recording (``*.txt``)"""
+    recordings = sorted(input_dir.rglob('*.wav'))
+    stems = {path.with_suffix('') for path in recordings}
+    transcripts = [path for path in sorted(input_dir.rglob('*.txt'))
+                   if path.with_suffix('') not in stems]
+    return sorted(recordings + transcripts)
+
+
+def prepare_recording(path: str) -> Dict:
+    """CPU stage, run in a worker process: decode, resample, trim and measure
+
+    Returns only small, picklable values; the trimmed PCM is what goes to STT.
+    """
+    audio = decode_audio(Path(path).read_bytes()).to_mono().resample(SPEECH_SAMPLE_RATE)
+    speech_audio, timing = VoiceActivityDetector().trim(audio)
+    return {
+        'pcm': speech_audio.samples.tobytes(),
+        'timing': timing,
+        'audio_duration': audio.duration,
+        # Word count is unknown until STT finishes; the rate is fixed up later
+        'fluency': FluencyFeatureExtractor().extract(audio, '')
+    }
+
+
+class SpeechToTextTranscriber:
+    """Adapts ``SpeechToText`` to the batch transcriber interface"""
+
+    def __init__(self, speech_to_text):
+        self.speech_to_text = speech_to_text
+
+    async def transcribe(self, path: Path, audio: DecodedAudio,
+                         timing: TimingMap) -> Tuple[bool, str]:
+        segments = [segment.text async for segment
+                    in self.speech_to_text.transcribe_stream(audio, timing)
+                    if segment.is_final]
+        return (True, " ".join(segments)) if segments else (False, "No speech recognized")
+
+
+class ResultWriter:
+    """Appends one result per line to a JSONL or CSV file and remembers what is done"""
+
+    def __init__(self, output_path: Path):
+        self.output_path = output_path
+        self.is_csv = output_path.suffix.lower() == '.csv'
+        self.logger = logging.getLogger(__name__)
+
+    def completed_ids(self) -> Set[str]:
+        """Ids already written by a previous run, used to resume"""
+        if not self.output_path.exists():
+            return set()
+
+        with open(self.output_path, newline='') as output_file:
+            if self.is_csv:
+                return {row['id'] for row in csv.DictReader(output_file) if row.get('id')}
+
+            done = set()
+            for line in output_file:
+                try:
+                    done.add(json.loads(line)['id'])
+                except (ValueError, KeyError):
+                    # A run killed mid-write can leave a truncated last line
+                    self.logger.warning("Skipping unreadable line in results file")
+            return done
+
+    def __enter__(self):
+        write_header = self.is_csv and (not self.output_path.exists()
+                                        or self.output_path.stat().st_size == 0)
+        ends_mid_line = self._ends_mid_line()
+        self._file = open(self.output_path, 'a', newline='')
+        if ends_mid_line:
+            # Terminate a truncated line so the next result starts cleanly
+            self._file.write("\n")
+        if self.is_csv:
+            self._csv = csv.DictWriter(self._file, fieldnames=CSV_FIELDS, extrasaction='ignore')
+            if write_header:
+                self._csv.writeheader()
+        return self
+
+    def _ends_mid_line(self) -> bool:
+        if not self.output_path.exists() or self.output_path.stat().st_size == 0:
+            return False
+        with open(self.output_path, 'rb') as output_file:
+            output_file.seek(-1, 2)
+            return output_file.read(1) != b"\n"
+
+    def __exit__(self, *exc_info):
+        self._file.close()
+
+    def write(self, result: Dict) -> None:
+        if self.is_csv:
+            row = dict(result, **result['evaluation']['scores'])
+            row['overall_score'] = result['evaluation']['overall_score']
+            self._csv.writerow(row)
+        else:
+            self._file.write(json.dumps(result) + "\n")
+        # Flush every result so a crash loses at most the answer in flight
+        self._file.flush()
+
+
+class BatchGrader:
+    """Grades an archive of answers with parallel CPU and API stages
+
+    Decoding, resampling, silence trimming and acoustic features run in a
+    process pool; transcription and scoring run concurrently on the event
+    loop, bounded by ``api_concurrency``. Results are written as they
+    complete, and answers already present in the output are skipped.
+    """
+
+    def __init__(self, transcriber, scoring_engine: ScoringEngine,
+                 workers: Optional[int] = None, api_concurrency: int = 8):
+        self.transcriber = transcriber
+        self.scoring_engine = scoring_engine
+        self.workers = workers
+        self.api_concurrency = api_concurrency
+        self.logger = logging.getLogger(__name__)
+
+    async def run(self, input_dir: Path, output_path: Path) -> Dict[str, int]:
+        writer = ResultWriter(output_path)
+        done = writer.completed_ids()
+        items = [path for path in discover_items(input_dir)
+                 if self._item_id(input_dir, path) not in done]
+        stats = {'skipped': len(done), 'graded': 0, 'failed': 0}
+        self.logger.info(f"{len(items)} answers to grade, {len(done)} already done")
+
+        api_slots = asyncio.Semaphore(self.api_concurrency)
+        # Bound prepared-but-ungraded audio held in memory
+        in_flight = asyncio.Semaphore(2 * self.api_concurrency)
+
+        with ProcessPoolExecutor(max_workers=self.workers) as process_pool, writer:
+            async def grade(path: Path):
+                async with in_flight:
+                    item_id = self._item_id(input_dir, path)
+                    try:
+                        result = await self._grade_item(item_id, path, process_pool, api_slots)
+                    except Exception as e:
+                        self.logger.error(f"Failed to grade {item_id}: {str(e)}")
+                        result = None
+                    if result is None:
+                        stats['failed'] += 1
+                        return
+                    writer.write(result)
+                    stats['graded'] += 1
+
+            await asyncio.gather(*(grade(path) for path in items))
+        return stats
+
+    async def _grade_item(self, item_id: str, path: Path, process_pool,
+                          api_slots: asyncio.Semaphore) -> Optional[Dict]:
+        loop = asyncio.get_running_loop()
+        prepared = None
+        if path.suffix.lower() == '.wav':
+            prepared = await loop.run_in_executor(process_pool, prepare_recording, str(path))
+
+        async with api_slots:
+            if prepared is None:
+                text = path.read_text().strip()
+                if not text:
+                    return None
+                audio_duration = len(text.split()) / ESTIMATED_WORDS_PER_MINUTE * 60
+                fluency = None
+            else:
+                speech_audio = DecodedAudio(
+                    np.frombuffer(prepared['pcm'], dtype=np.int16)[:, np.newaxis],
+                    SPEECH_SAMPLE_RATE)
+                success, text = await self.transcriber.transcribe(
+                    path, speech_audio, prepared['timing'])
+                if not success:
+                    self.logger.warning(f"Transcription failed for {item_id}: {text}")
+                    return None
+                audio_duration = prepared['audio_duration']
+                fluency = prepared['fluency'].with_word_count(len(text.split()))
+
+            evaluation = await self.scoring_engine.evaluate_response(
+                text, audio_duration, fluency_features=fluency)
+
+        return {
+            'id': item_id,
+            'transcript': text,
+            'audio_duration': round(audio_duration, 2),
+            'duration_estimated': prepared is None,
+            'evaluation': evaluation
+        }
+
+    @staticmethod
+    def _item_id(input_dir: Path, path: Path) -> str:
+        return path.relative_to(input_dir).as_posix()
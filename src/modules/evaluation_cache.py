@@ -0,0 +1,166 @@
+from typing import Dict, Optional
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from .cache import LRUCache
+
+
+def normalize_transcript(transcript: str) -> str:
+    """Lowercase and strip punctuation so trivially different transcripts match"""
+    return " ".join(re.findall(r"[a-z0-9']+", transcript.lower()))
+
+
+class EvaluationCache:
+    """Evaluation results keyed by transcript, duration bucket and scoring settings
+
+    The in-memory LRU tier is always on; when ``db_path`` is set, entries are
+    also stored in SQLite and expire after ``ttl_seconds``. Each entry
+    remembers how long the LLM took to produce it, so hits report the
+    latency they saved.
+    """
+
+    def __init__(self, max_entries: int = 512, db_path: Optional[str] = None,
+                 ttl_seconds: float = 7 * 24 * 3600, duration_bucket_seconds: float = 5.0):
+        self.memory = LRUCache(max_entries)
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.duration_bucket_seconds = duration_bucket_seconds
+        self.disk_hits = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+        self._db = self._open_db(db_path) if db_path else None
+
+    def _open_db(self, db_path: str) -> Optional[sqlite3.Connection]:
+        try:
+            db = sqlite3.connect(db_path, check_same_thread=False)
+            db.execute("""CREATE TABLE IF NOT EXISTS evaluations (
+                              key TEXT PRIMARY KEY,
+                              settings TEXT NOT NULL,
+                              value TEXT NOT NULL,
+                              latency REAL NOT NULL,
+                              created_at REAL NOT NULL)""")
+            db.execute("CREATE INDEX IF NOT EXISTS evaluations_settings ON evaluations (settings)")
+            db.commit()
+            return db
+        except sqlite3.Error as e:
+            self.logger.warning(f"Evaluation cache database unavailable, memory only: {str(e)}")
+            return None
+
+    def make_key(self, transcript: str, audio_duration: float, settings: str,
+                 extra: str = '') -> str:
+        """Key on the normalized transcript, the duration bucket and a settings fingerprint
+
+        ``extra`` covers any other prompt input, such as a locally computed band.
+        """
+        bucket = int(audio_duration // self.duration_bucket_seconds)
+        digest = hashlib.sha256()
+        digest.update(f"{settings}:{bucket}:{extra}:".encode())
+        digest.update(normalize_transcript(transcript).encode())
+        return f"{settings}:{digest.hexdigest()}"
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a fresh copy of the cached evaluation, or None"""
+        entry = self.memory.get(key)
+        if entry is None and self._db is not None:
+            entry = self._load(key)
+            if entry is not None:
+                self.disk_hits += 1
+                self.memory.put(key, entry)
+        if entry is None:
+            return None
+
+        value, latency, created_at = entry
+        if time.time() - created_at > self.ttl_seconds:
+            self.invalidate(key)
+            return None
+        self.saved_seconds += latency
+        # Stored as JSON so callers can freely modify what they get back
+        return json.loads(value)
+
+    def _load(self, key: str):
+        try:
+            with self._lock:
+                return self._db.execute(
+                    "SELECT value, latency, created_at FROM evaluations "
+                    "WHERE key = ? AND created_at >= ?",
+                    (key, time.time() - self.ttl_seconds)).fetchone()
+        except sqlite3.Error as e:
+            self.logger.warning(f"Failed to read evaluation cache entry: {str(e)}")
+            return None
+
+    def put(self, key: str, evaluation: Dict, latency: float) -> None:
+        entry = (json.dumps(evaluation), latency, time.time())
+        self.memory.put(key, entry)
+        if self._db is None:
+            return
+        try:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO evaluations VALUES (?, ?, ?, ?, ?)",
+                    (key, key.split(':', 1)[0]) + entry)
+                self._db.commit()
+        except sqlite3.Error as e:
+            self.logger.warning(f"Failed to persist evaluation cache entry: {str(e)}")
+
+    def invalidate(self, key: str) -> None:
+        self.memory.pop(key)
+        self._execute("DELETE FROM evaluations WHERE key = ?", (key,))
+
+    def invalidate_settings(self, settings: str) -> None:
+        """Drop every entry produced with one prompt and model configuration"""
+        for key in self.memory.keys():
+            if key.startswith(f"{settings}:"):
+                self.memory.pop(key)
+        self._execute("DELETE FROM evaluations WHERE settings = ?", (settings,))
+
+    def purge_expired(self) -> None:
+        self._execute("DELETE FROM evaluations WHERE created_at < ?",
+                      (time.time() - self.ttl_seconds,))
+
+    def clear(self) -> None:
+        self.memory.clear()
+        self._execute("DELETE FROM evaluations", ())
+
+    def _execute(self, statement: str, parameters: tuple) -> None:
+        if self._db is None:
+            return
+        try:
+            with self._lock:
+                self._db.execute(statement, parameters)
+                self._db.commit()
+        except sqlite3.Error as e:
+            self.logger.warning(f"Evaluation cache update failed: {str(e)}")
+
+    def stats(self) -> dict:
+        stats = self.memory.stats()
+        # A memory miss served from disk is still a hit overall
+        stats['disk_hits'] = self.disk_hits
+        stats['misses'] -= self.disk_hits
+        lookups = stats['hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        stats['saved_seconds'] = round(self.saved_seconds, 3)
+        return stats
+
+
+_shared_cache: Optional[EvaluationCache] = None
+
+
+def get_evaluation_cache() -> EvaluationCache:
+    """Process-wide cache shared by every session
+
+    Set ``EVALUATION_CACHE_DB`` to enable the SQLite tier.
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = EvaluationCache(
+            max_entries=int(os.getenv('EVALUATION_CACHE_SIZE', '512')),
+            db_path=os.getenv('EVALUATION_CACHE_DB'),
+            ttl_seconds=float(os.getenv('EVALUATION_CACHE_TTL', str(7 * 24 * 3600)))
+        )
+    return _shared_cache
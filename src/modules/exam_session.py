@@ -0,0 +1,202 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+import random
+import time
+from .audio import decode_audio
+from .question_generator import QuestionGenerator
+from .services import ServiceRegistry, get_services
+from .session_evaluator import SessionAnswer, SessionEvaluator
+from .speech_to_text import SpeechToText
+
+
+EXAM_TOPICS = ['Work', 'Education', 'Technology', 'Environment', 'Travel', 'Health',
+               'Culture', 'Food', 'Sports']
+
+# Timed phases of the test, in order, with their length in seconds
+PHASE_SECONDS = {
+    'part1': 300,
+    'part2_prep': 60,
+    'part2_talk': 120,
+    'part3': 300
+}
+PHASES = list(PHASE_SECONDS) + ['complete']
+PHASE_PARTS = {'part1': 1, 'part2_prep': 2, 'part2_talk': 2, 'part3': 3}
+
+
+@dataclass(frozen=True)
+class CueCard:
+    """The Part 2 task card"""
+    task: str
+    points: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class ExamScript:
+    """Every question of one Speaking test, generated before the test starts"""
+    topic: str
+    part_one: Tuple[str, ...]
+    cue_card: CueCard
+    part_three: Tuple[str, ...]
+
+    @classmethod
+    def from_reply(cls, topic: str, reply: Dict) -> 'ExamScript':
+        return cls(
+            topic=topic,
+            part_one=tuple(reply['part1']),
+            cue_card=CueCard(reply['cue_card']['task'], tuple(reply['cue_card']['points'])),
+            part_three=tuple(reply['part3'])
+        )
+
+    def questions(self, part: int) -> Tuple[str, ...]:
+        return {1: self.part_one, 2: (self.cue_card.task,), 3: self.part_three}[part]
+
+    def part_of(self, question: str) -> int:
+        for part in (1, 2, 3):
+            if question in self.questions(part):
+                return part
+        raise ValueError(f"Question is not part of this test: {question}")
+
+
+class ExamSession:
+    """Drives a test through its parts on the server's clock
+
+    Each phase ends when its time is up, even if the page is not
+    rerendered, or earlier once its last question is answered. Nothing
+    here waits on the LLM; answers are only scored at the end.
+    """
+
+    def __init__(self, script: ExamScript, clock: Callable[[], float] = time.time,
+                 phase_seconds: Optional[Dict[str, float]] = None):
+        self.script = script
+        self.clock = clock
+        self.phase_seconds = dict(PHASE_SECONDS, **(phase_seconds or {}))
+        self.answers: List[SessionAnswer] = []
+        self._phase_index = 0
+        self._phase_started_at = clock()
+        self._question_index = 0
+
+    def _advance_expired(self) -> None:
+        while PHASES[self._phase_index] != 'complete':
+            ends_at = self._phase_started_at + self.phase_seconds[PHASES[self._phase_index]]
+            if self.clock() < ends_at:
+                return
+            # The next phase starts when this one should have ended, not when it is noticed
+            self._next_phase(ends_at)
+
+    def _next_phase(self, started_at: Optional[float] = None) -> None:
+        self._phase_index += 1
+        self._phase_started_at = self.clock() if started_at is None else started_at
+        self._question_index = 0
+
+    @property
+    def phase(self) -> str:
+        self._advance_expired()
+        return PHASES[self._phase_index]
+
+    @property
+    def part(self) -> Optional[int]:
+        return PHASE_PARTS.get(self.phase)
+
+    @property
+    def complete(self) -> bool:
+        return self.phase == 'complete'
+
+    def remaining(self) -> float:
+        """Seconds left in the current phase"""
+        phase = self.phase
+        if phase == 'complete':
+            return 0.0
+        return max(0.0, self._phase_started_at + self.phase_seconds[phase] - self.clock())
+
+    def current_question(self) -> Optional[str]:
+        """The question the candidate should be answering now"""
+        part = self.part
+        if part is None:
+            return None
+        questions = self.script.questions(part)
+        return questions[min(self._question_index, len(questions) - 1)]
+
+    def finish_preparation(self) -> None:
+        """Start the Part 2 talk before the preparation minute is over"""
+        if self.phase == 'part2_prep':
+            self._next_phase()
+
+    def record_answer(self, question: str, transcript: str, audio_duration: float,
+                      fluency_features=None) -> None:
+        """Keep the answer to ``question``; answering the current question moves the test on
+
+        Answers that arrive after their phase timed out are still kept.
+        """
+        self.answers.append(SessionAnswer(self.script.part_of(question), question, transcript,
+                                          audio_duration, fluency_features))
+        phase = self.phase
+        if phase in ('part1', 'part2_talk', 'part3') and question == self.current_question():
+            self._question_index += 1
+            if self._question_index >= len(self.script.questions(PHASE_PARTS[phase])):
+                self._next_phase()
+
+    def progress(self) -> float:
+        return self._phase_index / (len(PHASES) - 1)
+
+
+class ExamModeManager:
+    """Runs Test Mode: script generation up front, recording during, scoring at the end"""
+
+    def __init__(self, question_generator: Optional[QuestionGenerator] = None,
+                 speech_to_text: Optional[SpeechToText] = None,
+                 session_evaluator: Optional[SessionEvaluator] = None,
+                 services: Optional[ServiceRegistry] = None):
+        # Services not passed in are shared with every other session and built on first use
+        self.services = services or get_services()
+        self._question_generator = question_generator
+        self._speech_to_text = speech_to_text
+        self._session_evaluator = session_evaluator
+        self.session: Optional[ExamSession] = None
+        self.report: Optional[Dict] = None
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def question_generator(self) -> QuestionGenerator:
+        return self._question_generator or self.services.question_generator
+
+    @property
+    def speech_to_text(self) -> SpeechToText:
+        return self._speech_to_text or self.services.speech_to_text
+
+    @property
+    def session_evaluator(self) -> SessionEvaluator:
+        return self._session_evaluator or self.services.session_evaluator
+
+    async def start_test(self, topic: Optional[str] = None) -> ExamSession:
+        """Generate the whole script, then start the clock"""
+        topic = topic or random.choice(EXAM_TOPICS)
+        reply = await self.question_generator.generate_test_script(topic)
+        self.session = ExamSession(ExamScript.from_reply(topic, reply))
+        self.report = None
+        return self.session
+
+    async def submit_answer(self, question: str, audio_file) -> Tuple[bool, Dict]:
+        """Transcribe a recorded answer and add it to the session"""
+        try:
+            audio = decode_audio(audio_file)
+            speech_audio, timing = self.speech_to_text.prepare_for_recognition(audio)
+            segments = [segment.text async for segment in
+                        self.speech_to_text.transcribe_stream(speech_audio, timing)
+                        if segment.is_final]
+            transcript = " ".join(segments)
+            features = None
+            if transcript:
+                features = self.session_evaluator.scoring_engine.fluency_extractor.extract(
+                    audio, transcript)
+            self.session.record_answer(question, transcript, audio.duration, features)
+            return True, {'transcription': transcript, 'audio_duration': audio.duration}
+        except Exception as e:
+            self.logger.error(f"Error recording test answer: {str(e)}")
+            return False, {"error": str(e)}
+
+    async def finish(self) -> Dict:
+        """Score every answer of the test in one batched pass"""
+        if self.report is None:
+            self.report = await self.session_evaluator.evaluate_test(self.session.answers)
+        return self.report
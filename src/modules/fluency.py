@@ -0,0 +1,76 @@
+from dataclasses import asdict, dataclass, replace
+from typing import Dict
+import numpy as np
+from .audio import DecodedAudio, frame_rms
+
+
+@dataclass(frozen=True)
+class FluencyFeatures:
+    """Acoustic fluency measurements of a single answer (times in seconds)"""
+    pause_count: int
+    mean_pause: float
+    max_pause: float
+    articulation_rate: float    # words per minute of actual speaking time
+    speech_to_silence: float    # speaking time divided by internal silence
+    speech_time: float
+    total_duration: float
+
+    @property
+    def pauses_per_minute(self) -> float:
+        if self.total_duration <= 0:
+            return 0.0
+        return self.pause_count / (self.total_duration / 60)
+
+    def with_word_count(self, words: int) -> 'FluencyFeatures':
+        """Recompute the articulation rate once the transcript is known"""
+        if self.speech_time <= 0:
+            return self
+        return replace(self, articulation_rate=words / (self.speech_time / 60))
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class FluencyFeatureExtractor:
+    """Derive pause and rate features from decoded PCM using framed RMS energy"""
+
+    def __init__(self, frame_ms: int = 20, threshold_db: float = 12.0,
+                 min_level_dbfs: float = -50.0, min_pause_ms: int = 250):
+        self.frame_ms = frame_ms
+        self.threshold_db = threshold_db
+        self.min_level_dbfs = min_level_dbfs
+        self.min_pause_ms = min_pause_ms
+
+    def extract(self, audio: DecodedAudio, transcript: str) -> FluencyFeatures:
+        """Measure pauses within the answer and the articulation rate"""
+        frame_length = max(1, audio.sample_rate * self.frame_ms // 1000)
+        frame_seconds = frame_length / audio.sample_rate
+        words = len(transcript.split())
+
+        level = 20 * np.log10(frame_rms(audio.to_mono().samples, frame_length) / 32768 + 1e-10)
+        if len(level) == 0:
+            return FluencyFeatures(0, 0.0, 0.0, 0.0, 0.0, 0.0, audio.duration)
+
+        threshold = max(np.percentile(level, 10) + self.threshold_db, self.min_level_dbfs)
+        speech = level > threshold
+        speaking = np.flatnonzero(speech)
+        if len(speaking) == 0:
+            return FluencyFeatures(0, 0.0, 0.0, 0.0, 0.0, 0.0, audio.duration)
+
+        # Only silence between the first and last spoken frame counts as pausing
+        speech = speech[speaking[0]:speaking[-1] + 1]
+        edges = np.flatnonzero(np.diff(np.concatenate(([1], speech.astype(np.int8), [1]))))
+        gaps = (edges[1::2] - edges[0::2]) * frame_seconds
+        pauses = gaps[gaps >= self.min_pause_ms / 1000]
+
+        speech_time = np.count_nonzero(speech) * frame_seconds
+        silence_time = max(len(speech) * frame_seconds - speech_time, frame_seconds)
+        return FluencyFeatures(
+            pause_count=len(pauses),
+            mean_pause=float(pauses.mean()) if len(pauses) else 0.0,
+            max_pause=float(pauses.max()) if len(pauses) else 0.0,
+            articulation_rate=words / (speech_time / 60),
+            speech_to_silence=speech_time / silence_time,
+            speech_time=speech_time,
+            total_duration=audio.duration
+        )
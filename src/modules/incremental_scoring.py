@@ -0,0 +1,69 @@
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+from .audio import DecodedAudio
+from .fluency import FluencyFeatures
+from .lexical_scorer import LexicalProfile
+from .scoring import ScoringEngine
+from .speech_to_text import TranscriptionSegment
+
+
+class IncrementalEvaluation:
+    """Running evaluation state of an answer that is still being transcribed
+
+    Acoustic fluency features are measured in a worker thread as soon as
+    the recording is available, and each final transcript segment is
+    lemmatized when it arrives. When the last segment is in, only the
+    LLM request and a cheap lexical summary remain, so turn latency
+    depends on the last segment rather than the length of the answer.
+    """
+
+    def __init__(self, scoring_engine: ScoringEngine, audio: Optional[DecodedAudio],
+                 audio_duration: float):
+        self.scoring_engine = scoring_engine
+        self.audio_duration = audio_duration
+        self.segments: List[str] = []
+        self.lemmas: List[str] = []
+        self._fluency_task = None
+        if audio is not None:
+            # Word count is not known yet; the rate is corrected in ``finish``
+            self._fluency_task = asyncio.ensure_future(asyncio.to_thread(
+                scoring_engine.fluency_extractor.extract, audio, ''))
+
+    def add_segment(self, segment: TranscriptionSegment) -> None:
+        """Fold a transcription segment into the running state; partial hypotheses are ignored"""
+        if not segment.is_final or not segment.text:
+            return
+        self.segments.append(segment.text)
+        self.lemmas.extend(self.scoring_engine.lexical_scorer.lemmatize(segment.text))
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.segments)
+
+    def snapshot(self) -> Dict:
+        """Local measurements of the answer so far, for live display"""
+        return {
+            'words': len(self.lemmas),
+            'lexical': self.scoring_engine.lexical_scorer.profile(self.lemmas).to_dict()
+        }
+
+    async def finish(self) -> Tuple[Optional[FluencyFeatures], LexicalProfile]:
+        """Complete the local measurements once the transcript is final"""
+        fluency_features = None
+        if self._fluency_task is not None:
+            fluency_features = (await self._fluency_task).with_word_count(len(self.text.split()))
+        return fluency_features, self.scoring_engine.lexical_scorer.profile(self.lemmas)
+
+    async def evaluate(self) -> Dict:
+        fluency_features, lexical_profile = await self.finish()
+        return await self.scoring_engine.evaluate_response(
+            self.text, self.audio_duration, fluency_features=fluency_features,
+            lexical_profile=lexical_profile)
+
+    async def stream(self) -> AsyncIterator[Tuple[str, Dict]]:
+        """Like ``ScoringEngine.stream_evaluation``, with the local work already done"""
+        fluency_features, lexical_profile = await self.finish()
+        async for item in self.scoring_engine.stream_evaluation(
+                self.text, self.audio_duration, fluency_features=fluency_features,
+                lexical_profile=lexical_profile):
+            yield item
@@ -0,0 +1,285 @@
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+import os
+import re
+import tempfile
+import numpy as np
+
+
+LEXICON_DIR = Path(__file__).resolve().parent.parent / 'data' / 'lexicon'
+MTLD_THRESHOLD = 0.72
+# Headword families in the full academic word list
+AWL_FAMILIES = 570
+# Sophistication (academic share of content words) needed for bands 9..5
+SOPHISTICATION_LIMITS = ((0.20, 9), (0.15, 8), (0.10, 7), (0.06, 6), (0.03, 5))
+
+# Skipped when pairing words into collocations ("make a decision" -> "make decision")
+SKIPPED_IN_COLLOCATIONS = {'a', 'an', 'the', 'my', 'your', 'his', 'her', 'its', 'our', 'their',
+                           'this', 'that', 'these', 'those', 'some', 'of', 'and', 'in', 'on'}
+FUNCTION_WORDS = SKIPPED_IN_COLLOCATIONS | {
+    'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'us', 'them', 'be', 'is', 'am',
+    'are', 'was', 'were', 'been', 'do', 'does', 'did', 'have', 'has', 'had', 'to', 'for', 'at',
+    'by', 'with', 'from', 'as', 'or', 'but', 'so', 'if', 'not', 'no', 'there', 'what', 'which',
+    'who', 'when', 'where', 'how', 'can', 'will', 'would', 'could', 'should', 'very', 'really',
+    'just', 'also', 'like', 'about', 'then', 'than', 'because', 'all', 'more', 'most'}
+IRREGULAR_FORMS = {
+    'was': 'be', 'were': 'be', 'is': 'be', 'are': 'be', 'been': 'be', 'am': 'be',
+    'had': 'have', 'has': 'have', 'did': 'do', 'done': 'do', 'does': 'do', 'went': 'go',
+    'gone': 'go', 'made': 'make', 'took': 'take', 'taken': 'take', 'gave': 'give',
+    'given': 'give', 'saw': 'see', 'seen': 'see', 'got': 'get', 'came': 'come', 'ate': 'eat',
+    'eaten': 'eat', 'bought': 'buy', 'thought': 'think', 'taught': 'teach', 'felt': 'feel',
+    'kept': 'keep', 'met': 'meet', 'paid': 'pay', 'spent': 'spend', 'caught': 'catch',
+    'children': 'child', 'men': 'man', 'women': 'woman', 'wrote': 'write', 'written': 'write',
+    'broke': 'break', 'broken': 'break', 'chose': 'choose', 'chosen': 'choose', 'found': 'find',
+    'grew': 'grow', 'grown': 'grow', 'knew': 'know', 'known': 'know', 'told': 'tell',
+    'said': 'say', 'left': 'leave', 'lost': 'lose', 'brought': 'bring', 'built': 'build',
+    'began': 'begin', 'begun': 'begin', 'became': 'become', 'held': 'hold', 'led': 'lead',
+    'ran': 'run', 'sat': 'sit', 'stood': 'stand', 'understood': 'understand', 'won': 'win',
+    'fell': 'fall', 'flew': 'fly', 'drove': 'drive', 'driven': 'drive', 'spoke': 'speak',
+    'spoken': 'speak', 'better': 'good', 'best': 'good', 'worse': 'bad', 'worst': 'bad'}
+
+
+def build_lexicon(source_dir: Path, output_dir: Path) -> None:
+    """Compile ``word_bands.tsv`` and ``collocations.tsv`` into sorted ``.npy`` arrays
+
+    Words are stored as a fixed-width byte-string array so lookups are a
+    binary search over a memory-mapped file.
+    """
+    entries = {}
+    for line in (source_dir / 'word_bands.tsv').read_text().splitlines():
+        if line and not line.startswith('#'):
+            word, band = line.split('\t')
+            entries[word] = int(band)
+    words = np.array(sorted(entries), dtype=bytes)
+    bands = np.array([entries[word.decode()] for word in words], dtype=np.uint8)
+
+    lexicon = Lexicon(words, bands, np.array([], dtype='S1'))
+    # Collocations are stored as lemmas so inflected forms in answers still match
+    pairs = {" ".join(lexicon.lemma(word) for word in line.split())
+             for line in (source_dir / 'collocations.tsv').read_text().splitlines()
+             if line and not line.startswith('#')}
+    collocations = np.array(sorted(pairs), dtype=bytes)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for name, array in (('words', words), ('bands', bands), ('collocations', collocations)):
+        # Write to a temporary file first so readers never map a partial array
+        fd, temp_path = tempfile.mkstemp(dir=output_dir, suffix='.npy.tmp')
+        with os.fdopen(fd, 'wb') as temp_file:
+            np.save(temp_file, array)
+        os.replace(temp_path, output_dir / f"{name}.npy")
+
+
+class Lexicon:
+    """Frequency bands and collocations backed by sorted numpy arrays
+
+    Band 1 words come from the first thousand most frequent words, band 2
+    from the second thousand and band 3 from the academic word list; 0
+    means off-list. The shipped ``word_bands.tsv`` holds selections of
+    about 580, 510 and 470 headwords, not the complete lists, so an
+    everyday word can be off-list and the academic share of an answer is
+    undercounted (see ``academic_coverage``).
+    """
+
+    def __init__(self, words: np.ndarray, bands: np.ndarray, collocations: np.ndarray):
+        self.words = words
+        self.bands = bands
+        self.collocations = collocations
+
+    @classmethod
+    def load(cls, directory: Path = LEXICON_DIR) -> 'Lexicon':
+        """Memory-map the compiled arrays, rebuilding them when the sources changed"""
+        sources = [directory / 'word_bands.tsv', directory / 'collocations.tsv']
+        compiled = [directory / f"{name}.npy" for name in ('words', 'bands', 'collocations')]
+        newest_source = max(path.stat().st_mtime for path in sources)
+        if not all(path.exists() and path.stat().st_mtime >= newest_source for path in compiled):
+            try:
+                build_lexicon(directory, directory)
+            except OSError as e:
+                logging.getLogger(__name__).warning(
+                    f"Cannot write compiled lexicon, building in a temporary directory: {str(e)}")
+                directory = Path(tempfile.mkdtemp(prefix='lexicon-'))
+                build_lexicon(sources[0].parent, directory)
+                compiled = [directory / path.name for path in compiled]
+        return cls(*(np.load(path, mmap_mode='r') for path in compiled))
+
+    @staticmethod
+    def _find(table: np.ndarray, keys: List[str]) -> np.ndarray:
+        """Positions of ``keys`` in the sorted ``table``, or -1 when absent"""
+        if not keys or not len(table):
+            return np.full(len(keys), -1)
+        encoded = [key.encode('ascii', 'replace') for key in keys]
+        # Longer keys would be truncated to the table's width and could match a prefix
+        fits = np.array([len(key) <= table.dtype.itemsize for key in encoded])
+        needles = np.array(encoded, dtype=table.dtype)
+        positions = np.minimum(np.searchsorted(table, needles), len(table) - 1)
+        found = fits & (table[positions] == needles)
+        return np.where(found, positions, -1)
+
+    @property
+    def academic_coverage(self) -> float:
+        """Share of the academic word list's families that band 3 holds"""
+        return min(1.0, int(np.count_nonzero(self.bands == 3)) / AWL_FAMILIES)
+
+    def band_of(self, lemmas: List[str]) -> np.ndarray:
+        positions = self._find(self.words, lemmas)
+        return np.where(positions >= 0, self.bands[np.maximum(positions, 0)], 0)
+
+    def contains(self, word: str) -> bool:
+        return self._find(self.words, [word])[0] >= 0
+
+    def lemma(self, word: str) -> str:
+        """Reduce an inflected form to a headword in the lexicon, when one can be found"""
+        if word in IRREGULAR_FORMS:
+            return IRREGULAR_FORMS[word]
+        if self.contains(word):
+            return word
+        word = word[:-2] if word.endswith("'s") else word
+        candidates = []
+        for suffix, replacements in (('ies', ['y']), ('ied', ['y']), ('es', ['', 'e']),
+                                     ('s', ['']), ('ed', ['', 'e']), ('ing', ['', 'e']),
+                                     ('ly', [''])):
+            if word.endswith(suffix) and len(word) > len(suffix) + 2:
+                stem = word[:-len(suffix)]
+                candidates.extend(stem + replacement for replacement in replacements)
+                # stopped -> stop, running -> run
+                if len(stem) > 2 and stem[-1] == stem[-2]:
+                    candidates.append(stem[:-1])
+        for candidate in candidates:
+            if self.contains(candidate):
+                return candidate
+        return word
+
+    def find_collocations(self, pairs: List[str]) -> np.ndarray:
+        return self._find(self.collocations, pairs) >= 0
+
+
+@dataclass(frozen=True)
+class LexicalProfile:
+    """Lexical resource measurements of one answer"""
+    tokens: int
+    types: int
+    type_token_ratio: float
+    mtld: float
+    sophistication: float         # share of content words on the (partial) academic list
+    collocation_coverage: float   # share of content word pairs that are known collocations
+    band: float
+    advanced_words: Tuple[str, ...]
+    collocations: Tuple[str, ...]
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def mtld(tokens: List[str], threshold: float = MTLD_THRESHOLD) -> float:
+    """Measure of textual lexical diversity, averaged over both reading directions"""
+    def one_pass(sequence):
+        factors, types, count = 0.0, set(), 0
+        for token in sequence:
+            count += 1
+            types.add(token)
+            if len(types) / count <= threshold:
+                factors += 1
+                types, count = set(), 0
+        if count:
+            factors += (1 - len(types) / count) / (1 - threshold)
+        return len(sequence) / factors if factors else float(len(sequence))
+
+    if not tokens:
+        return 0.0
+    return (one_pass(tokens) + one_pass(tokens[::-1])) / 2
+
+
+class LexicalScorer:
+    """Deterministic lexical resource band from diversity, word frequency and collocations
+
+    Needs no network access, so it gives instant feedback and a fallback
+    score when the LLM is unavailable or rate-limited.
+    """
+
+    def __init__(self, lexicon: Optional[Lexicon] = None):
+        self.lexicon = lexicon or Lexicon.load()
+        # A partial academic list finds fewer academic words, so lower the bar to match
+        coverage = self.lexicon.academic_coverage
+        self.sophistication_limits = tuple((limit * coverage, band)
+                                           for limit, band in SOPHISTICATION_LIMITS)
+
+    def analyse(self, text: str) -> LexicalProfile:
+        return self.profile(self.lemmatize(text))
+
+    def lemmatize(self, text: str) -> List[str]:
+        """Lemmas of the words in ``text``; lists for consecutive segments can be concatenated"""
+        return [self.lexicon.lemma(token)
+                for token in re.findall(r"[a-z]+(?:'[a-z]+)?", text.lower())]
+
+    def profile(self, lemmas: List[str]) -> LexicalProfile:
+        """Measure an answer from its lemmas"""
+        if not lemmas:
+            return LexicalProfile(0, 0, 0.0, 0.0, 0.0, 0.0, 0.0, (), ())
+
+        content = [lemma for lemma in lemmas if lemma not in FUNCTION_WORDS and "'" not in lemma]
+        bands = self.lexicon.band_of(content)
+        # Only the academic word list counts; off-list words are as likely to be
+        # everyday words missing from the first 2000 lists, or names, as rare ones
+        advanced = bands == 3
+        sophistication = float(advanced.mean()) if content else 0.0
+
+        paired = [lemma for lemma in lemmas if lemma not in SKIPPED_IN_COLLOCATIONS]
+        pairs = [f"{first} {second}" for first, second in zip(paired, paired[1:])]
+        matched = self.lexicon.find_collocations(pairs)
+        collocations = tuple(dict.fromkeys(pair for pair, hit in zip(pairs, matched) if hit))
+
+        diversity = mtld(lemmas)
+        return LexicalProfile(
+            tokens=len(lemmas),
+            types=len(set(lemmas)),
+            type_token_ratio=len(set(lemmas)) / len(lemmas),
+            mtld=round(diversity, 1),
+            sophistication=round(sophistication, 3),
+            collocation_coverage=round(float(matched.mean()), 3) if pairs else 0.0,
+            band=self._band(len(lemmas), diversity, sophistication, len(collocations)),
+            advanced_words=tuple(dict.fromkeys(word for word, hit in zip(content, advanced)
+                                               if hit))[:8],
+            collocations=collocations[:8]
+        )
+
+    def _band(self, tokens: int, diversity: float, sophistication: float,
+              collocations: int) -> float:
+        diversity_band = next((band for limit, band in
+                               ((100, 9), (85, 8), (70, 7), (55, 6), (40, 5), (25, 4))
+                               if diversity >= limit), 3.5)
+        sophistication_band = next((band for limit, band in self.sophistication_limits
+                                    if sophistication >= limit), 4)
+        band = (diversity_band + sophistication_band) / 2 + (0.5 if collocations >= 2 else 0.0)
+        if tokens < 30 or sophistication < self.sophistication_limits[-1][0]:
+            # Too little language, or only everyday words, to show a wide range
+            band = min(band, 6.0)
+        return round(max(1.0, min(9.0, band)) * 2) / 2
+
+    def suggestions(self, profile: LexicalProfile) -> List[str]:
+        """Turn a lexical profile into feedback text"""
+        suggestions = []
+        if profile.advanced_words:
+            suggestions.append("Good use of less common vocabulary: "
+                               + ", ".join(profile.advanced_words[:5]) + ".")
+        elif profile.tokens:
+            suggestions.append("Try to use some less common, more precise words instead "
+                               "of everyday ones.")
+        if profile.collocations:
+            suggestions.append("Natural collocations: " + ", ".join(profile.collocations[:5]) + ".")
+        if profile.tokens >= 30 and profile.mtld < 55:
+            suggestions.append("You repeat some words often; paraphrase with synonyms to "
+                               "show a wider range.")
+        return suggestions
+
+
+_shared_scorer: Optional[LexicalScorer] = None
+
+
+def get_lexical_scorer() -> LexicalScorer:
+    """Process-wide scorer; the lexicon is mapped once and shared by every session"""
+    global _shared_scorer
+    if _shared_scorer is None:
+        _shared_scorer = LexicalScorer()
+    return _shared_scorer
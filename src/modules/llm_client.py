@@ -0,0 +1,107 @@
+from types import SimpleNamespace
+from typing import Awaitable, Callable, Optional
+from openai import AsyncAzureOpenAI
+import asyncio
+import httpx
+import os
+import threading
+from .background_loop import BackgroundLoop, get_background_loop
+from .settings import require_env
+
+
+DEFAULT_API_VERSION = '2024-12-01-preview'
+
+# Enough warm connections for concurrent sessions and batch grading
+CONNECTION_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16,
+                                 keepalive_expiry=120.0)
+# Fail fast when the endpoint is unreachable; completions get longer to read
+DEFAULT_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+
+_shared_client: Optional['BackgroundClient'] = None
+_shared_lock = threading.Lock()
+
+
+def create_async_client(timeout: httpx.Timeout = DEFAULT_TIMEOUT,
+                        limits: httpx.Limits = CONNECTION_LIMITS) -> AsyncAzureOpenAI:
+    """Build an async Azure OpenAI client with its own keep-alive connection pool"""
+    return AsyncAzureOpenAI(
+        api_key=require_env('AZURE_OPENAI_API_KEY'),
+        azure_endpoint=require_env('AZURE_OPENAI_ENDPOINT'),
+        api_version=os.getenv('AZURE_OPENAI_API_VERSION', DEFAULT_API_VERSION),
+        timeout=timeout,
+        # Retries happen in the shared resilience layer, which also tracks outages
+        max_retries=0,
+        http_client=httpx.AsyncClient(limits=limits, timeout=timeout)
+    )
+
+
+class _BackgroundStream:
+    """Async iterator over a streamed completion that lives on the background loop"""
+
+    def __init__(self, owner: 'BackgroundClient', stream):
+        self._owner = owner
+        self._stream = stream
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        async def next_chunk():
+            try:
+                return True, await self._stream.__anext__()
+            except StopAsyncIteration:
+                return False, None
+
+        more, chunk = await self._owner.run(next_chunk())
+        if not more:
+            raise StopAsyncIteration
+        return chunk
+
+    async def close(self) -> None:
+        await self._owner.run(self._stream.close())
+
+
+class BackgroundClient:
+    """One long-lived client whose requests all run on the background loop
+
+    Pooled connections belong to the loop that opened them, and Streamlit
+    runs each script rerun under a fresh ``asyncio.run``. Running every
+    request on the process-wide background loop lets all reruns and
+    sessions share one keep-alive pool, and nothing is left bound to a
+    loop that has already closed. Callers await the result on their own
+    loop; cancelling the await cancels the request.
+    """
+
+    def __init__(self, client_factory: Callable = create_async_client,
+                 loop: Optional[BackgroundLoop] = None):
+        self.background = loop or get_background_loop()
+        # Built on first use, on the background loop
+        self._client_factory = client_factory
+        self._client = None
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def run(self, coroutine: Awaitable):
+        """Run ``coroutine`` on the background loop and wait for it from the current loop"""
+        if asyncio.get_running_loop() is self.background.loop:
+            return await coroutine
+        return await asyncio.wrap_future(self.background.submit(coroutine))
+
+    async def _create(self, **kwargs):
+        async def create():
+            if self._client is None:
+                self._client = self._client_factory()
+            return await self._client.chat.completions.create(**kwargs)
+
+        reply = await self.run(create())
+        if kwargs.get('stream'):
+            return _BackgroundStream(self, reply)
+        return reply
+
+
+def get_async_client() -> BackgroundClient:
+    """Client shared by every session, rerun and thread"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = BackgroundClient()
+        return _shared_client
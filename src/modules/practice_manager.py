@@ -1,70 +1,180 @@
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
+from .attempt_store import Attempt, AttemptStore, get_attempt_store
+from .audio import decode_audio
+from .incremental_scoring import IncrementalEvaluation
 from .speech_to_text import SpeechToText
 from .question_generator import QuestionGenerator
+from .question_index import get_question_index
+from .question_pool import QuestionPool, get_question_pool
+from .question_prefetch import QuestionPrefetcher
 from .scoring import ScoringEngine
+from .services import ServiceRegistry, get_services
 import logging
-import wave
-import asyncio
+import uuid
+
+
+# Fresh questions requested at most when candidates repeat earlier ones
+MAX_REGENERATIONS = 3
 
 
 class PracticeModeManager:
-    """Manages the IELTS speaking practice session flow"""
+    """Manages the IELTS speaking practice session flow
 
-    def __init__(self):
-        self.speech_to_text = SpeechToText()
-        self.question_generator = QuestionGenerator()
-        self.scoring_engine = ScoringEngine()
+    Only the session's own state lives here; speech, question and scoring
+    services come from the shared registry and are built on first use.
+    """
+
+    def __init__(self, user_id: str, question_pool: Optional[QuestionPool] = None,
+                 services: Optional[ServiceRegistry] = None,
+                 attempt_store: Optional[AttemptStore] = None):
+        self.user_id = user_id
+        self.services = services or get_services()
+        # Sessions and attempts outlive reconnects when a store is configured
+        self.attempt_store = attempt_store or get_attempt_store()
+        self.prefetcher = QuestionPrefetcher(self.services.question_generator)
+        # Opening questions come from a pool shared by every session
+        self.question_pool = question_pool or get_question_pool()
+        # Every question this learner was asked, across sessions
+        self.question_index = get_question_index(user_id)
         self.session_state = self._get_default_session_state()
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
 
+    @property
+    def speech_to_text(self) -> SpeechToText:
+        return self.services.speech_to_text
+
+    @property
+    def question_generator(self) -> QuestionGenerator:
+        return self.services.question_generator
+
+    @property
+    def scoring_engine(self) -> ScoringEngine:
+        return self.services.scoring_engine
+
     def _get_default_session_state(self) -> Dict:
         """Initialize default session state with all required fields"""
         return {
             'active': False,
+            'session_id': None,
             'current_topic': None,
             'questions_answered': 0,
             'conversation_history': [],
             'current_difficulty': 1.0,
             'feedback_history': [],
             'current_question': None,
+            'repeated_question': False,
+            # Recognition language; the speech service is shared, so it is passed per answer
+            'language': 'en-US',
             'duration': 0
         }
 
+    def set_language(self, language: str) -> bool:
+        """Choose the recognition language for this learner's answers"""
+        if language not in self.speech_to_text.get_supported_languages():
+            return False
+        self.session_state['language'] = language
+        return True
+
     def start_session(self, topic: str) -> bool:
         """Initialize a new practice session"""
         try:
             if not topic:
                 return False
+            self.prefetcher.cancel()
+            language = self.session_state['language']
             self.session_state = self._get_default_session_state()
             self.session_state.update({
                 'active': True,
+                'language': language,
+                'session_id': uuid.uuid4().hex,
                 'current_topic': topic,
             })
+            if self.attempt_store:
+                self.attempt_store.start_session(self.session_state['session_id'],
+                                                 self.user_id, topic)
             return True
         except Exception as e:
             print(f"Error starting session: {str(e)}")
             return False
 
+    def _question_context(self, history: List[Dict]) -> Dict:
+        """Generation context from the topic, difficulty and recent exchanges"""
+        return {
+            'topic': self.session_state['current_topic'],
+            'difficulty': self.session_state['current_difficulty'],
+            'history': history[-3:]
+        }
+
+    def _take_pooled_question(self, context: Dict) -> Optional[str]:
+        """A pooled opening question this learner has not been asked before
+
+        Questions this learner already saw go back to the pool, since they
+        are still new to everyone else.
+        """
+        seen = []
+        question = None
+        for _ in range(MAX_REGENERATIONS + 1):
+            candidate = self.question_pool.take(context['topic'], context['difficulty'])
+            if candidate is None:
+                break
+            if not self.question_index.is_duplicate(candidate):
+                question = candidate
+                break
+            seen.append(candidate)
+        self.question_pool.put_back(context['topic'], context['difficulty'], seen)
+        return question
+
     async def get_next_question(self) -> Tuple[bool, str]:
-        """Generate next question based on topic and conversation history"""
+        """Generate next question based on topic and conversation history
+
+        Usually returns a question prefetched while the previous one was
+        being answered; otherwise generates one now. Either way, a
+        speculative prefetch of the following question starts at once.
+        Candidates that repeat or paraphrase a question the learner was
+        asked before are rejected and regenerated. If every regeneration
+        repeats too, an unseen pooled question is used instead; failing
+        that, the repeat is asked and ``repeated_question`` is set.
+        """
         try:
             if not self.session_state or not self.session_state.get('active'):
                 logging.error("No active session in get_next_question")
                 return False, "No active session"
 
             # Get context from previous exchanges
-            context = {
-                'topic': self.session_state['current_topic'],
-                'difficulty': self.session_state['current_difficulty'],
-                'history': self.session_state.get('conversation_history', [])[-3:]
-            }
+            history = self.session_state.get('conversation_history', [])
+            context = self._question_context(history)
 
-            success, question = await self.question_generator.generate_question(
-                context)
+            question = self._take_pooled_question(context) if not history else None
+            if question is None:
+                question = await self.prefetcher.take(context)
+            success = question is not None
+            if not success:
+                success, question = await self.question_generator.generate_question(
+                    context)
+            rejected = []
+            while (success and self.question_index.is_duplicate(question)
+                   and len(rejected) < MAX_REGENERATIONS):
+                logging.info(f"Rejected repeated question: {question}")
+                rejected.append(question)
+                success, question = await self.question_generator.generate_question(
+                    dict(context, avoid=rejected))
+            repeated = success and self.question_index.is_duplicate(question)
+            if repeated:
+                # Out of regenerations; an unseen pooled question is the last resort
+                pooled = self._take_pooled_question(context)
+                if pooled is not None:
+                    question, repeated = pooled, False
+                else:
+                    self.logger.warning(f"No unseen question after {MAX_REGENERATIONS} "
+                                        f"regenerations, repeating: {question}")
             logging.info(f"Generated question: {question}")
             if success:
+                self.question_index.add(question)
                 self.session_state['current_question'] = question
+                self.session_state['repeated_question'] = repeated
+                self.prefetcher.prefetch(self._question_context(
+                    history + [{'question': question}]))
                 return True, question
             
             logging.error(f"Question generation failed: {question}")
@@ -73,39 +183,72 @@ class PracticeModeManager:
         except Exception as e:
             return False, f"Error generating question: {str(e)}"
 
-    async def handle_response(self, audio_file: bytes) -> Tuple[bool, Dict]:
-        """Process user's spoken response"""
+    async def handle_response(self, audio_file: bytes,
+                              on_segment: Optional[Callable] = None,
+                              on_feedback: Optional[Callable] = None) -> Tuple[bool, Dict]:
+        """Process user's spoken response
+
+        ``on_segment`` is called with every partial and final transcription
+        segment as soon as the recognizer produces it. When ``on_feedback``
+        is given, the evaluation is streamed and it is called with
+        ``(criterion, feedback)`` as each criterion is scored. Local
+        measurements run while the answer is still being transcribed.
+        """
             
         try:
             if not hasattr(audio_file, 'read'):
                 return False, {"error": "Invalid audio file"}
-            
-            original_position = audio_file.tell()
 
-            self.logger.info("Starting transcription...")
-            success, text = self.speech_to_text.transcribe_audio(audio_file)
-            
-            if not success:
-                self.logger.error(f"Transcription failed: {text}")
-                return False, {"error": "Failed to transcribe audio"}
-            
+            # Decode once; STT, duration and scoring all share this view
+            audio = decode_audio(audio_file)
+            # Duration metrics use the original length, not the trimmed one
+            audio_duration = audio.duration
+            speech_audio, timing = self.speech_to_text.prepare_for_recognition(audio)
 
-            # reset position for duration calculation
-            audio_file.seek(original_position)
+            self.logger.info("Starting transcription...")
+            incremental = IncrementalEvaluation(self.scoring_engine, audio, audio_duration)
+            async for segment in self.speech_to_text.transcribe_stream(
+                    speech_audio, timing, language=self.session_state['language']):
+                if on_segment:
+                    on_segment(segment)
+                incremental.add_segment(segment)
 
-            # Get audio duration from file
-            with wave.open(audio_file, 'rb') as wav_file:
-                frames = wav_file.getnframes()
-                rate = wav_file.getframerate()
-                audio_duration = frames / float(rate)
+            if not incremental.segments:
+                self.logger.error("Transcription failed: no speech recognized")
+                return False, {"error": "Failed to transcribe audio"}
 
+            text = incremental.text
+            # The next question can be conditioned on this answer while it is scored
+            self.session_state['conversation_history'].append({
+                'question': self.session_state.get('current_question'),
+                'response': text
+            })
+            if self.session_state.get('active'):
+                self.prefetcher.prefetch(
+                    self._question_context(self.session_state['conversation_history']),
+                    conditioned=True)
 
-            evaluation = await self.scoring_engine.evaluate_response(text, audio_duration)
+            if on_feedback:
+                async for criterion, details in incremental.stream():
+                    if criterion == 'overall':
+                        evaluation = details
+                    else:
+                        on_feedback(criterion, details)
+            else:
+                evaluation = await incremental.evaluate()
+            self.session_state['feedback_history'].append(evaluation['feedback'])
+            if self.attempt_store and self.session_state.get('session_id'):
+                self.attempt_store.record(Attempt(
+                    self.user_id, self.session_state['session_id'],
+                    self.session_state['current_topic'],
+                    self.session_state.get('current_question'), text, evaluation,
+                    audio_duration))
 
             return True, {
                 'transcription': text,
                 'evaluation': evaluation,
-                'audio_duration': audio_duration
+                'audio_duration': audio_duration,
+                'timing_map': timing
             }
 
         except Exception as e:
@@ -115,7 +258,8 @@ class PracticeModeManager:
     def get_session_summary(self) -> Dict:
         """Generate end-of-session summary"""
 
-        if not self.session_state['conversation_history']:
+        # Exchanges are recorded once transcribed, feedback once scored
+        if not self.session_state['feedback_history']:
             return {"error": "No practice data available"}
 
         # Calculate average scores
@@ -126,12 +270,12 @@ class PracticeModeManager:
             'fluency': 0
         }
 
-        for exchange in self.session_state['conversation_history']:
-            feedback = exchange['feedback']
+        for feedback in self.session_state['feedback_history']:
             for category in scores:
-                scores[category] += feedback[category]['score']
+                criterion = 'lexical' if category == 'vocabulary' else category
+                scores[category] += feedback[criterion]['score']
 
-        total_responses = len(self.session_state['conversation_history'])
+        total_responses = len(self.session_state['feedback_history'])
         for category in scores:
             scores[category] /= total_responses
 
@@ -154,9 +298,41 @@ class PracticeModeManager:
     def end_session(self) -> Dict:
         """End the practice session and return summary"""
         summary = self.get_session_summary()
+        self.prefetcher.cancel()
         self.session_state['active'] = False
+        if self.attempt_store and self.session_state.get('session_id'):
+            self.attempt_store.end_session(self.session_state['session_id'])
         return summary
 
+    def resumable_session(self) -> Optional[Dict]:
+        """The learner's stored session that was left without being ended"""
+        if not self.attempt_store:
+            return None
+        return self.attempt_store.open_session(self.user_id)
+
+    def resume_session(self, session: Dict) -> List[Dict]:
+        """Rebuild a session from ``resumable_session`` and return its exchanges, oldest first"""
+        self.attempt_store.flush()
+        # Only the learner's own attempts, whatever session id is passed in
+        attempts = self.attempt_store.session_attempts(session['session_id'], self.user_id)
+        self.prefetcher.cancel()
+        language = self.session_state['language']
+        self.session_state = self._get_default_session_state()
+        self.session_state.update({
+            'active': True,
+            'language': language,
+            'session_id': session['session_id'],
+            'current_topic': session['topic'],
+            'conversation_history': [{'question': attempt.question,
+                                      'response': attempt.transcript}
+                                     for attempt in attempts],
+            'feedback_history': [attempt.evaluation['feedback'] for attempt in attempts
+                                 if attempt.evaluation],
+            'current_question': attempts[-1].question if attempts else None
+        })
+        return [{'question': attempt.question, 'response': attempt.transcript,
+                 'evaluation': attempt.evaluation} for attempt in attempts]
+
     def _adjust_difficulty(self, score: float):
         """Adjust difficulty based on performance"""
         # Convert IELTS score (0-9) to difficulty adjustment
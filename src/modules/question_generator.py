@@ -1,54 +1,89 @@
 import os
-from openai import AzureOpenAI
 from dotenv import load_dotenv
-from typing import Dict, Tuple
-import asyncio
-from datetime import datetime
+from typing import Dict, List, Tuple
 
 import streamlit as st
+from .llm_client import get_async_client
+from .rate_limiter import get_rate_limiter
+from .resilience import CircuitOpenError, get_resilient_caller
+from .structured_output import compile_schema, request_structured
+
+
+QUESTION_MODEL = 'gpt-4o-mini'
+QUESTION_TIMEOUT = 15.0
+BATCH_QUESTION_TIMEOUT = 45.0
+
+OPENING_QUESTIONS_PROMPT = """Topic: {topic}
+Difficulty: {difficulty}
+Write {count} different opening questions for an IELTS Speaking practice session on this
+topic. Each question should stand on its own, cover a different aspect of the topic and
+match the difficulty level (0-2).
+
+Reply with only a JSON object of this form:
+{{"questions": ["...", "..."]}}"""
+
+TEST_SCRIPT_TIMEOUT = 60.0
+TEST_SCRIPT_PROMPT = """Topic: {topic}
+Write the complete script of an IELTS Speaking test.
+- Part 1: {part_one} short interview questions about familiar everyday topics, the
+  last few leading towards the main topic.
+- Part 2: a cue card about the main topic: one task line and {cue_points} "You should
+  say" points.
+- Part 3: {part_three} discussion questions that explore the cue card topic in a more
+  abstract, analytical way.
+
+Reply with only a JSON object of this form:
+{{"part1": ["...", "..."], "cue_card": {{"task": "Describe ...", "points": ["...", "..."]}},
+  "part3": ["...", "..."]}}"""
+
+validate_test_script = compile_schema({
+    'type': 'object',
+    'required': ['part1', 'cue_card', 'part3'],
+    'properties': {
+        'part1': {'type': 'array', 'minItems': 1, 'items': {'type': 'string'}},
+        'cue_card': {
+            'type': 'object',
+            'required': ['task', 'points'],
+            'properties': {'task': {'type': 'string'},
+                           'points': {'type': 'array', 'items': {'type': 'string'}}}
+        },
+        'part3': {'type': 'array', 'minItems': 1, 'items': {'type': 'string'}}
+    }
+})
+
+validate_questions = compile_schema({
+    'type': 'object',
+    'required': ['questions'],
+    'properties': {'questions': {'type': 'array', 'minItems': 1, 'items': {'type': 'string'}}}
+})
 
 
 class QuestionGenerator():
     """Use Azure AI to generate questions from a given category chosen by the user"""
 
-    def __init__(self):
+    def __init__(self, client=None):
         load_dotenv()
 
-        # Load Azure OpenAI credentials
-        self.api_key = 'DaONNemP3XA2BKtvLbGFj1JzgeU1l3Ds0bhuAQgvoQ4XMNqI8RqmJQQJ99BCACHYHv6XJ3w3AAAAACOGD0gz'
-        self.endpoint = 'https://kdube-m8h69gib-eastus2.cognitiveservices.azure.com/openai/deployments/gpt-4o-mini/chat/completions?api-version=2025-01-01-preview'
+        # Shares the deployment's request budget with scoring
+        self.rate_limiter = get_rate_limiter(QUESTION_MODEL)
+        self.caller = get_resilient_caller(QUESTION_MODEL)
 
-        self.last_request_time = None
-        self.min_request_interval = 1.0  # Minimum interval between requests in seconds
+        # Tests pass a stand-in; otherwise the shared async client is used
+        self._client = client
 
-        if not self.api_key or not self.endpoint:
-            raise ValueError(
-                "Azure OpenAI credentials not found in environment")
-
-        # Configure OpenAI client
-        self.client = AzureOpenAI(
-            api_key=self.api_key,
-            azure_endpoint=self.endpoint,
-            api_version='2024-12-01-preview'
-        )
+    @property
+    def client(self):
+        """Async Azure OpenAI client shared by every session"""
+        return self._client or get_async_client()
 
     async def generate_question(self, context: Dict) -> Tuple[bool, str]:
         """Generate a contextually appropriate IELTS question"""
         try:
-            # Rate limiting check
-            now = datetime.now()
-            if self.last_request_time:
-                time_since_last = (now - self.last_request_time).total_seconds()
-                if time_since_last < self.min_request_interval:
-                    await asyncio.sleep(self.min_request_interval - time_since_last)
-            
-            # Update last request time
-            self.last_request_time = now
-
             # Extract context information
             topic = context.get('topic', '')
             difficulty = context.get('difficulty', 1.0)
             history = context.get('history', [])
+            avoid = context.get('avoid', [])
 
             # Create system prompt
             system_prompt = """You are an IELTS Speaking examiner. Generate appropriate questions 
@@ -63,26 +98,79 @@ class QuestionGenerator():
             Difficulty: {difficulty}
             Previous exchanges: {history if history else 'None'}
             Generate a natural follow-up question."""
+            if avoid:
+                user_prompt += ("\nDo not repeat or paraphrase any of these earlier questions: "
+                                + " | ".join(avoid))
+
+            async def request():
+                await self.rate_limiter.acquire()
+                return await self.client.chat.completions.create(
+                    model=QUESTION_MODEL,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    temperature=0.7,
+                    max_tokens=100,
+                    timeout=QUESTION_TIMEOUT
+                )
 
             # Call Azure OpenAI API
-            response = self.client.chat.completions.create(
-                model='gpt-4o-mini',
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.7,
-                max_tokens=100
-            )
+            response = await self.caller.call(request)
 
             # Extract generated question
             question = response.choices[0].message.content.strip()
 
             return True, question
 
+        except CircuitOpenError:
+            return False, "Question service is temporarily unavailable, please try again shortly"
         except Exception as e:
             return False, f"Error generating question: {str(e)}"
 
+    async def generate_opening_questions(self, topic: str, difficulty: float,
+                                         count: int) -> List[str]:
+        """Generate ``count`` independent opening questions in a single request
+
+        Raises when the request fails, so callers can decide when to retry.
+        """
+        reply = await self.caller.call(lambda: request_structured(
+            self.client,
+            [
+                {"role": "system", "content": "You are an IELTS Speaking examiner."},
+                {"role": "user", "content": OPENING_QUESTIONS_PROMPT.format(
+                    topic=topic, difficulty=difficulty, count=count)}
+            ],
+            validate_questions,
+            before_request=self.rate_limiter.acquire,
+            model=QUESTION_MODEL,
+            temperature=0.9,
+            timeout=BATCH_QUESTION_TIMEOUT,
+        ), hedge=False)
+        return [question.strip() for question in reply['questions'] if question.strip()]
+
+    async def generate_test_script(self, topic: str, part_one: int = 6, cue_points: int = 4,
+                                   part_three: int = 5) -> Dict:
+        """Generate all three parts of a Speaking test in a single request
+
+        Returns the validated ``{"part1", "cue_card", "part3"}`` reply;
+        raises when the request fails.
+        """
+        return await self.caller.call(lambda: request_structured(
+            self.client,
+            [
+                {"role": "system", "content": "You are an IELTS Speaking examiner."},
+                {"role": "user", "content": TEST_SCRIPT_PROMPT.format(
+                    topic=topic, part_one=part_one, cue_points=cue_points,
+                    part_three=part_three)}
+            ],
+            validate_test_script,
+            before_request=self.rate_limiter.acquire,
+            model=QUESTION_MODEL,
+            temperature=0.8,
+            timeout=TEST_SCRIPT_TIMEOUT,
+        ), hedge=False)
+
     def _adjust_difficulty(self, current_difficulty: float, user_performance: float) -> float:
         """Adjust question difficulty based on user performance"""
         # Performance is expected to be between 0-9 (IELTS scale)
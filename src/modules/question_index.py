@@ -0,0 +1,145 @@
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+import hashlib
+import logging
+import os
+import threading
+import zlib
+import numpy as np
+from .cache import LRUCache
+from .evaluation_cache import normalize_transcript
+from .lexical_scorer import FUNCTION_WORDS
+
+
+MERSENNE_PRIME = (1 << 31) - 1
+QUESTION_STEMS = {'describe', 'tell', 'talk', "let's", 'explain', 'think', 'why'}
+
+
+def shingles(question: str) -> List[str]:
+    """Content words of the normalized question
+
+    Function words and question stems ("describe", "tell me about") are left
+    out: questions built on one template differ only in their subject, which
+    must dominate the similarity.
+    """
+    return sorted({word for word in normalize_transcript(question).split()
+                   if word not in FUNCTION_WORDS and word not in QUESTION_STEMS})
+
+
+class QuestionIndex:
+    """MinHash signatures with LSH banding over every question a learner was asked
+
+    Near-duplicates (estimated Jaccard similarity of content words at or
+    above ``threshold``) are found by looking up the candidate's band
+    hashes, then comparing signatures with the few questions that share a
+    band. Bands of 4 rows give a pair at the threshold a near-certain band
+    match while most unrelated questions share none. With ``path`` set,
+    signatures are appended to a flat binary file of ``num_perm`` uint32
+    values per question.
+    """
+
+    def __init__(self, num_perm: int = 256, bands: int = 64, threshold: float = 0.7,
+                 path: Optional[Path] = None, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.path = path
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self._signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self._count = 0
+        self._buckets: List[Dict[bytes, List[int]]] = [defaultdict(list) for _ in range(bands)]
+        self._lock = threading.Lock()
+        if path is not None and path.exists():
+            self._load(path)
+
+    def signature(self, question: str) -> np.ndarray:
+        hashes = np.array([zlib.crc32(shingle.encode()) for shingle in shingles(question)],
+                          dtype=np.uint64) % MERSENNE_PRIME
+        if not len(hashes):
+            return np.full(self.num_perm, MERSENNE_PRIME, dtype=np.uint32)
+        # (a * x + b) mod p stays below 2**63 because a, b and x are all below 2**31
+        permuted = (self._a[:, np.newaxis] * hashes[np.newaxis, :] + self._b[:, np.newaxis])
+        return (permuted % MERSENNE_PRIME).min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes()
+                for band in range(self.bands)]
+
+    def similarity(self, question: str) -> float:
+        """Highest estimated similarity to any indexed question"""
+        signature = self.signature(question)
+        with self._lock:
+            candidates = {index for band, key in enumerate(self._band_keys(signature))
+                          for index in self._buckets[band].get(key, ())}
+            if not candidates:
+                return 0.0
+            matches = self._signatures[sorted(candidates)] == signature
+        return float(matches.mean(axis=1).max())
+
+    def is_duplicate(self, question: str) -> bool:
+        return self.similarity(question) >= self.threshold
+
+    def add(self, question: str) -> None:
+        signature = self.signature(question)
+        with self._lock:
+            self._insert(signature)
+            if self.path is not None:
+                try:
+                    with open(self.path, 'ab') as index_file:
+                        index_file.write(signature.tobytes())
+                except OSError as e:
+                    logging.getLogger(__name__).warning(
+                        f"Failed to persist question index entry: {str(e)}")
+
+    def _insert(self, signature: np.ndarray) -> None:
+        if self._count == len(self._signatures):
+            # Grow geometrically so adding stays amortized O(1)
+            grown = np.empty((max(64, 2 * self._count), self.num_perm), dtype=np.uint32)
+            grown[:self._count] = self._signatures[:self._count]
+            self._signatures = grown
+        self._signatures[self._count] = signature
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band][key].append(self._count)
+        self._count += 1
+
+    def _load(self, path: Path) -> None:
+        signatures = np.fromfile(path, dtype=np.uint32)
+        # A torn final write leaves a partial row, which is dropped
+        rows = len(signatures) // self.num_perm
+        for signature in signatures[:rows * self.num_perm].reshape(rows, self.num_perm):
+            self._insert(signature)
+
+    def __len__(self) -> int:
+        return self._count
+
+
+# Indexes of recently active learners; the rest are reloaded from disk when needed
+_shared_indexes = LRUCache(1024)
+_shared_lock = threading.Lock()
+
+
+def get_question_index(user_id: str) -> QuestionIndex:
+    """Question index of one learner, shared by all of their sessions
+
+    Set ``QUESTION_INDEX_DIR`` to keep the index across restarts.
+    """
+    with _shared_lock:
+        index = _shared_indexes.get(user_id)
+        if index is None:
+            directory = os.getenv('QUESTION_INDEX_DIR')
+            path = None
+            if directory:
+                Path(directory).mkdir(parents=True, exist_ok=True)
+                # Hashed so any user id makes a safe file name
+                name = hashlib.sha256(user_id.encode()).hexdigest()[:32]
+                # Versioned: older files hold 96-value signatures of character shingles
+                path = Path(directory) / f"{name}.v2.minhash"
+            index = QuestionIndex(path=path)
+            _shared_indexes.put(user_id, index)
+        return index
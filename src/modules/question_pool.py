@@ -0,0 +1,136 @@
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional, Tuple
+import logging
+import os
+import threading
+from .background_loop import BackgroundLoop, get_background_loop
+from .question_generator import QuestionGenerator
+from .services import get_services
+
+
+def difficulty_bucket(difficulty: float) -> float:
+    """Round a 0-2 difficulty to the nearest half step"""
+    return round(max(0.0, min(2.0, difficulty)) * 2) / 2
+
+
+class QuestionPool:
+    """Opening questions generated ahead of time, per topic and difficulty bucket
+
+    When a pool falls below ``low_watermark`` it is refilled on the
+    background loop, ``batch_size`` questions per request, up to
+    ``high_watermark``. Questions are handed out once, so sessions never
+    share an opening question.
+    """
+
+    def __init__(self, question_generator: Optional[QuestionGenerator] = None,
+                 low_watermark: int = 5, high_watermark: int = 20, batch_size: int = 10,
+                 loop: Optional[BackgroundLoop] = None):
+        self.question_generator = question_generator or get_services().question_generator
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self.batch_size = batch_size
+        self.loop = loop or get_background_loop()
+        self._pools: Dict[Tuple[str, float], Deque[str]] = {}
+        self._refilling = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.requests = 0
+
+    def take(self, topic: str, difficulty: float) -> Optional[str]:
+        """An unused opening question, or None when the pool is empty"""
+        key = (topic, difficulty_bucket(difficulty))
+        with self._lock:
+            pool = self._pools.setdefault(key, deque())
+            question = pool.popleft() if pool else None
+            if question is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        self._refill_if_low(key)
+        return question
+
+    def put_back(self, topic: str, difficulty: float, questions: Iterable[str]) -> None:
+        """Return questions that were taken but not asked
+
+        They go to the back, so the learner who passed on them is offered
+        other questions first.
+        """
+        with self._lock:
+            pool = self._pools.setdefault((topic, difficulty_bucket(difficulty)), deque())
+            pool.extend(question for question in questions if question not in pool)
+
+    def warm(self, topics: Iterable[str], difficulties: Iterable[float] = (1.0,)) -> None:
+        """Start filling the pools of ``topics``; cheap when they are already full"""
+        for topic in topics:
+            for difficulty in difficulties:
+                self._refill_if_low((topic, difficulty_bucket(difficulty)))
+
+    def _refill_if_low(self, key: Tuple[str, float]) -> None:
+        with self._lock:
+            if key in self._refilling or len(self._pools.get(key, ())) >= self.low_watermark:
+                return
+            self._refilling.add(key)
+        self.loop.submit(self._refill(key))
+
+    async def _refill(self, key: Tuple[str, float]) -> None:
+        topic, difficulty = key
+        try:
+            while True:
+                with self._lock:
+                    pool = self._pools.setdefault(key, deque())
+                    missing = self.high_watermark - len(pool)
+                    if missing > 0:
+                        self.requests += 1
+                if missing <= 0:
+                    return
+                questions = await self.question_generator.generate_opening_questions(
+                    topic, difficulty, min(self.batch_size, missing))
+                with self._lock:
+                    fresh = [question for question in dict.fromkeys(questions)
+                             if question not in pool]
+                    pool.extend(fresh)
+                if not fresh:
+                    return
+        except Exception as e:
+            logging.getLogger(__name__).warning(
+                f"Failed to refill question pool for {topic}: {str(e)}")
+        finally:
+            with self._lock:
+                self._refilling.discard(key)
+
+    def size(self, topic: str, difficulty: float) -> int:
+        with self._lock:
+            return len(self._pools.get((topic, difficulty_bucket(difficulty)), ()))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'requests': self.requests,
+                'pooled': sum(len(pool) for pool in self._pools.values())
+            }
+
+
+_shared_pool: Optional[QuestionPool] = None
+_shared_lock = threading.Lock()
+
+
+def get_question_pool() -> QuestionPool:
+    """Process-wide pool shared by every session
+
+    Set ``QUESTION_POOL_LOW``, ``QUESTION_POOL_HIGH`` and
+    ``QUESTION_POOL_BATCH`` to tune the watermarks and batch size.
+    """
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = QuestionPool(
+                low_watermark=int(os.getenv('QUESTION_POOL_LOW', '5')),
+                high_watermark=int(os.getenv('QUESTION_POOL_HIGH', '20')),
+                batch_size=int(os.getenv('QUESTION_POOL_BATCH', '10'))
+            )
+        return _shared_pool
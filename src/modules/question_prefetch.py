@@ -0,0 +1,122 @@
+from typing import Dict, Optional, Tuple
+import asyncio
+import concurrent.futures
+import json
+import logging
+from .background_loop import BackgroundLoop, get_background_loop
+from .question_generator import QuestionGenerator
+
+
+# How long "Next Question" waits for a transcript-conditioned question still in
+# flight before settling for the speculative one
+PREFETCH_GRACE = 0.5
+
+
+def context_key(context: Dict, speculative: bool = False) -> str:
+    """Identify a generation context; ``speculative`` ignores the latest, unanswered response"""
+    history = [dict(exchange) for exchange in context.get('history', [])]
+    if speculative and history:
+        history[-1].pop('response', None)
+    return json.dumps({'topic': context.get('topic'), 'difficulty': context.get('difficulty'),
+                       'history': history}, sort_keys=True, default=str)
+
+
+class QuestionPrefetcher:
+    """Generates the next practice question before it is asked for
+
+    A speculative question is requested as soon as the current one is
+    shown; once the answer is transcribed it is replaced by one
+    conditioned on the transcript. Requests run on a background loop so
+    they survive Streamlit reruns, and any request for a context that no
+    longer applies is cancelled.
+    """
+
+    def __init__(self, question_generator: QuestionGenerator,
+                 loop: Optional[BackgroundLoop] = None, grace: float = PREFETCH_GRACE):
+        self.question_generator = question_generator
+        self.loop = loop or get_background_loop()
+        self.grace = grace
+        self._speculative: Optional[Tuple[str, concurrent.futures.Future]] = None
+        self._conditioned: Optional[Tuple[str, concurrent.futures.Future]] = None
+        self.hits = 0
+        self.misses = 0
+
+    def prefetch(self, context: Dict, conditioned: bool = False) -> None:
+        """Start generating the question that should follow ``context``"""
+        if conditioned:
+            key = context_key(context)
+            # A finished speculative question stays as a fallback for the same turn
+            if (self._speculative is None or not self._speculative[1].done()
+                    or self._speculative[0] != context_key(context, speculative=True)):
+                self._cancel('_speculative')
+            self._cancel('_conditioned')
+            self._conditioned = (key, self._submit(context))
+        else:
+            self.cancel()
+            self._speculative = (context_key(context, speculative=True), self._submit(context))
+
+    def _submit(self, context: Dict) -> concurrent.futures.Future:
+        return self.loop.submit(self.question_generator.generate_question(context))
+
+    async def take(self, context: Dict) -> Optional[str]:
+        """The prefetched question for ``context``, or None if nothing usable was prefetched"""
+        conditioned = self._matching('_conditioned', context_key(context))
+        speculative = self._matching('_speculative', context_key(context, speculative=True))
+        self._speculative = self._conditioned = None
+
+        question = None
+        if conditioned is not None:
+            question = await self._result(conditioned, self.grace if speculative else None)
+        if question is None and speculative is not None:
+            question = await self._result(speculative, 0 if conditioned else None)
+        if question is None and conditioned is not None and speculative is not None:
+            question = await self._result(conditioned, None)
+
+        for future in (conditioned, speculative):
+            if future is not None:
+                future.cancel()
+        if question is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return question
+
+    def _matching(self, slot: str, key: str) -> Optional[concurrent.futures.Future]:
+        entry = getattr(self, slot)
+        if entry is None:
+            return None
+        if entry[0] != key:
+            entry[1].cancel()
+            return None
+        return entry[1]
+
+    @staticmethod
+    async def _result(future: concurrent.futures.Future,
+                      timeout: Optional[float]) -> Optional[str]:
+        """The generated question, waiting at most ``timeout`` seconds (None waits for it)"""
+        if future.cancelled() or (timeout == 0 and not future.done()):
+            return None
+        try:
+            if future.done():
+                success, question = future.result()
+            else:
+                # Shielded so giving up on the wait does not cancel the request
+                success, question = await asyncio.wait_for(
+                    asyncio.shield(asyncio.wrap_future(future)), timeout)
+        except asyncio.TimeoutError:
+            return None
+        except Exception as e:
+            logging.getLogger(__name__).warning(f"Prefetched question failed: {str(e)}")
+            return None
+        return question if success else None
+
+    def _cancel(self, slot: str) -> None:
+        entry = getattr(self, slot)
+        if entry is not None:
+            entry[1].cancel()
+        setattr(self, slot, None)
+
+    def cancel(self) -> None:
+        """Drop every pending prefetch"""
+        self._cancel('_speculative')
+        self._cancel('_conditioned')
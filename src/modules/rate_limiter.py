@@ -0,0 +1,147 @@
+from typing import Callable, Dict, Optional, Tuple
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+
+DEFAULT_REQUESTS_PER_MINUTE = 60
+
+
+def _refill(tokens: float, updated_at: float, now: float,
+            rate: float, capacity: float) -> float:
+    """Tokens in a bucket after refilling at ``rate`` per second since ``updated_at``"""
+    return min(capacity, tokens + max(0.0, now - updated_at) * rate)
+
+
+class MemoryBucketStore:
+    """Token buckets shared by every thread and event loop in this process"""
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, name: str, rate: float, capacity: float, now: float) -> float:
+        """Take one token and return how long to wait before using it"""
+        with self._lock:
+            tokens, updated_at = self._buckets.get(name, (capacity, now))
+            tokens = _refill(tokens, updated_at, now, rate, capacity) - 1
+            self._buckets[name] = (tokens, now)
+        # A negative balance is a queue of callers who already hold a reservation
+        return max(0.0, -tokens / rate)
+
+
+class SQLiteBucketStore:
+    """Token buckets kept in a SQLite file so several app processes share one budget
+
+    Each reservation is a single ``BEGIN IMMEDIATE`` transaction, which
+    SQLite serializes across processes. Timestamps are wall-clock time
+    because monotonic clocks are not comparable between processes.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, timeout=10.0, isolation_level=None,
+                                   check_same_thread=False)
+        self._db.execute("""CREATE TABLE IF NOT EXISTS token_buckets (
+                                name TEXT PRIMARY KEY,
+                                tokens REAL NOT NULL,
+                                updated_at REAL NOT NULL)""")
+
+    def reserve(self, name: str, rate: float, capacity: float, now: float) -> float:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT tokens, updated_at FROM token_buckets WHERE name = ?",
+                    (name,)).fetchone()
+                tokens, updated_at = row if row else (capacity, now)
+                tokens = _refill(tokens, updated_at, now, rate, capacity) - 1
+                self._db.execute(
+                    "INSERT OR REPLACE INTO token_buckets VALUES (?, ?, ?)",
+                    (name, tokens, max(now, updated_at)))
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return max(0.0, -tokens / rate)
+
+
+class RateLimiter:
+    """Token-bucket limiter for one model deployment
+
+    Allows bursts of up to ``burst`` requests, then ``requests_per_minute``
+    on average. Every call is O(1). Buckets live in ``store``, so limiters
+    for the same deployment in different sessions (or, with the SQLite
+    store, different processes) draw from one budget.
+    """
+
+    def __init__(self, name: str, requests_per_minute: float,
+                 burst: Optional[float] = None, store=None,
+                 clock: Callable[[], float] = time.time):
+        self.name = name
+        self.requests_per_minute = requests_per_minute
+        self.rate = requests_per_minute / 60.0
+        self.capacity = burst if burst is not None else max(1.0, self.rate * 10)
+        self.store = store or MemoryBucketStore()
+        self.clock = clock
+        self.total_wait = 0.0
+
+    def reserve(self) -> float:
+        """Claim the next request slot and return the delay until it is usable"""
+        return self.store.reserve(self.name, self.rate, self.capacity, self.clock())
+
+    async def acquire(self) -> None:
+        """Wait until a request to this deployment fits within the budget"""
+        wait = self.reserve()
+        if wait > 0:
+            self.total_wait += wait
+            await asyncio.sleep(wait)
+
+
+_shared_store = None
+_shared_limiters: Dict[str, RateLimiter] = {}
+_shared_lock = threading.Lock()
+
+
+def _get_store():
+    """Process-wide bucket store; ``RATE_LIMIT_DB`` makes it shared across processes"""
+    global _shared_store
+    if _shared_store is None:
+        db_path = os.getenv('RATE_LIMIT_DB')
+        if db_path:
+            try:
+                _shared_store = SQLiteBucketStore(db_path)
+            except sqlite3.Error as e:
+                logging.getLogger(__name__).warning(
+                    f"Rate limit database unavailable, limiting per process: {str(e)}")
+        if _shared_store is None:
+            _shared_store = MemoryBucketStore()
+    return _shared_store
+
+
+def get_rate_limiter(deployment: str,
+                     requests_per_minute: Optional[float] = None) -> RateLimiter:
+    """Limiter shared by every caller of one deployment
+
+    The first caller sets the budget, by default ``AZURE_OPENAI_RPM``
+    requests per minute. Later callers may omit ``requests_per_minute``;
+    asking for a different budget raises ``ValueError``, since the
+    deployment has only one bucket.
+    """
+    with _shared_lock:
+        limiter = _shared_limiters.get(deployment)
+        if limiter is None:
+            if requests_per_minute is None:
+                requests_per_minute = float(os.getenv('AZURE_OPENAI_RPM',
+                                                      DEFAULT_REQUESTS_PER_MINUTE))
+            limiter = _shared_limiters[deployment] = RateLimiter(
+                deployment, requests_per_minute, store=_get_store())
+        elif requests_per_minute is not None and requests_per_minute != limiter.requests_per_minute:
+            raise ValueError(
+                f"Rate limit for {deployment} is already {limiter.requests_per_minute:g} "
+                f"requests per minute, not {requests_per_minute:g}")
+        return limiter
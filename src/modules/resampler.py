@@ -0,0 +1,140 @@
+from functools import lru_cache
+from math import ceil, gcd
+from typing import Tuple
+import numpy as np
+
+
+# Filter length in zero crossings of the sinc on each side of the centre tap
+ZERO_CROSSINGS = 10
+KAISER_BETA = 5.0
+
+
+@lru_cache(maxsize=32)
+def get_filter_bank(orig_sr: int, target_sr: int) -> Tuple[int, int, int, np.ndarray]:
+    """Design the polyphase anti-aliasing filter bank for a sample rate pair
+
+    Returns ``(up, down, half, bank)`` where ``bank[phase]`` holds the taps
+    for one output phase, reversed so a window of input samples can be
+    multiplied with it directly. Banks are cached per rate pair.
+    """
+    divisor = gcd(orig_sr, target_sr)
+    up, down = target_sr // divisor, orig_sr // divisor
+
+    # Half length in input samples; the full filter is centred on a multiple of up
+    half = ceil(ZERO_CROSSINGS * max(up, down) / up)
+    length = 2 * half * up + 1
+    cutoff = 1.0 / max(up, down)
+
+    n = np.arange(length) - half * up
+    taps = cutoff * np.sinc(cutoff * n) * np.kaiser(length, KAISER_BETA) * up
+
+    width = 2 * half + 1
+    padded = np.zeros(width * up)
+    padded[:length] = taps
+    bank = padded.reshape(width, up).T[:, ::-1].copy()
+    bank.setflags(write=False)
+    return up, down, half, bank
+
+
+def _apply_bank(padded: np.ndarray, bank: np.ndarray, up: int, down: int,
+                first: int, last: int, offset: int) -> np.ndarray:
+    """Compute outputs ``first..last-1`` from a zero-padded input buffer
+
+    ``offset`` is the absolute index of ``padded[0]``. Outputs that share a
+    filter phase are a strided slice of the input, so each phase is a
+    single matrix-vector product over a sliding window view.
+    """
+    output = np.empty(last - first)
+    if last <= first:
+        return output
+
+    windows = np.lib.stride_tricks.sliding_window_view(padded, bank.shape[1])
+    for residue in range(min(up, last - first)):
+        index = first + residue
+        count = (last - 1 - index) // up + 1
+        start = (index * down) // up - offset
+        stop = start + (count - 1) * down + 1
+        output[residue::up] = windows[start:stop:down] @ bank[(index * down) % up]
+    return output
+
+
+def output_length(num_samples: int, orig_sr: int, target_sr: int) -> int:
+    """Number of output samples produced for an input of the given length"""
+    divisor = gcd(orig_sr, target_sr)
+    up, down = target_sr // divisor, orig_sr // divisor
+    return ceil(num_samples * up / down)
+
+
+def resample_poly(audio_data: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """Resample a mono signal with a rational polyphase anti-aliasing filter"""
+    if orig_sr == target_sr:
+        return np.asarray(audio_data, dtype=np.float64)
+
+    up, down, half, bank = get_filter_bank(orig_sr, target_sr)
+    padded = np.concatenate((np.zeros(half), audio_data, np.zeros(bank.shape[1])))
+    return _apply_bank(padded, bank, up, down, 0,
+                       output_length(len(audio_data), orig_sr, target_sr), 0)
+
+
+def to_int16(audio_data: np.ndarray) -> np.ndarray:
+    """Round and clip a float signal into 16-bit PCM"""
+    return np.clip(np.rint(audio_data), -32768, 32767).astype(np.int16)
+
+
+class StreamingResampler:
+    """Chunk-by-chunk polyphase resampler
+
+    Carries the filter history between calls, so feeding a signal in blocks
+    and calling ``flush`` produces exactly the same samples as
+    ``resample_poly`` on the whole signal.
+    """
+
+    def __init__(self, orig_sr: int, target_sr: int):
+        self.orig_sr = orig_sr
+        self.target_sr = target_sr
+        self.up, self.down, self.half, self.bank = get_filter_bank(orig_sr, target_sr)
+        self.width = self.bank.shape[1]
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all buffered input"""
+        self._buffer = np.zeros(self.half)
+        self._offset = 0          # padded-input index of _buffer[0]
+        self._next_output = 0     # index of the next output sample
+        self._samples_in = 0      # real input samples consumed so far
+
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        """Feed a block of samples and return every output that is now complete"""
+        if self.orig_sr == self.target_sr:
+            self._samples_in += len(chunk)
+            return np.asarray(chunk, dtype=np.float64)
+
+        self._samples_in += len(chunk)
+        self._buffer = np.concatenate((self._buffer, chunk))
+        available = self._offset + len(self._buffer)
+        # Output n needs padded samples up to (n * down) // up + width - 1
+        last = max(self._next_output, ((available - self.width) * self.up) // self.down + 1)
+        last = min(last, output_length(self._samples_in, self.orig_sr, self.target_sr))
+        return self._emit(last)
+
+    def flush(self) -> np.ndarray:
+        """Return the remaining outputs, zero-padding the end of the signal"""
+        if self.orig_sr == self.target_sr:
+            return np.empty(0)
+
+        self._buffer = np.concatenate((self._buffer, np.zeros(self.width)))
+        output = self._emit(output_length(self._samples_in, self.orig_sr, self.target_sr))
+        self.reset()
+        return output
+
+    def _emit(self, last: int) -> np.ndarray:
+        output = _apply_bank(self._buffer, self.bank, self.up, self.down,
+                             self._next_output, last, self._offset)
+        self._next_output = max(self._next_output, last)
+
+        # Drop input that no future output can reach
+        keep_from = (self._next_output * self.down) // self.up - self._offset
+        if keep_from > 0:
+            self._buffer = self._buffer[keep_from:]
+            self._offset += keep_from
+        return output
@@ -0,0 +1,275 @@
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+import openai
+
+
+T = TypeVar('T')
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(RuntimeError):
+    """The deployment has failed repeatedly; calls are refused until it recovers"""
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the server asked us to wait, from the Retry-After headers of ``error``"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        if 'retry-after-ms' in headers:
+            return float(headers['retry-after-ms']) / 1000.0
+        if 'retry-after' in headers:
+            return float(headers['retry-after'])
+    except (TypeError, ValueError):
+        # HTTP dates are allowed too, but Azure OpenAI sends seconds
+        return None
+    return None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether ``error`` is a transient service failure rather than a bad request"""
+    if isinstance(error, (asyncio.TimeoutError, openai.APITimeoutError,
+                          openai.APIConnectionError)):
+        return True
+    status = getattr(error, 'status_code', None)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    return 'rate_limit' in str(error).lower()
+
+
+class RetryPolicy:
+    """Jittered exponential backoff that honors the server's Retry-After
+
+    Delays are drawn uniformly between zero and the exponential cap ("full
+    jitter"), so sessions that failed together do not retry together. A
+    Retry-After longer than ``max_delay`` is not waited out; the error is
+    raised so callers can degrade instead of blocking.
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 20.0,
+                 rng: Optional[random.Random] = None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rng = rng or random.Random()
+
+    def delay(self, attempt: int, error: BaseException) -> Optional[float]:
+        """Seconds to wait before retrying after failed ``attempt``, or None to give up"""
+        if attempt + 1 >= self.max_attempts or not is_retryable(error):
+            return None
+        requested = retry_after(error)
+        if requested is not None:
+            return requested if requested <= self.max_delay else None
+        return self.rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Stops calling a deployment after ``failure_threshold`` consecutive failures
+
+    While open every call fails immediately. After ``reset_timeout``
+    seconds a single trial call is let through (half-open); its success
+    closes the circuit and its failure opens it again. A trial that ends
+    without an answer (cancelled) must be handed back with ``release_trial``.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def before_call(self) -> bool:
+        """Raise ``CircuitOpenError`` unless a call may be made now
+
+        Returns True when the call is the half-open trial.
+        """
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return False
+            if state == 'half_open' and not self._trial_running:
+                self._trial_running = True
+                return True
+        raise CircuitOpenError(f"{self.name} is unavailable after repeated failures")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def release_trial(self) -> None:
+        """Let the next call be the trial; the current one ended without an answer"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= self.failure_threshold:
+                if self.opened_at is None or self._trial_running:
+                    logging.getLogger(__name__).warning(f"Circuit opened for {self.name}")
+                self.opened_at = self.clock()
+            self._trial_running = False
+
+
+class LatencyTracker:
+    """Recent successful call latencies, for choosing when to hedge"""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+class ResilientCaller:
+    """Retries, circuit breaking and optional hedging for calls to one deployment
+
+    ``request`` must be a callable that starts a fresh request each time,
+    including its rate limiter wait. With ``hedge_percentile`` set, a call
+    still running after that latency percentile gets a second identical
+    request, and whichever answers first wins.
+    """
+
+    def __init__(self, name: str, policy: Optional[RetryPolicy] = None,
+                 breaker: Optional[CircuitBreaker] = None,
+                 hedge_percentile: Optional[float] = None, hedge_min_samples: int = 20):
+        self.name = name
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker(name)
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.latencies = LatencyTracker()
+        self.retries = 0
+        self.hedges = 0
+
+    async def call(self, request: Callable[[], Awaitable[T]], hedge: bool = True) -> T:
+        attempt = 0
+        while True:
+            trial = self.breaker.before_call()
+            started = time.perf_counter()
+            try:
+                result = await (self._hedged(request) if hedge else request())
+            except asyncio.CancelledError:
+                # Says nothing about the service, but must not hold the trial slot forever
+                if trial:
+                    self.breaker.release_trial()
+                raise
+            except Exception as e:
+                if is_retryable(e):
+                    self.breaker.record_failure()
+                else:
+                    # The service answered; the request itself was at fault
+                    self.breaker.record_success()
+                delay = self.policy.delay(attempt, e)
+                if delay is None:
+                    raise
+                logging.getLogger(__name__).warning(
+                    f"{self.name} call failed ({str(e)}), retrying in {delay:.1f}s")
+                self.retries += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            if hedge:
+                # Only calls that may be hedged set the hedging threshold
+                self.latencies.add(time.perf_counter() - started)
+            return result
+
+    async def _hedged(self, request: Callable[[], Awaitable[T]]) -> T:
+        if self.hedge_percentile is None or len(self.latencies) < self.hedge_min_samples:
+            return await request()
+
+        first = asyncio.ensure_future(request())
+        done, _ = await asyncio.wait({first}, timeout=self.latencies.percentile(self.hedge_percentile))
+        if done:
+            return first.result()
+
+        self.hedges += 1
+        pending = {first, asyncio.ensure_future(request())}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict:
+        return {
+            'state': self.breaker.state,
+            'retries': self.retries,
+            'hedges': self.hedges,
+            'p50': self.latencies.percentile(50),
+            'p95': self.latencies.percentile(95)
+        }
+
+
+_shared_callers: Dict[str, ResilientCaller] = {}
+_shared_lock = threading.Lock()
+
+
+def get_resilient_caller(deployment: str) -> ResilientCaller:
+    """Caller shared by every session using ``deployment``
+
+    Sharing the breaker means an outage trips it once for everyone. Set
+    ``LLM_MAX_ATTEMPTS``, ``LLM_MAX_RETRY_DELAY``, ``LLM_BREAKER_THRESHOLD``,
+    ``LLM_BREAKER_RESET`` and ``LLM_HEDGE_PERCENTILE`` (hedging is off
+    unless set) to tune it.
+    """
+    with _shared_lock:
+        if deployment not in _shared_callers:
+            hedge = os.getenv('LLM_HEDGE_PERCENTILE')
+            _shared_callers[deployment] = ResilientCaller(
+                deployment,
+                policy=RetryPolicy(max_attempts=int(os.getenv('LLM_MAX_ATTEMPTS', '3')),
+                                   max_delay=float(os.getenv('LLM_MAX_RETRY_DELAY', '20'))),
+                breaker=CircuitBreaker(
+                    deployment,
+                    failure_threshold=int(os.getenv('LLM_BREAKER_THRESHOLD', '5')),
+                    reset_timeout=float(os.getenv('LLM_BREAKER_RESET', '30'))),
+                hedge_percentile=float(hedge) if hedge else None
+            )
+        return _shared_callers[deployment]
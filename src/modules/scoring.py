@@ -1,30 +1,114 @@
 # src/modules/scoring.py
-from typing import Dict, List
-from openai import AzureOpenAI
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 import os
 from dotenv import load_dotenv
 import time
-import datetime
 import asyncio
+import hashlib
+import json
+import logging
+from .audio import DecodedAudio
+from .evaluation_cache import EvaluationCache
+from .fluency import FluencyFeatureExtractor, FluencyFeatures
+from .lexical_scorer import LexicalProfile, LexicalScorer, get_lexical_scorer
+from .llm_client import get_async_client
+from .rate_limiter import RateLimiter, get_rate_limiter
+from .resilience import ResilientCaller, get_resilient_caller
+from .structured_output import (IncrementalObjectParser, StructuredOutputMetrics,
+                                compile_schema, get_output_metrics, request_structured)
+
+
+# Per-call limits; a stuck completion should not hold the answer hostage
+EVALUATION_TIMEOUT = 30.0
+ANALYSIS_TIMEOUT = 20.0
+# Budget for one criterion in detailed mode (score plus feedback)
+CRITERION_TIMEOUT = 45.0
+
+EVALUATION_MODEL = 'gpt-4'  # Ensure this matches your Azure deployment
+ANALYSIS_MODEL = 'gpt-4o-mini'
+EVALUATION_SYSTEM_PROMPT = "You are an IELTS examiner. Provide clear, structured evaluations."
+EVALUATION_PROMPT = """
+            Analyze the following IELTS speaking response:
+            "{response}"
+            Duration: {audio_duration} seconds
+
+            Rate each criterion (0-9) and provide brief feedback.
+            Reply with only a JSON object of this form:
+            {{"fluency": {{"score": 6.5, "feedback": "..."}},
+             "lexical": {{"score": 6.0, "feedback": "..."}},
+             "grammar": {{"score": 6.0, "feedback": "..."}},
+             "pronunciation": {{"score": 7.0, "feedback": "..."}}}}
+
+            The keys stand for Fluency & Coherence, Lexical Resource,
+            Grammatical Range & Accuracy and Pronunciation.
+            """
+SCORE_REPLY_FORMAT = """
+        Reply with only a JSON object: {"score": <0-9>, "explanation": "..."}
+        """
+# Bump when the per-criterion prompts change so cached evaluations are not reused
+DETAILED_PROMPT_VERSION = 2
+
+CRITERION_SCHEMA = {
+    'type': 'object',
+    'required': ['score', 'feedback'],
+    'properties': {
+        'score': {'type': 'number', 'minimum': 0, 'maximum': 9},
+        'feedback': {'type': 'string'}
+    }
+}
+EVALUATION_SCHEMA = {
+    'type': 'object',
+    'required': ['fluency', 'lexical', 'grammar', 'pronunciation'],
+    'properties': {criterion: CRITERION_SCHEMA
+                   for criterion in ['fluency', 'lexical', 'grammar', 'pronunciation']}
+}
+SCORE_SCHEMA = {
+    'type': 'object',
+    'required': ['score', 'explanation'],
+    'properties': {
+        'score': {'type': 'number', 'minimum': 0, 'maximum': 9},
+        'explanation': {'type': 'string'}
+    }
+}
+validate_evaluation = compile_schema(EVALUATION_SCHEMA)
+validate_criterion = compile_schema(CRITERION_SCHEMA)
+validate_score = compile_schema(SCORE_SCHEMA)
 
 
 class ScoringEngine:
     """IELTS scoring engine that evaluates responses across multiple criteria"""
 
-    def __init__(self):
+    def __init__(self, client=None, requests_per_minute: Optional[int] = None,
+                 max_concurrent_requests: int = 4, criterion_timeout: float = CRITERION_TIMEOUT,
+                 cache: Optional[EvaluationCache] = None,
+                 output_metrics: Optional[StructuredOutputMetrics] = None,
+                 lexical_scorer: Optional[LexicalScorer] = None,
+                 evaluation_caller: Optional[ResilientCaller] = None,
+                 analysis_caller: Optional[ResilientCaller] = None):
         load_dotenv()
-        # Initialize Azure OpenAI client
-        self.client = AzureOpenAI(
-            api_key='DaONNemP3XA2BKtvLbGFj1JzgeU1l3Ds0bhuAQgvoQ4XMNqI8RqmJQQJ99BCACHYHv6XJ3w3AAAAACOGD0gz',
-            azure_endpoint='https://kdube-m8h69gib-eastus2.cognitiveservices.azure.com/openai/deployments/gpt-4o-mini/chat/completions?api-version=2025-01-01-preview',
-            api_version='2024-12-01-preview'
-        )
+        # Tests and offline runs pass a stand-in; otherwise the shared async client is used
+        self._client = client
 
-        self.requests_per_minute = 60
-        self.last_request_time = {}
-        self.min_request_interval = 1.0
-
-        self.rate_limiter = RequestRateLimiter(self.requests_per_minute)
+        self.requests_per_minute = requests_per_minute
+        self.max_concurrent_requests = max_concurrent_requests
+        self.criterion_timeout = criterion_timeout
+        self.cache = cache
+        self.output_metrics = output_metrics or get_output_metrics()
+
+        if requests_per_minute is None:
+            # Budgets are per deployment and shared with every other engine and generator
+            self.evaluation_limiter = get_rate_limiter(EVALUATION_MODEL)
+            self.analysis_limiter = get_rate_limiter(ANALYSIS_MODEL)
+        else:
+            # An explicit budget (offline runs, tests) throttles this engine alone
+            self.evaluation_limiter = RateLimiter(EVALUATION_MODEL, requests_per_minute)
+            self.analysis_limiter = RateLimiter(ANALYSIS_MODEL, requests_per_minute)
+        # Retries and circuit breakers are per deployment too, so an outage fails fast everywhere
+        self.evaluation_caller = evaluation_caller or get_resilient_caller(EVALUATION_MODEL)
+        self.analysis_caller = analysis_caller or get_resilient_caller(ANALYSIS_MODEL)
+        self.fluency_extractor = FluencyFeatureExtractor()
+        self.lexical_scorer = lexical_scorer or get_lexical_scorer()
+        self.logger = logging.getLogger(__name__)
 
 
         # Define weights for each scoring criterion
@@ -43,87 +127,53 @@ class ScoringEngine:
             'Pronunciation': 'pronunciation'
         }
 
-    async def evaluate_response(self, response: str, audio_duration: float) -> Dict:
-        """Evaluate a response across all IELTS criteria"""
+    @property
+    def client(self):
+        """Async Azure OpenAI client shared by every session"""
+        return self._client or get_async_client()
+
+    async def evaluate_response(self, response: str, audio_duration: float,
+                                audio: Optional[DecodedAudio] = None,
+                                fluency_features: Optional[FluencyFeatures] = None,
+                                detailed: bool = False,
+                                lexical_profile: Optional[LexicalProfile] = None) -> Dict:
+        """Evaluate a response across all IELTS criteria
+
+        When the decoded ``audio`` (or precomputed ``fluency_features``) is
+        supplied, fluency also reflects pauses and articulation rate
+        measured locally from the recording. A precomputed
+        ``lexical_profile`` saves measuring the transcript again.
+        ``detailed`` scores each criterion with its own prompt and feedback
+        request instead of a single combined prompt.
+        """
+        if detailed:
+            return await self.evaluate_response_detailed(response, audio_duration, audio,
+                                                         fluency_features, lexical_profile)
         try:
-            await self.rate_limiter.wait_if_needed()
-
-            # Create prompt for scoring the response
-            scoring_prompt = f"""
-            Analyze the following IELTS speaking response:
-            "{response}"
-            Duration: {audio_duration} seconds
-
-            Rate each criterion (0-9) and provide brief feedback.
-            Format each line exactly as: Category|Score|Feedback
-
-            Categories to evaluate:
-            - Fluency & Coherence
-            - Lexical Resource
-            - Grammatical Range & Accuracy
-            - Pronunciation
-            """
-
-            print("DEBUG: Sending evaluation request...")
-
-            # Send request to Azure OpenAI for evaluation
-            analysis = self.client.chat.completions.create(
-                model='gpt-4',  # Ensure this matches your Azure deployment
-                messages=[
-                    {"role": "system", "content": "You are an IELTS examiner. Provide clear, structured evaluations."},
-                    {"role": "user", "content": scoring_prompt}
-                ],
-                temperature=0.3,
-            )
-
-            content = analysis.choices[0].message.content
-            print(f"DEBUG: Raw API response: {content[:100]}...")
-
-            scores = {}
-            feedback = {}
-
-            # Parse the response content
-            for line in content.split('\n'):
-                if '|' not in line:
-                    continue
-
-                parts = line.split('|')
-                if len(parts) != 3:
-                    continue
-
-                category, score_str, explanation = parts
-                category = category.strip()
-
-                if category not in self.category_mapping:
-                    continue
-
-                normalized_category = self.category_mapping[category]
-                try:
-                    score = float(score_str.strip())
-                    score = max(0.0, min(9.0, score))  # Clamp between 0-9
-                except ValueError:
-                    score = 5.0  # Default score
-
-                scores[normalized_category] = score
-                feedback[normalized_category] = {
-                    'score': score,
-                    'suggestions': [explanation.strip()],
-                    'examples': []
-                }
-
-            # Ensure all categories are present
-            for full_name, short_name in self.category_mapping.items():
-                if short_name not in scores:
-                    scores[short_name] = 5.0
-                    feedback[short_name] = {
-                        'score': 5.0,
-                        'suggestions': [f"Unable to evaluate {full_name}"],
-                        'examples': []
-                    }
+            cache_key = None
+            evaluation = None
+            if self.cache is not None:
+                cache_key = self.cache.make_key(response, audio_duration,
+                                                self.settings_fingerprint(detailed=False))
+                evaluation = self.cache.get(cache_key)
+
+            if evaluation is None:
+                started = time.perf_counter()
+                evaluation = await self._request_evaluation(response, audio_duration)
+                if cache_key is not None:
+                    self.cache.put(cache_key, evaluation, time.perf_counter() - started)
+            scores, feedback = evaluation['scores'], evaluation['feedback']
+
+            if fluency_features is None and audio is not None:
+                fluency_features = self.fluency_extractor.extract(audio, response)
+            if fluency_features is not None:
+                self._apply_fluency_features(scores, feedback, response, audio_duration,
+                                             fluency_features)
+            self._apply_lexical_profile(feedback, response, lexical_profile)
 
             overall_score = self._calculate_overall_score(scores)
 
-            print(f"DEBUG: Evaluation complete. Scores: {scores}")
+            self.logger.debug(f"Evaluation complete. Scores: {scores}")
 
             return {
                 'scores': scores,
@@ -132,11 +182,180 @@ class ScoringEngine:
             }
 
         except Exception as e:
-            print(f"ERROR in evaluation: {str(e)}")
-            return self._get_default_evaluation()
+            self.logger.error(f"Error in evaluation: {str(e)}")
+            return self._get_default_evaluation(response, lexical_profile)
+
+    def settings_fingerprint(self, detailed: bool) -> str:
+        """Short hash of the prompts and model settings behind an evaluation"""
+        settings = {
+            'model': EVALUATION_MODEL,
+            'system': EVALUATION_SYSTEM_PROMPT,
+            'prompt': EVALUATION_PROMPT,
+            'temperature': 0.3
+        }
+        if detailed:
+            settings = {'model': ANALYSIS_MODEL, 'version': DETAILED_PROMPT_VERSION,
+                        'temperature': 0.3}
+        encoded = json.dumps(settings, sort_keys=True).encode()
+        return hashlib.sha256(encoded).hexdigest()[:16]
+
+    async def _request_evaluation(self, response: str, audio_duration: float) -> Dict:
+        """Ask the LLM for all criteria in one schema-validated JSON reply
+
+        Raises ``StructuredOutputError`` when the reply is still invalid
+        after one repair request.
+        """
+        # Create prompt for scoring the response
+        scoring_prompt = EVALUATION_PROMPT.format(response=response,
+                                                  audio_duration=audio_duration)
+
+        # Send request to Azure OpenAI for evaluation
+        reply = await self.evaluation_caller.call(lambda: request_structured(
+            self.client,
+            [
+                {"role": "system", "content": EVALUATION_SYSTEM_PROMPT},
+                {"role": "user", "content": scoring_prompt}
+            ],
+            validate_evaluation,
+            metrics=self.output_metrics,
+            before_request=self.evaluation_limiter.acquire,
+            model=EVALUATION_MODEL,
+            temperature=0.3,
+            timeout=EVALUATION_TIMEOUT,
+        ))
+
+        feedback = {criterion: self._criterion_feedback(reply[criterion])
+                    for criterion in self.criteria_weights}
+        scores = {criterion: details['score'] for criterion, details in feedback.items()}
+        return {'scores': scores, 'feedback': feedback}
+
+    @staticmethod
+    def _criterion_feedback(value: Dict) -> Dict:
+        """Feedback entry for one validated ``{"score", "feedback"}`` reply member"""
+        return {
+            'score': float(value['score']),
+            'suggestions': [value['feedback'].strip()],
+            'examples': []
+        }
+
+    async def stream_evaluation(self, response: str, audio_duration: float,
+                                audio: Optional[DecodedAudio] = None,
+                                fluency_features: Optional[FluencyFeatures] = None,
+                                lexical_profile: Optional[LexicalProfile] = None
+                                ) -> AsyncIterator[Tuple[str, Dict]]:
+        """Evaluate like ``evaluate_response``, yielding each criterion as soon as it is ready
+
+        The reply is streamed and parsed incrementally, so ``(criterion,
+        feedback)`` pairs arrive while the model is still writing. The last
+        item is ``('overall', evaluation)`` with the complete evaluation. If
+        the stream breaks or does not validate, a regular request with its
+        repair step scores the answer again and every criterion is yielded a
+        second time; the later pair replaces the streamed one.
+        """
+        if fluency_features is None and audio is not None:
+            fluency_features = self.fluency_extractor.extract(audio, response)
+
+        cache_key = None
+        cached = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(response, audio_duration,
+                                            self.settings_fingerprint(detailed=False))
+            cached = self.cache.get(cache_key)
+
+        # ``raw`` is what the LLM said (and what is cached); ``scores`` and
+        # ``feedback`` also carry the acoustic fluency measurements
+        raw = {'scores': {}, 'feedback': {}}
+        scores, feedback = {}, {}
+
+        def add(criterion: str, details: Dict) -> Dict:
+            raw['scores'][criterion] = details['score']
+            raw['feedback'][criterion] = details
+            scores[criterion] = details['score']
+            feedback[criterion] = dict(details, suggestions=list(details['suggestions']),
+                                     examples=list(details['examples']))
+            if criterion == 'fluency' and fluency_features is not None:
+                self._apply_fluency_features(scores, feedback, response, audio_duration,
+                                             fluency_features)
+            if criterion == 'lexical':
+                self._apply_lexical_profile(feedback, response, lexical_profile)
+            return feedback[criterion]
+
+        if cached is not None:
+            for criterion in self.criteria_weights:
+                yield criterion, add(criterion, cached['feedback'][criterion])
+        else:
+            started = time.perf_counter()
+            try:
+                async for criterion, details in self._stream_criteria(response, audio_duration):
+                    if criterion not in scores:
+                        yield criterion, add(criterion, details)
+            except Exception as e:
+                self.logger.warning(f"Streamed evaluation failed: {str(e)}")
+
+            if len(scores) < len(self.criteria_weights):
+                evaluation = await self.evaluate_response(response, audio_duration,
+                                                          fluency_features=fluency_features,
+                                                          lexical_profile=lexical_profile)
+                # Re-send every criterion, replacing the streamed ones, so what was
+                # shown matches the evaluation that is kept
+                for criterion in self.criteria_weights:
+                    yield criterion, evaluation['feedback'][criterion]
+                yield 'overall', evaluation
+                return
+
+            if cache_key is not None:
+                self.cache.put(cache_key, raw, time.perf_counter() - started)
+
+        yield 'overall', {
+            'scores': scores,
+            'feedback': feedback,
+            'overall_score': self._calculate_overall_score(scores)
+        }
+
+    async def _stream_criteria(self, response: str,
+                               audio_duration: float) -> AsyncIterator[Tuple[str, Dict]]:
+        """Stream the combined JSON evaluation, yielding each criterion once it validates"""
+        async def request():
+            await self.evaluation_limiter.acquire()
+            return await self.client.chat.completions.create(
+                model=EVALUATION_MODEL,
+                messages=[
+                    {"role": "system", "content": EVALUATION_SYSTEM_PROMPT},
+                    {"role": "user", "content": EVALUATION_PROMPT.format(
+                        response=response, audio_duration=audio_duration)}
+                ],
+                temperature=0.3,
+                timeout=EVALUATION_TIMEOUT,
+                response_format={"type": "json_object"},
+                stream=True,
+            )
 
-    def _get_default_evaluation(self) -> Dict:
-        """Return default evaluation when scoring fails"""
+        # Hedging does not apply; once the stream opens, criteria arrive as they are written
+        stream = await self.evaluation_caller.call(request, hedge=False)
+        parser = IncrementalObjectParser()
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            for criterion, value in parser.feed(chunk.choices[0].delta.content or ''):
+                if criterion in self.criteria_weights and not validate_criterion(value):
+                    yield criterion, self._criterion_feedback(value)
+
+        self.output_metrics.record('replies')
+        try:
+            errors = validate_evaluation(parser.value())
+        except ValueError:
+            self.output_metrics.record('parse_failures')
+            return
+        if errors:
+            self.output_metrics.record('validation_failures')
+
+    def _get_default_evaluation(self, response: Optional[str] = None,
+                                lexical_profile: Optional[LexicalProfile] = None) -> Dict:
+        """Return default evaluation when scoring fails
+
+        With the ``response`` transcript, lexical resource is still scored
+        locally instead of falling back to the default band.
+        """
         default_scores = {
             category: 5.0 for category in self.category_mapping.values()}
         default_feedback = {
@@ -146,19 +365,47 @@ class ScoringEngine:
                 'examples': []
             } for category in self.category_mapping.values()
         }
+        if response:
+            default_feedback['lexical'] = self._local_lexical_feedback(response, lexical_profile)
+            default_scores['lexical'] = default_feedback['lexical']['score']
 
+        # Marked like a detailed evaluation whose criteria all failed, so callers can tell
         return {
             'scores': default_scores,
             'feedback': default_feedback,
-            'overall_score': 5.0
+            'overall_score': self._calculate_overall_score(default_scores),
+            'partial': True,
+            'failed_criteria': list(self.criteria_weights)
         }
 
-    def _score_fluency(self, response: str, audio_duration: float) -> float:
-        """Score fluency based on speech rate, pauses, and coherence"""
-        # Calculate words per minute
-        words = len(response.split())
-        minutes = audio_duration / 60
-        speech_rate = words / minutes
+    def _local_lexical_feedback(self, response: str,
+                                profile: Optional[LexicalProfile] = None) -> Dict:
+        """Lexical resource feedback from the local scorer alone, without the LLM"""
+        feedback = {'score': 5.0, 'suggestions': [], 'examples': []}
+        self._apply_lexical_profile({'lexical': feedback}, response, profile)
+        feedback['score'] = feedback['metrics']['band']
+        return feedback
+
+    def _apply_lexical_profile(self, feedback: Dict, response: str,
+                               profile: Optional[LexicalProfile] = None) -> None:
+        """Add the locally measured vocabulary metrics and evidence to the lexical feedback"""
+        if profile is None:
+            profile = self.lexical_scorer.analyse(response)
+        feedback['lexical']['suggestions'].extend(self.lexical_scorer.suggestions(profile))
+        feedback['lexical']['examples'].extend(list(profile.collocations)
+                                               + list(profile.advanced_words))
+        feedback['lexical']['metrics'] = profile.to_dict()
+
+    def _score_fluency(self, response: str, audio_duration: float,
+                       features: Optional[FluencyFeatures] = None) -> float:
+        """Score fluency based on speech rate and, when available, measured pauses"""
+        # Prefer articulation rate, which is not dragged down by silence
+        if features is not None and features.speech_time > 0:
+            speech_rate = features.articulation_rate
+        elif audio_duration > 0:
+            speech_rate = len(response.split()) / (audio_duration / 60)
+        else:
+            speech_rate = 0.0
 
         # Define IELTS band score ranges for speech rate
         rate_ranges = {
@@ -171,13 +418,151 @@ class ScoringEngine:
 
         # Score based on speech rate
         base_score = self._score_within_ranges(speech_rate, rate_ranges)
+        if features is None:
+            return base_score
+
+        # Frequent or long hesitations lower the band
+        penalty = 0.0
+        if features.pauses_per_minute > 12:
+            penalty += 1.0
+        elif features.pauses_per_minute > 6:
+            penalty += 0.5
+        if features.max_pause > 3.0:
+            penalty += 1.0
+        elif features.mean_pause > 1.0:
+            penalty += 0.5
+
+        return max(0.0, min(9.0, base_score - penalty))
+
+    def _apply_fluency_features(self, scores: Dict, feedback: Dict, response: str,
+                                audio_duration: float, features: FluencyFeatures) -> None:
+        """Blend the acoustic fluency band into the evaluation"""
+        acoustic_score = self._score_fluency(response, audio_duration, features)
+        # The LLM only sees the transcript (coherence); the audio shows delivery
+        scores['fluency'] = round((scores['fluency'] + acoustic_score) / 2, 1)
+        feedback['fluency']['score'] = scores['fluency']
+        feedback['fluency']['suggestions'].extend(self._fluency_suggestions(features))
+        feedback['fluency']['metrics'] = features.to_dict()
+
+    def _fluency_suggestions(self, features: FluencyFeatures) -> List[str]:
+        """Turn measured fluency features into feedback text"""
+        suggestions = [
+            f"You spoke at about {features.articulation_rate:.0f} words per minute, "
+            f"with {features.pause_count} noticeable pauses"
+            + (f" (longest {features.max_pause:.1f}s)." if features.pause_count else ".")
+        ]
+        if features.pauses_per_minute > 6:
+            suggestions.append("Reduce hesitation: plan your next point while finishing the "
+                               "current one, or use natural fillers such as 'well' or 'let me think'.")
+        if features.max_pause > 3.0:
+            suggestions.append("Avoid long silences; if you lose your idea, paraphrase or "
+                               "give an example to keep talking.")
+        if 0 < features.articulation_rate < 110:
+            suggestions.append("Try to speak at a slightly quicker, more natural pace.")
+        elif features.articulation_rate > 210:
+            suggestions.append("Slow down a little so each idea comes across clearly.")
+        return suggestions
+
+    async def evaluate_response_detailed(self, response: str, audio_duration: float,
+                                         audio: Optional[DecodedAudio] = None,
+                                         fluency_features: Optional[FluencyFeatures] = None,
+                                         lexical_profile: Optional[LexicalProfile] = None) -> Dict:
+        """Score every criterion concurrently, each with its own feedback request
+
+        Criteria run in parallel with at most ``max_concurrent_requests``
+        LLM calls in flight, so latency is about that of the slowest
+        criterion. A criterion that fails or exceeds ``criterion_timeout``
+        falls back to the default band; the others are kept and the
+        evaluation is marked ``partial``.
+        """
+        if fluency_features is None and audio is not None:
+            fluency_features = self.fluency_extractor.extract(audio, response)
+
+        # Fluency is measured locally; only its feedback needs the LLM
+        fluency_score = self._score_fluency(response, audio_duration, fluency_features)
+
+        cache_key = None
+        cached = None
+        if self.cache is not None:
+            # The fluency feedback prompt quotes the local band, so it is part of the key
+            cache_key = self.cache.make_key(response, audio_duration,
+                                            self.settings_fingerprint(detailed=True),
+                                            extra=f"fluency={fluency_score}")
+            cached = self.cache.get(cache_key)
+
+        if cached is not None:
+            scores, feedback, failed = cached['scores'], cached['feedback'], []
+        else:
+            started = time.perf_counter()
+            scores, feedback, failed = await self._run_criteria(response, fluency_score,
+                                                                lexical_profile)
+            if cache_key is not None and not failed:
+                self.cache.put(cache_key, {'scores': scores, 'feedback': feedback},
+                               time.perf_counter() - started)
+
+        if fluency_features is not None and 'fluency' not in failed:
+            feedback['fluency']['suggestions'].extend(self._fluency_suggestions(fluency_features))
+            feedback['fluency']['metrics'] = fluency_features.to_dict()
+        if 'lexical' not in failed:
+            self._apply_lexical_profile(feedback, response, lexical_profile)
+
+        return {
+            'scores': scores,
+            'feedback': feedback,
+            'overall_score': self._calculate_overall_score(scores),
+            'partial': bool(failed),
+            'failed_criteria': failed
+        }
+
+    async def _run_criteria(self, response: str, fluency_score: float,
+                            lexical_profile: Optional[LexicalProfile] = None
+                            ) -> Tuple[Dict, Dict, List[str]]:
+        """Fan the criteria out concurrently; returns scores, feedback and failed criteria"""
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        scorers = {
+            'fluency': self._known_score(fluency_score),
+            'lexical': self._score_lexical(response, semaphore),
+            'grammar': self._score_grammar(response, semaphore),
+            'pronunciation': self._score_pronunciation(response, semaphore)
+        }
+        results = await asyncio.gather(*(
+            asyncio.wait_for(self._evaluate_criterion(criterion, scorer, response, semaphore),
+                             self.criterion_timeout)
+            for criterion, scorer in scorers.items()
+        ), return_exceptions=True)
+
+        scores = {}
+        feedback = {}
+        failed = []
+        for criterion, result in zip(scorers, results):
+            if isinstance(result, BaseException):
+                reason = "timed out" if isinstance(result, asyncio.TimeoutError) else str(result)
+                self.logger.warning(f"{criterion} evaluation failed: {reason}")
+                failed.append(criterion)
+                if criterion == 'lexical':
+                    # The local lexical band needs no LLM call
+                    result = self._local_lexical_feedback(response, lexical_profile)
+                else:
+                    result = {
+                        'score': 5.0,
+                        'suggestions': [f"Unable to evaluate {criterion}"],
+                        'examples': []
+                    }
+            scores[criterion] = result['score']
+            feedback[criterion] = result
+        return scores, feedback, failed
 
-        # Adjust for coherence using LLM
-        coherence_adjustment = self._assess_coherence(response)
+    async def _evaluate_criterion(self, category: str, scorer, response: str,
+                                  semaphore: asyncio.Semaphore) -> Dict:
+        """Score one criterion, then ask for feedback on that score"""
+        score = await scorer
+        return await self._generate_feedback(category, score, response, semaphore)
 
-        return min(9.0, (base_score + coherence_adjustment) / 2)
+    async def _known_score(self, score: float) -> float:
+        return score
 
-    def _score_lexical(self, response: str) -> float:
+    async def _score_lexical(self, response: str,
+                             semaphore: Optional[asyncio.Semaphore] = None) -> float:
         """Score lexical resource based on vocabulary range and accuracy"""
         prompt = f"""
         Analyze the following response for lexical resource according to IELTS criteria.
@@ -188,10 +573,10 @@ class ScoringEngine:
         """
 
         # Get LLM analysis
-        result = self._get_llm_analysis(prompt)
-        return self._extract_score_from_analysis(result)
+        return await self._get_llm_analysis(prompt, semaphore)
 
-    def _score_grammar(self, response: str) -> float:
+    async def _score_grammar(self, response: str,
+                             semaphore: Optional[asyncio.Semaphore] = None) -> float:
         """Score grammatical range and accuracy"""
         prompt = f"""
         Analyze the following response for grammatical accuracy and range according to IELTS criteria.
@@ -201,9 +586,10 @@ class ScoringEngine:
         Rate from 0-9 and explain why.
         """
 
-        return self._get_llm_analysis(prompt)
+        return await self._get_llm_analysis(prompt, semaphore)
 
-    def _score_pronunciation(self, response: str) -> float:
+    async def _score_pronunciation(self, response: str,
+                                   semaphore: Optional[asyncio.Semaphore] = None) -> float:
         """Score pronunciation using phonetic analysis"""
         # This would ideally use Azure Speech Services' pronunciation assessment
         # For now, we'll use a simplified LLM-based approach
@@ -215,40 +601,58 @@ class ScoringEngine:
         Rate from 0-9 and explain why.
         """
 
-        return self._get_llm_analysis(prompt)
+        return await self._get_llm_analysis(prompt, semaphore)
 
-    async def _get_llm_analysis(self, prompt: str, max_retries: int = 3) -> float:
-        """Get analysis from Azure OpenAI with retry logic"""
-        for attempt in range(max_retries):
-            try:
-                # Add rate limiting check
-                now = datetime.now()
-                if 'analysis' in self.last_request_time:
-                    time_since_last = (now - self.last_request_time['analysis']).total_seconds()
-                    if time_since_last < self.min_request_interval:
-                        await asyncio.sleep(self.min_request_interval - time_since_last)
+    async def _get_llm_analysis(self, prompt: str,
+                                semaphore: Optional[asyncio.Semaphore] = None) -> float:
+        """Get a 0-9 score for ``prompt`` from Azure OpenAI as validated JSON
+
+        Raises when no valid score is produced, so the criterion is reported
+        as failed rather than silently scored 5.0.
+        """
+        messages = [
+            {"role": "system", "content": "You are an IELTS examiner expert."},
+            {"role": "user", "content": prompt + SCORE_REPLY_FORMAT}
+        ]
+
+        async def request():
+            async with semaphore or asyncio.Semaphore(1):
+                return await request_structured(
+                    self.client, messages, validate_score,
+                    metrics=self.output_metrics,
+                    before_request=self.analysis_limiter.acquire,
+                    model=ANALYSIS_MODEL,
+                    temperature=0.3,
+                    timeout=ANALYSIS_TIMEOUT,
+                )
 
-                # Update last request time
-                self.last_request_time['analysis'] = datetime.now()
+        reply = await self.analysis_caller.call(request)
+        return float(reply['score'])
 
+    async def _complete(self, prompt: str, semaphore: Optional[asyncio.Semaphore] = None) -> str:
+        """Get analysis text from Azure OpenAI with retry logic"""
+        async def request():
+            async with semaphore or asyncio.Semaphore(1):
+                await self.analysis_limiter.acquire()
                 response = await self.client.chat.completions.create(
-                    model='gpt-4o-mini',
+                    model=ANALYSIS_MODEL,
                     messages=[
                         {"role": "system", "content": "You are an IELTS examiner expert."},
                         {"role": "user", "content": prompt}
                     ],
                     temperature=0.3,
+                    timeout=ANALYSIS_TIMEOUT,
                 )
-                return self._extract_score_from_analysis(response.choices[0].message.content)
-            except Exception as e:
-                if 'rate_limit' in str(e).lower() and attempt < max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)
-                    continue
-                print(f"Error in LLM analysis (attempt {attempt+1}): {str(e)}")
-                return 5.0
-        return 5.0  # Default score if all retries failed
-
-    def _generate_feedback(self, category: str, score: float, response: str) -> Dict:
+            return response.choices[0].message.content
+
+        try:
+            return await self.analysis_caller.call(request)
+        except Exception as e:
+            self.logger.warning(f"Error in LLM analysis: {str(e)}")
+            return ""  # No analysis if all retries failed
+
+    async def _generate_feedback(self, category: str, score: float, response: str,
+                                 semaphore: Optional[asyncio.Semaphore] = None) -> Dict:
         """Generate detailed feedback for a specific scoring category"""
         prompt = f"""
         Generate specific feedback for the following response in the {category} category.
@@ -261,7 +665,7 @@ class ScoringEngine:
         3. Practice suggestions
         """
 
-        feedback = self._get_llm_analysis(prompt)
+        feedback = await self._complete(prompt, semaphore)
         return {
             'score': score,
             'suggestions': self._parse_feedback(feedback),
@@ -283,21 +687,6 @@ class ScoringEngine:
                 return float(score)
         return 5.0  # Default mid-range score
 
-    def _assess_coherence(self, response: str) -> float:
-        """Assess response coherence"""
-        prompt = "Rate the coherence of this response from 0-9: " + response
-        result = self._get_llm_analysis(prompt)
-        return float(result) if isinstance(result, (int, float)) else 5.0
-
-    def _extract_score_from_analysis(self, analysis: str) -> float:
-        """Extract numerical score from LLM analysis"""
-        try:
-            import re
-            matches = re.findall(r'\b[0-9](?:\.[0-9])?\b', str(analysis))
-            return float(matches[0]) if matches else 5.0
-        except:
-            return 5.0
-
     def _parse_feedback(self, feedback: str) -> List[str]:
         """Parse feedback into suggestions list"""
         if not feedback:
@@ -312,33 +701,14 @@ class ScoringEngine:
         lines = str(feedback).split('\n')
         return [line for line in lines if 'example' in line.lower()]
 
-    def _generate_fluency_feedback(self, response: str, score: float) -> Dict:
-        return self._generate_feedback('fluency', score, response)
-
-    def _generate_lexical_feedback(self, response: str, score: float) -> Dict:
-        return self._generate_feedback('vocabulary', score, response)
+    async def _generate_fluency_feedback(self, response: str, score: float) -> Dict:
+        return await self._generate_feedback('fluency', score, response)
 
-    def _generate_grammar_feedback(self, response: str, score: float) -> Dict:
-        return self._generate_feedback('grammar', score, response)
+    async def _generate_lexical_feedback(self, response: str, score: float) -> Dict:
+        return await self._generate_feedback('vocabulary', score, response)
 
-    def _generate_pronunciation_feedback(self, response: str, score: float) -> Dict:
-        return self._generate_feedback('pronunciation', score, response)
+    async def _generate_grammar_feedback(self, response: str, score: float) -> Dict:
+        return await self._generate_feedback('grammar', score, response)
 
-class RequestRateLimiter:
-    def __init__(self, requests_per_minute):
-        self.requests_per_minute = requests_per_minute
-        self.request_times = []
-        self.min_interval = 60.0 / requests_per_minute
-
-    async def wait_if_needed(self):
-        now = datetime.datetime.now()
-        # Remove old requests from history
-        self.request_times = [t for t in self.request_times if (now - t).total_seconds() < 60]
-        
-        if len(self.request_times) >= self.requests_per_minute:
-            oldest = min(self.request_times)
-            wait_time = 60 - (now - oldest).total_seconds()
-            if wait_time > 0:
-                await asyncio.sleep(wait_time)
-        
-        self.request_times.append(now)
+    async def _generate_pronunciation_feedback(self, response: str, score: float) -> Dict:
+        return await self._generate_feedback('pronunciation', score, response)
@@ -0,0 +1,76 @@
+from typing import Callable, Dict, Optional
+import threading
+from .evaluation_cache import get_evaluation_cache
+from .question_generator import QuestionGenerator
+from .scoring import ScoringEngine
+from .session_evaluator import SessionEvaluator
+from .speech_to_text import SpeechToText
+from .transcription_cache import get_transcription_cache
+from .vad import VoiceActivityDetector
+
+
+class ServiceRegistry:
+    """Backend services shared by every session, each built on first use
+
+    The services keep no per-session state: LLM requests go through one
+    client on the background loop, and speech configs and recognizers come
+    from the speech pool, so one instance of each serves all sessions and
+    threads.
+    Pass ``factories`` to replace how a service is built.
+    """
+
+    def __init__(self, factories: Optional[Dict[str, Callable]] = None):
+        self._factories = {
+            'speech_to_text': lambda: SpeechToText(vad=VoiceActivityDetector(),
+                                                   cache=get_transcription_cache()),
+            'question_generator': QuestionGenerator,
+            'scoring_engine': lambda: ScoringEngine(cache=get_evaluation_cache()),
+            'session_evaluator': lambda: SessionEvaluator(self.scoring_engine)
+        }
+        self._factories.update(factories or {})
+        self._services: Dict[str, object] = {}
+        # Reentrant because the session evaluator is built from the scoring engine
+        self._lock = threading.RLock()
+
+    def get(self, name: str):
+        service = self._services.get(name)
+        if service is None:
+            with self._lock:
+                service = self._services.get(name)
+                if service is None:
+                    service = self._services[name] = self._factories[name]()
+        return service
+
+    @property
+    def speech_to_text(self) -> SpeechToText:
+        return self.get('speech_to_text')
+
+    @property
+    def question_generator(self) -> QuestionGenerator:
+        return self.get('question_generator')
+
+    @property
+    def scoring_engine(self) -> ScoringEngine:
+        return self.get('scoring_engine')
+
+    @property
+    def session_evaluator(self) -> SessionEvaluator:
+        return self.get('session_evaluator')
+
+    def built(self) -> list:
+        """Names of the services constructed so far"""
+        with self._lock:
+            return sorted(self._services)
+
+
+_shared_registry: Optional[ServiceRegistry] = None
+_shared_lock = threading.Lock()
+
+
+def get_services() -> ServiceRegistry:
+    """Process-wide registry used by every session"""
+    global _shared_registry
+    with _shared_lock:
+        if _shared_registry is None:
+            _shared_registry = ServiceRegistry()
+        return _shared_registry
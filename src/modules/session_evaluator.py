@@ -0,0 +1,264 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import asyncio
+import logging
+from .fluency import FluencyFeatures
+from .scoring import CRITERION_SCHEMA, EVALUATION_MODEL, EVALUATION_SYSTEM_PROMPT, ScoringEngine
+from .structured_output import compile_schema, request_structured
+
+
+# A batch answers several questions at once, so allow for a longer completion
+BATCH_TIMEOUT = 60.0
+BATCH_PROMPT = """
+            Evaluate each of the following IELTS speaking test answers on its own:
+
+{answers}
+
+            Rate each criterion (0-9) for every answer and provide brief feedback.
+            Reply with only a JSON object with one entry per answer number:
+            {{"answers": [{{"answer": 1,
+                           "fluency": {{"score": 6.5, "feedback": "..."}},
+                           "lexical": {{"score": 6.0, "feedback": "..."}},
+                           "grammar": {{"score": 6.0, "feedback": "..."}},
+                           "pronunciation": {{"score": 7.0, "feedback": "..."}}}}]}}
+
+            The keys stand for Fluency & Coherence, Lexical Resource,
+            Grammatical Range & Accuracy and Pronunciation.
+            """
+ANSWER_TEMPLATE = """[Answer {number}] Part {part}, duration {audio_duration} seconds
+Question: {question}
+Response: "{transcript}\""""
+BATCH_SCHEMA = {
+    'type': 'object',
+    'required': ['answers'],
+    'properties': {
+        'answers': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'required': ['answer', 'fluency', 'lexical', 'grammar', 'pronunciation'],
+                'properties': dict({'answer': {'type': 'integer'}},
+                                   **{criterion: CRITERION_SCHEMA for criterion
+                                      in ['fluency', 'lexical', 'grammar', 'pronunciation']})
+            }
+        }
+    }
+}
+validate_batch = compile_schema(BATCH_SCHEMA)
+
+
+@dataclass(frozen=True)
+class SessionAnswer:
+    """One recorded answer of a Test Mode session"""
+    part: int
+    question: str
+    transcript: str
+    audio_duration: float
+    fluency_features: Optional[FluencyFeatures] = None
+
+
+def round_to_half_band(score: float) -> float:
+    """IELTS reports bands in steps of 0.5"""
+    return round(score * 2) / 2
+
+
+class SessionEvaluator:
+    """End-of-test evaluation of every answer across Parts 1-3
+
+    Answers are packed, in order, into as few requests as the
+    ``max_answers_per_request`` and ``max_words_per_request`` limits allow.
+    The batches are sent concurrently, and any answer a batch fails to
+    cover is re-scored on its own, also concurrently. End-of-test latency
+    is therefore close to that of a single request. The result is one
+    combined band report.
+    """
+
+    def __init__(self, scoring_engine: Optional[ScoringEngine] = None,
+                 max_answers_per_request: int = 6, max_words_per_request: int = 1800,
+                 max_concurrent_requests: int = 4):
+        self.scoring_engine = scoring_engine or ScoringEngine()
+        self.max_answers_per_request = max_answers_per_request
+        self.max_words_per_request = max_words_per_request
+        self.max_concurrent_requests = max_concurrent_requests
+        self.logger = logging.getLogger(__name__)
+
+    def pack(self, answers: List[SessionAnswer]) -> List[List[int]]:
+        """Group answer indices into request-sized batches, keeping test order"""
+        batches = []
+        current, words = [], 0
+        for index, answer in enumerate(answers):
+            if not answer.transcript.strip():
+                continue
+            answer_words = len(answer.transcript.split()) + len(answer.question.split())
+            if current and (len(current) >= self.max_answers_per_request
+                            or words + answer_words > self.max_words_per_request):
+                batches.append(current)
+                current, words = [], 0
+            current.append(index)
+            words += answer_words
+        if current:
+            batches.append(current)
+        return batches
+
+    async def evaluate_test(self, answers: List[SessionAnswer]) -> Dict:
+        """Score every answer and combine them into a single band report"""
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        batches = self.pack(answers)
+        results = await asyncio.gather(*(self._evaluate_batch(batch, answers, semaphore)
+                                         for batch in batches), return_exceptions=True)
+
+        evaluations: Dict[int, Dict] = {}
+        for batch, result in zip(batches, results):
+            if isinstance(result, BaseException):
+                self.logger.error(f"Batch evaluation of answers {batch} failed: {str(result)}")
+                continue
+            evaluations.update(result)
+
+        missing = [index for batch in batches for index in batch if index not in evaluations]
+        if missing:
+            self.logger.warning(f"Scoring {len(missing)} answers individually")
+            singles = await asyncio.gather(*(self._evaluate_single(answers[index], semaphore)
+                                             for index in missing))
+            evaluations.update(zip(missing, singles))
+
+        report = self._combine(answers, evaluations)
+        report['requests'] = len(batches) + len(missing)
+        return report
+
+    async def _evaluate_batch(self, batch: List[int], answers: List[SessionAnswer],
+                              semaphore: asyncio.Semaphore) -> Dict[int, Dict]:
+        """Score one batch; answers missing from the reply are left out"""
+        engine = self.scoring_engine
+        prompt = BATCH_PROMPT.format(answers="\n\n".join(
+            ANSWER_TEMPLATE.format(number=index + 1, part=answers[index].part,
+                                   audio_duration=answers[index].audio_duration,
+                                   question=answers[index].question,
+                                   transcript=answers[index].transcript)
+            for index in batch))
+
+        async with semaphore:
+            # Batches are long and costly, so they are retried but never hedged
+            reply = await engine.evaluation_caller.call(lambda: request_structured(
+                engine.client,
+                [
+                    {"role": "system", "content": EVALUATION_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                validate_batch,
+                metrics=engine.output_metrics,
+                before_request=engine.evaluation_limiter.acquire,
+                model=EVALUATION_MODEL,
+                temperature=0.3,
+                timeout=BATCH_TIMEOUT,
+            ), hedge=False)
+
+        parsed = self._parse_batch(reply, batch)
+        evaluations = {}
+        for index, (scores, feedback) in parsed.items():
+            answer = answers[index]
+            if answer.fluency_features is not None:
+                engine._apply_fluency_features(scores, feedback, answer.transcript,
+                                               answer.audio_duration, answer.fluency_features)
+            evaluations[index] = {
+                'scores': scores,
+                'feedback': feedback,
+                'overall_score': engine._calculate_overall_score(scores)
+            }
+        return evaluations
+
+    def _parse_batch(self, reply: Dict, batch: List[int]) -> Dict[int, tuple]:
+        """Scores and feedback of each validated answer that belongs to ``batch``"""
+        parsed = {}
+        for item in reply['answers']:
+            index = item['answer'] - 1
+            if index not in batch:
+                continue
+
+            scores, feedback = {}, {}
+            for criterion in self.scoring_engine.criteria_weights:
+                score = float(item[criterion]['score'])
+                scores[criterion] = score
+                feedback[criterion] = {
+                    'score': score,
+                    'suggestions': [item[criterion]['feedback'].strip()],
+                    'examples': []
+                }
+            parsed[index] = (scores, feedback)
+        return parsed
+
+    async def _evaluate_single(self, answer: SessionAnswer, semaphore: asyncio.Semaphore) -> Dict:
+        async with semaphore:
+            return await self.scoring_engine.evaluate_response(
+                answer.transcript, answer.audio_duration,
+                fluency_features=answer.fluency_features)
+
+    def _combine(self, answers: List[SessionAnswer], evaluations: Dict[int, Dict]) -> Dict:
+        """Average the answers into test-level bands, weighting by speaking time
+
+        Answers whose evaluation failed or is partial carry fallback scores,
+        so they are reported as unscored and left out of every band.
+        """
+        criteria = list(self.scoring_engine.criteria_weights)
+        scored = sorted(index for index, evaluation in evaluations.items()
+                        if not evaluation.get('partial'))
+        per_answer = []
+        parts: Dict[int, List[int]] = {}
+        for index, answer in enumerate(answers):
+            per_answer.append({
+                'part': answer.part,
+                'question': answer.question,
+                'transcript': answer.transcript,
+                'evaluation': evaluations.get(index) if index in scored else None
+            })
+            if index in scored:
+                parts.setdefault(answer.part, []).append(index)
+
+        def bands(indices: List[int]) -> Dict[str, float]:
+            weights = [max(answers[index].audio_duration, 1.0) for index in indices]
+            return {
+                criterion: round_to_half_band(
+                    sum(evaluations[index]['scores'][criterion] * weight
+                        for index, weight in zip(indices, weights)) / sum(weights))
+                for criterion in criteria
+            }
+
+        unanswered = sum(1 for answer in answers if not answer.transcript.strip())
+        counts = {'unanswered': unanswered,
+                  'unscored': len(answers) - unanswered - len(scored)}
+        if not scored:
+            # Nothing was scored, so there is no band to report
+            return dict({'scores': {}, 'feedback': {}, 'overall_score': None, 'parts': {},
+                         'answers': per_answer}, **counts)
+
+        scores = bands(scored)
+        feedback = {}
+        for criterion in criteria:
+            suggestions = []
+            for index in scored:
+                for suggestion in evaluations[index]['feedback'][criterion]['suggestions']:
+                    if suggestion not in suggestions:
+                        suggestions.append(suggestion)
+            feedback[criterion] = {
+                'score': scores[criterion],
+                'suggestions': suggestions[:5],
+                'examples': []
+            }
+
+        part_reports = {}
+        for part, indices in sorted(parts.items()):
+            part_scores = bands(indices)
+            part_reports[part] = {
+                'scores': part_scores,
+                'overall_score': round_to_half_band(
+                    self.scoring_engine._calculate_overall_score(part_scores))
+            }
+
+        return {
+            'scores': scores,
+            'feedback': feedback,
+            'overall_score': round_to_half_band(
+                self.scoring_engine._calculate_overall_score(scores)),
+            'parts': part_reports,
+            'answers': per_answer,
+            **counts
+        }
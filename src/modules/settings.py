@@ -0,0 +1,11 @@
+from dotenv import load_dotenv
+import os
+
+
+def require_env(name: str) -> str:
+    """Read a required setting from the environment (or ``.env``), failing clearly if unset"""
+    load_dotenv()
+    value = os.getenv(name)
+    if not value:
+        raise RuntimeError(f"{name} is not set; add it to the environment or to .env")
+    return value
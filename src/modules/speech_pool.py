@@ -0,0 +1,166 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Tuple
+import azure.cognitiveservices.speech as speechsdk
+import logging
+import threading
+import time
+from .settings import require_env
+
+
+def create_speech_config(language: str):
+    """Build a speech config for one recognition language"""
+    speech_config = speechsdk.SpeechConfig(subscription=require_env('AZURE_SPEECH_KEY'),
+                                           region=require_env('AZURE_SPEECH_REGION'))
+    speech_config.speech_recognition_language = language
+    return speech_config
+
+
+def create_stream_recognizer(speech_config) -> Tuple[object, object]:
+    """Build a push stream and a recognizer reading from it"""
+    audio_stream = speechsdk.audio.PushAudioInputStream()
+    audio_config = speechsdk.audio.AudioConfig(stream=audio_stream)
+    speech_recognizer = speechsdk.SpeechRecognizer(
+        speech_config=speech_config,
+        audio_config=audio_config
+    )
+    return audio_stream, speech_recognizer
+
+
+@dataclass
+class _Worker:
+    stream: object
+    recognizer: object
+    created_at: float = field(default_factory=time.monotonic)
+
+
+class SpeechServicePool:
+    """Process-wide pool of speech configs and pre-warmed recognizers
+
+    Speech configs are immutable once built and shared per language.
+    The SDK binds a recognizer to its audio stream for life, so a
+    recognizer worker serves a single recognition; the pool keeps a few
+    per language ready and refills them in the background, which moves
+    construction cost off the request path. Idle workers older than
+    ``max_idle_seconds`` or failing ``health_check`` are discarded.
+    """
+
+    def __init__(self, warm_per_language: int = 2, max_idle_seconds: float = 300.0,
+                 config_factory: Callable = create_speech_config,
+                 recognizer_factory: Callable = create_stream_recognizer,
+                 health_check: Optional[Callable] = None):
+        self.warm_per_language = warm_per_language
+        self.max_idle_seconds = max_idle_seconds
+        self.config_factory = config_factory
+        self.recognizer_factory = recognizer_factory
+        self.health_check = health_check
+        self.logger = logging.getLogger(__name__)
+
+        self._configs: Dict[str, object] = {}
+        self._idle: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+        self._refiller = ThreadPoolExecutor(max_workers=1, thread_name_prefix='speech-pool')
+        self._metrics = {
+            'config_hits': 0,
+            'config_creations': 0,
+            'recognizer_hits': 0,
+            'recognizer_cold_creations': 0,
+            'recognizers_discarded': 0
+        }
+
+    def get_config(self, language: str):
+        """Shared speech config for ``language``, created on first use"""
+        with self._lock:
+            speech_config = self._configs.get(language)
+            if speech_config is not None:
+                self._metrics['config_hits'] += 1
+                return speech_config
+
+        try:
+            speech_config = self.config_factory(language)
+        except Exception as e:
+            self.logger.error(f"Failed to initialize Speech Service: {str(e)}")
+            raise RuntimeError(f"Failed to initialize Speech Service: {str(e)}")
+
+        with self._lock:
+            # Another thread may have won the race; keep the first config
+            if language in self._configs:
+                return self._configs[language]
+            self._configs[language] = speech_config
+            self._metrics['config_creations'] += 1
+            return speech_config
+
+    def acquire(self, language: str) -> Tuple[object, object]:
+        """Take a ready ``(stream, recognizer)`` pair, creating one if none is warm"""
+        worker = self._take_idle(language)
+        if worker is None:
+            with self._lock:
+                self._metrics['recognizer_cold_creations'] += 1
+            worker = self._create_worker(language)
+        else:
+            with self._lock:
+                self._metrics['recognizer_hits'] += 1
+
+        self._refiller.submit(self.prewarm, language)
+        return worker.stream, worker.recognizer
+
+    def prewarm(self, language: str, count: Optional[int] = None) -> None:
+        """Top the idle pool for ``language`` up to ``count`` workers"""
+        target = self.warm_per_language if count is None else count
+        while True:
+            with self._lock:
+                if len(self._idle.setdefault(language, deque())) >= target:
+                    return
+            try:
+                worker = self._create_worker(language)
+            except Exception as e:
+                self.logger.warning(f"Failed to pre-warm recognizer for {language}: {str(e)}")
+                return
+            with self._lock:
+                self._idle[language].append(worker)
+
+    def metrics(self) -> Dict[str, int]:
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['idle_recognizers'] = sum(len(idle) for idle in self._idle.values())
+            return metrics
+
+    def _take_idle(self, language: str) -> Optional[_Worker]:
+        while True:
+            with self._lock:
+                idle = self._idle.get(language)
+                if not idle:
+                    return None
+                worker = idle.popleft()
+            if self._is_healthy(worker):
+                return worker
+            with self._lock:
+                self._metrics['recognizers_discarded'] += 1
+
+    def _is_healthy(self, worker: _Worker) -> bool:
+        if time.monotonic() - worker.created_at > self.max_idle_seconds:
+            return False
+        if self.health_check is None:
+            return True
+        try:
+            return bool(self.health_check(worker.recognizer))
+        except Exception:
+            return False
+
+    def _create_worker(self, language: str) -> _Worker:
+        stream, recognizer = self.recognizer_factory(self.get_config(language))
+        return _Worker(stream, recognizer)
+
+
+_shared_pool: Optional[SpeechServicePool] = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_speech_pool() -> SpeechServicePool:
+    """The speech pool shared by every session in this process"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = SpeechServicePool()
+        return _shared_pool
@@ -1,112 +1,252 @@
 import azure.cognitiveservices.speech as speechsdk
-from typing import Tuple
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Iterator, Optional, Tuple
 import streamlit as st
-import logging
+import asyncio
 import io
+import logging
 import wave
 import numpy as np
+from .audio import DecodedAudio, iter_converted_blocks
+from .resampler import resample_poly, to_int16
+from .speech_pool import SpeechServicePool, get_speech_pool
+from .transcription_cache import TranscriptionCache
+from .vad import TimingMap, VoiceActivityDetector
 
 
-class SpeechToText:
-    """Handles speech-to-text conversion using Azure Speech Services"""
+SPEECH_SAMPLE_RATE = 16000
 
-    def __init__(self):
+# Azure reports offsets and durations in 100-nanosecond ticks
+TICKS_PER_SECOND = 10_000_000
 
-        self.speech_key = 'B2iQAgBkwWi57F5UhDbtCIzsaIszhmuKc00D75G7d7V0aGlAp4fIJQQJ99BCACYeBjFXJ3w3AAAYACOGfofL'
-        self.speech_region = 'eastus'
-        self.logger = logging.getLogger(__name__)
 
-        try:
-            self.speech_config = speechsdk.SpeechConfig(
-                subscription=self.speech_key,
-                region=self.speech_region
-            )
-            self.speech_config.speech_recognition_language = "en-US"
-        except Exception as e:
-            self.logger.error(f"Failed to initialize Speech Service: {str(e)}")
-            raise RuntimeError(
-                f"Failed to initialize Speech Service: {str(e)}")
+@dataclass
+class TranscriptionSegment:
+    """A partial or final recognition hypothesis from continuous recognition"""
+    text: str
+    is_final: bool
+    offset: float = 0.0
+    duration: float = 0.0
 
-    def transcribe_audio(self, audio_file) -> Tuple[bool, str]:
-            
-        try:
-            audio_bytes = self.convert_audio_format(audio_file)
 
-            audio_stream = speechsdk.audio.PushAudioInputStream()
-            audio_stream.write(audio_bytes)
-            audio_stream.close()
+class SpeechToText:
+    """Handles speech-to-text conversion using Azure Speech Services"""
 
-            audio_config = speechsdk.audio.AudioConfig(stream=audio_stream)
-            speech_recognizer = speechsdk.SpeechRecognizer(
-                speech_config=self.speech_config,
-                audio_config=audio_config
-            )
+    def __init__(self, recognizer_factory: Optional[Callable] = None,
+                 vad: Optional[VoiceActivityDetector] = None,
+                 cache: Optional[TranscriptionCache] = None,
+                 pool: Optional[SpeechServicePool] = None):
 
-            result = speech_recognizer.recognize_once()
+        self.logger = logging.getLogger(__name__)
+        # Default recognition language; the instance is shared, so sessions pass theirs per call
+        self.language = "en-US"
+        # Configs and recognizers come from a process-wide pool
+        self.pool = pool or get_speech_pool()
+        # Swappable so tests can replay scripted recognition events
+        self.recognizer_factory = recognizer_factory or self._acquire_recognizer
+        self.chunk_size = 3200  # 100ms of 16kHz 16-bit mono audio
+        # Optional silence trimming applied before audio is sent to Azure
+        self.vad = vad
+        # Repeat submissions of the same recording are answered from here
+        self.cache = cache
+
+        # Fail early if the speech service cannot be configured
+        self.pool.get_config(self.language)
+
+    @property
+    def speech_config(self):
+        """Shared, read-only speech config for the default language"""
+        return self.pool.get_config(self.language)
+
+    def _acquire_recognizer(self, speech_config) -> Tuple[object, object]:
+        return self.pool.acquire(speech_config.speech_recognition_language)
+
+    def transcribe_audio(self, audio_file, language: Optional[str] = None) -> Tuple[bool, str]:
+        """Transcribe a complete recording, blocking until recognition ends"""
+        return asyncio.run(self.transcribe(audio_file, language))
+
+    async def transcribe(self, audio_file, language: Optional[str] = None) -> Tuple[bool, str]:
+        """Transcribe a complete recording using continuous recognition"""
+        try:
+            segments = [segment.text async for segment
+                        in self.transcribe_stream(audio_file, language=language)
+                        if segment.is_final]
 
-            if result.reason == speechsdk.ResultReason.RecognizedSpeech:
-                return True, result.text
-            else:
-                self.logger.warning(f"Recognition failed: {result.reason}")
-                return False, "No speech recognized"
+            if segments:
+                return True, " ".join(segments)
+            self.logger.warning("Recognition finished without any speech")
+            return False, "No speech recognized"
 
         except Exception as e:
             self.logger.error(f"Transcription error: {str(e)}")
             return False, str(e)
 
+    async def transcribe_stream(self, audio_file, timing: Optional[TimingMap] = None,
+                                language: Optional[str] = None) -> AsyncIterator[TranscriptionSegment]:
+        """Stream audio to the recognizer in chunks and yield hypotheses as they arrive
+
+        ``audio_file`` may be a WAV upload or an already decoded ``DecodedAudio``.
+        ``language`` overrides the default recognition language for this call.
+        Pass ``timing`` when the audio already went through
+        ``prepare_for_recognition``; it is then sent as-is. Without a VAD or
+        cache, uploads are converted and sent block by block. With either one
+        (as in the app), the clip is first converted block by block into one
+        16kHz mono array, which trimming and caching then work on. Partial hypotheses
+        have ``is_final=False`` and may be revised; final segments are stable
+        and together make up the full transcript. Segment offsets are always
+        relative to the original, untrimmed recording.
+        """
+        language = language or self.language
+        if language not in self.get_supported_languages():
+            raise ValueError(f"Unsupported recognition language: {language}")
+
+        cache_key = None
+        if timing is None and self.vad is None and self.cache is None:
+            # Nothing needs the whole clip, so convert and send it block by block
+            pcm_blocks = (block.tobytes() for block in self.convert_audio_stream(audio_file))
+        else:
+            if timing is None:
+                audio, timing = self.prepare_for_recognition(audio_file)
+            else:
+                audio = audio_file
+
+            if self.cache is not None:
+                cache_key = self.cache.make_key(audio, language)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    self.logger.info("Transcription served from cache")
+                    for segment in cached:
+                        yield TranscriptionSegment(is_final=True, **segment)
+                    return
+
+            # The push stream expects raw 16kHz 16-bit mono PCM, without a WAV header
+            pcm_blocks = [audio.pcm]
+
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        def emit(item):
+            loop.call_soon_threadsafe(events.put_nowait, item)
+
+        def on_recognizing(evt):
+            if evt.result.text:
+                emit(self._to_segment(evt.result, False, timing))
+
+        def on_recognized(evt):
+            if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech and evt.result.text:
+                emit(self._to_segment(evt.result, True, timing))
+
+        def on_canceled(evt):
+            details = evt.cancellation_details
+            if details.reason == speechsdk.CancellationReason.Error:
+                emit(RuntimeError(f"Recognition canceled: {details.error_details}"))
+            emit(done)
+
+        audio_stream, speech_recognizer = self.recognizer_factory(self.pool.get_config(language))
+        speech_recognizer.recognizing.connect(on_recognizing)
+        speech_recognizer.recognized.connect(on_recognized)
+        speech_recognizer.canceled.connect(on_canceled)
+        speech_recognizer.session_stopped.connect(lambda evt: emit(done))
+
+        await loop.run_in_executor(
+            None, lambda: speech_recognizer.start_continuous_recognition_async().get())
+        try:
+            for pcm in pcm_blocks:
+                for start in range(0, len(pcm), self.chunk_size):
+                    audio_stream.write(bytes(pcm[start:start + self.chunk_size]))
+                    # Give the event loop a chance to deliver hypotheses between chunks
+                    await asyncio.sleep(0)
+            audio_stream.close()
+
+            finals = []
+            while True:
+                item = await events.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                if item.is_final:
+                    finals.append({'text': item.text, 'offset': item.offset,
+                                   'duration': item.duration})
+                yield item
+
+            if cache_key and finals:
+                self.cache.put(cache_key, finals)
+        finally:
+            await loop.run_in_executor(
+                None, lambda: speech_recognizer.stop_continuous_recognition_async().get())
+
+    def _to_segment(self, result, is_final: bool,
+                    timing: Optional[TimingMap]) -> TranscriptionSegment:
+        """Convert an SDK recognition result into a transcription segment"""
+        start = result.offset / TICKS_PER_SECOND
+        end = start + result.duration / TICKS_PER_SECOND
+        if timing is not None:
+            start, end = timing.to_original(start), timing.to_original(end)
+        return TranscriptionSegment(
+            text=result.text,
+            is_final=is_final,
+            offset=start,
+            duration=end - start
+        )
+
     def get_supported_languages(self) -> list:
         """Get list of supported languages"""
         return ["en-US", "en-GB", "en-AU"]  # Add more as needed
 
-    def set_language(self, language_code: str) -> None:
-        """Set recognition language"""
-        if language_code in self.get_supported_languages():
-            self.speech_config.speech_recognition_language = language_code
+    def prepare_audio(self, audio_file) -> DecodedAudio:
+        """Decode (if needed) and convert audio to 16kHz mono for the Speech SDK
 
-
-    def convert_audio_format(self, audio_file) -> bytes:
-        """Convert audio to format required by Azure Speech SDK"""
+        Uploads are converted block by block, so only the 16kHz mono result is
+        held in full, never a full-length downmix or resampling buffer.
+        """
         try:
-            # Read input WAV file
-            with wave.open(io.BytesIO(audio_file.read()), 'rb') as wav_file:
-                # Get original parameters
-                channels = wav_file.getnchannels()
-                sample_width = wav_file.getsampwidth()
-                framerate = wav_file.getframerate()
-                
-                # Read audio data
-                audio_data = np.frombuffer(wav_file.readframes(-1), dtype=np.int16)
-                
-                # Convert to mono if stereo
-                if channels == 2:
-                    audio_data = audio_data.reshape(-1, 2).mean(axis=1)
-
-                # Resample to 16kHz if needed
-                if framerate != 16000:
-                    audio_data = self.resample(audio_data, framerate, 16000)
-                
-                # Convert to 16-bit PCM
-                audio_data = audio_data.astype(np.int16)
-                
-                # Create output WAV file in memory
-                output = io.BytesIO()
-                with wave.open(output, 'wb') as out_wav:
-                    out_wav.setnchannels(1)  # mono
-                    out_wav.setsampwidth(2)  # 16-bit
-                    out_wav.setframerate(16000)  # 16kHz
-                    out_wav.writeframes(audio_data.tobytes())
-                
-                return output.getvalue()
-                
+            if (isinstance(audio_file, DecodedAudio) and audio_file.channels == 1
+                    and audio_file.sample_rate == SPEECH_SAMPLE_RATE):
+                return audio_file
+            blocks = list(self.convert_audio_stream(audio_file))
+            samples = np.concatenate(blocks) if blocks else np.zeros(0, dtype=np.int16)
+            return DecodedAudio(samples[:, np.newaxis], SPEECH_SAMPLE_RATE)
         except Exception as e:
             self.logger.error(f"Audio conversion error: {str(e)}")
             raise
 
+    def prepare_for_recognition(self, audio_file) -> Tuple[DecodedAudio, TimingMap]:
+        """Convert audio for the Speech SDK and trim silence if a VAD is configured
+
+        Returns the audio to send and the map from its timeline back to the
+        original recording.
+        """
+        audio = self.prepare_audio(audio_file)
+        if self.vad is None:
+            return audio, TimingMap.identity(audio.duration)
+
+        trimmed, timing = self.vad.trim(audio)
+        self.logger.info(
+            f"Trimmed {timing.removed_duration:.1f}s of silence "
+            f"({timing.original_duration:.1f}s -> {timing.trimmed_duration:.1f}s)")
+        return trimmed, timing
+
+    def convert_audio_stream(self, audio_file, block_frames: int = 16384) -> Iterator[np.ndarray]:
+        """Convert audio for the Speech SDK one block at a time, in bounded memory"""
+        return iter_converted_blocks(audio_file, SPEECH_SAMPLE_RATE, block_frames)
+
+    def convert_audio_format(self, audio_file) -> bytes:
+        """Convert audio to format required by Azure Speech SDK"""
+        if self.vad is not None:
+            # Trimming needs the whole clip to estimate the noise floor
+            return self.prepare_for_recognition(audio_file)[0].to_wav_bytes()
+
+        output = io.BytesIO()
+        with wave.open(output, 'wb') as out_wav:
+            out_wav.setnchannels(1)  # mono
+            out_wav.setsampwidth(2)  # 16-bit
+            out_wav.setframerate(SPEECH_SAMPLE_RATE)
+            for block in self.convert_audio_stream(audio_file):
+                out_wav.writeframes(block.tobytes())
+        return output.getvalue()
+
     def resample(self, audio_data: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
         """Resample audio data to target sample rate"""
-        return np.interp(
-            np.linspace(0, len(audio_data), int(len(audio_data) * target_sr / orig_sr)),
-            np.arange(len(audio_data)),
-            audio_data
-        ).astype(np.int16)
-    
+        return to_int16(resample_poly(audio_data, orig_sr, target_sr))
@@ -0,0 +1,252 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import json
+import logging
+import threading
+
+
+Validator = Callable[[Any], List[str]]
+
+_TYPES = {
+    'object': dict,
+    'array': list,
+    'string': str,
+    'integer': int,
+    'number': (int, float),
+    'boolean': bool
+}
+
+
+def compile_schema(schema: Dict, path: str = '$') -> Validator:
+    """Turn a JSON schema subset into a validator function, once
+
+    Supports ``type``, ``properties``, ``required``, ``items``, ``minItems``,
+    ``minimum``, ``maximum`` and ``enum``, which is all the evaluation
+    replies need. The returned function gives a list of error messages,
+    empty when the value is valid.
+    """
+    checks: List[Validator] = []
+
+    expected = schema.get('type')
+    if expected:
+        python_type = _TYPES[expected]
+
+        def check_type(value, python_type=python_type):
+            # bool is an int subclass, but true is not a score
+            if (isinstance(value, bool) and expected != 'boolean') or not isinstance(value, python_type):
+                return [f"{path} should be {expected}"]
+            return []
+        checks.append(check_type)
+
+    if 'enum' in schema:
+        allowed = schema['enum']
+        checks.append(lambda value: [] if value in allowed else [f"{path} should be one of {allowed}"])
+
+    if 'minimum' in schema or 'maximum' in schema:
+        low, high = schema.get('minimum', float('-inf')), schema.get('maximum', float('inf'))
+
+        def check_range(value):
+            if isinstance(value, (int, float)) and not low <= value <= high:
+                return [f"{path} should be between {low} and {high}"]
+            return []
+        checks.append(check_range)
+
+    if expected == 'object':
+        required = schema.get('required', [])
+        properties = {name: compile_schema(sub_schema, f"{path}.{name}")
+                      for name, sub_schema in schema.get('properties', {}).items()}
+
+        def check_object(value):
+            if not isinstance(value, dict):
+                return []
+            errors = [f"{path}.{name} is missing" for name in required if name not in value]
+            for name, validate in properties.items():
+                if name in value:
+                    errors.extend(validate(value[name]))
+            return errors
+        checks.append(check_object)
+
+    if expected == 'array':
+        validate_item = compile_schema(schema.get('items', {}), f"{path}[]")
+        min_items = schema.get('minItems', 0)
+
+        def check_array(value):
+            if not isinstance(value, list):
+                return []
+            errors = [f"{path} should have at least {min_items} items"] if len(value) < min_items else []
+            for item in value:
+                errors.extend(validate_item(item))
+            return errors
+        checks.append(check_array)
+
+    def validate(value) -> List[str]:
+        errors = []
+        for check in checks:
+            errors.extend(check(value))
+            if errors:
+                # Later checks assume the earlier ones passed
+                break
+        return errors
+    return validate
+
+
+def parse_json_reply(content: str) -> Any:
+    """Parse a model reply as JSON, tolerating surrounding prose or code fences"""
+    start = content.find('{')
+    end = content.rfind('}')
+    if start < 0 or end < start:
+        raise ValueError("Reply contains no JSON object")
+    return json.loads(content[start:end + 1])
+
+
+class IncrementalObjectParser:
+    """Emits the members of a streamed top-level JSON object as each one completes
+
+    Text is scanned once, tracking only nesting depth and string state; a
+    member is decoded as soon as the comma or closing brace after it
+    arrives. Anything before the opening brace (such as a code fence) is
+    ignored, and members that fail to decode are skipped; validate the
+    complete reply with ``value()`` at the end.
+    """
+
+    def __init__(self):
+        self.buffer = ''
+        self._position = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._member_start = None
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """Add streamed text and return the ``(key, value)`` members it completed"""
+        self.buffer += text
+        members = []
+        for index in range(self._position, len(self.buffer)):
+            char = self.buffer[index]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+                if self._depth == 1:
+                    self._member_start = index + 1
+            elif char in '}]' or (char == ',' and self._depth == 1):
+                if self._depth == 1 and self._member_start is not None:
+                    member = self._decode(self.buffer[self._member_start:index])
+                    if member:
+                        members.append(member)
+                    self._member_start = index + 1
+                if char != ',':
+                    self._depth -= 1
+        self._position = len(self.buffer)
+        return members
+
+    @staticmethod
+    def _decode(member: str) -> Optional[Tuple[str, Any]]:
+        if not member.strip():
+            return None
+        try:
+            return next(iter(json.loads('{' + member + '}').items()))
+        except ValueError:
+            return None
+
+    def value(self) -> Any:
+        """Parse the complete reply"""
+        return parse_json_reply(self.buffer)
+
+
+class StructuredOutputMetrics:
+    """Counts how often structured replies fail to parse or validate and need repair"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.replies = 0
+        self.parse_failures = 0
+        self.validation_failures = 0
+        self.repairs = 0
+        self.repairs_succeeded = 0
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            failures = self.parse_failures + self.validation_failures
+            return {
+                'replies': self.replies,
+                'parse_failures': self.parse_failures,
+                'validation_failures': self.validation_failures,
+                'repairs': self.repairs,
+                'repairs_succeeded': self.repairs_succeeded,
+                'failure_rate': failures / self.replies if self.replies else 0.0,
+                'repair_rate': self.repairs / self.replies if self.replies else 0.0
+            }
+
+
+_shared_metrics: Optional[StructuredOutputMetrics] = None
+
+
+def get_output_metrics() -> StructuredOutputMetrics:
+    """Process-wide structured output metrics"""
+    global _shared_metrics
+    if _shared_metrics is None:
+        _shared_metrics = StructuredOutputMetrics()
+    return _shared_metrics
+
+
+class StructuredOutputError(ValueError):
+    """The model did not produce valid structured output, even after a repair request"""
+
+
+async def request_structured(client, messages: List[Dict], validate: Validator,
+                             metrics: Optional[StructuredOutputMetrics] = None,
+                             before_request: Optional[Callable[[], Awaitable]] = None,
+                             **create_kwargs) -> Any:
+    """Request a JSON reply and validate it, with one targeted repair request
+
+    The repair request quotes the invalid reply and the exact validation
+    errors back to the model. Raises ``StructuredOutputError`` if the
+    repaired reply is still invalid.
+    """
+    metrics = metrics or get_output_metrics()
+    logger = logging.getLogger(__name__)
+
+    for attempt in range(2):
+        if before_request is not None:
+            await before_request()
+        reply = await client.chat.completions.create(
+            messages=messages, response_format={"type": "json_object"}, **create_kwargs)
+        content = reply.choices[0].message.content or ''
+        metrics.record('replies')
+
+        try:
+            value = parse_json_reply(content)
+        except ValueError as e:
+            metrics.record('parse_failures')
+            errors = [f"reply is not valid JSON ({str(e)})"]
+        else:
+            errors = validate(value)
+            if not errors:
+                if attempt:
+                    metrics.record('repairs_succeeded')
+                return value
+            metrics.record('validation_failures')
+
+        if attempt:
+            break
+        logger.warning(f"Invalid structured reply, requesting repair: {'; '.join(errors)}")
+        metrics.record('repairs')
+        messages = messages + [
+            {"role": "assistant", "content": content},
+            {"role": "user", "content": "Your reply did not match the required JSON format: "
+                                        + "; ".join(errors)
+                                        + ". Reply again with only the corrected JSON object."}
+        ]
+
+    raise StructuredOutputError(f"Invalid structured reply: {'; '.join(errors)}")
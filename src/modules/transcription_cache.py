@@ -0,0 +1,88 @@
+from pathlib import Path
+from typing import List, Optional
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from .audio import DecodedAudio
+from .cache import LRUCache
+
+
+class TranscriptionCache:
+    """Transcripts keyed by a hash of the normalized PCM and recognition language
+
+    The in-memory LRU tier is always on; when ``cache_dir`` is set, entries
+    are also written there as small JSON files so they survive restarts.
+    Values are the final segments as ``{'text', 'offset', 'duration'}`` dicts.
+    """
+
+    def __init__(self, max_entries: int = 256, cache_dir: Optional[str] = None):
+        self.memory = LRUCache(max_entries)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.disk_hits = 0
+        self.logger = logging.getLogger(__name__)
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(audio: DecodedAudio, language: str) -> str:
+        """Hash the PCM exactly as it will be sent to the recognizer"""
+        digest = hashlib.sha256()
+        digest.update(f"{language}:{audio.sample_rate}:{audio.channels}:".encode())
+        digest.update(audio.pcm)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[List[dict]]:
+        segments = self.memory.get(key)
+        if segments is not None or not self.cache_dir:
+            return segments
+
+        path = self.cache_dir / f"{key}.json"
+        try:
+            segments = json.loads(path.read_text())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable transcription cache entry {path}: {str(e)}")
+            return None
+
+        self.disk_hits += 1
+        self.memory.put(key, segments)
+        return segments
+
+    def put(self, key: str, segments: List[dict]) -> None:
+        self.memory.put(key, segments)
+        if not self.cache_dir:
+            return
+
+        # Write to a temporary file first so readers never see a partial entry
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w') as temp_file:
+                json.dump(segments, temp_file)
+            os.replace(temp_path, self.cache_dir / f"{key}.json")
+        except OSError as e:
+            self.logger.warning(f"Failed to persist transcription cache entry: {str(e)}")
+
+    def stats(self) -> dict:
+        stats = self.memory.stats()
+        stats['disk_hits'] = self.disk_hits
+        return stats
+
+
+_shared_cache: Optional[TranscriptionCache] = None
+
+
+def get_transcription_cache() -> TranscriptionCache:
+    """Process-wide cache shared by every session
+
+    Set ``TRANSCRIPTION_CACHE_DIR`` to enable the on-disk tier.
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = TranscriptionCache(
+            max_entries=int(os.getenv('TRANSCRIPTION_CACHE_SIZE', '256')),
+            cache_dir=os.getenv('TRANSCRIPTION_CACHE_DIR')
+        )
+    return _shared_cache
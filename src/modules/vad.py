@@ -0,0 +1,131 @@
+from dataclasses import dataclass
+from typing import List, Tuple
+import numpy as np
+from .audio import DecodedAudio, frame_rms, zero_crossing_rate
+
+
+@dataclass(frozen=True)
+class TimingMap:
+    """Maps positions in trimmed audio back to the original recording
+
+    Each segment is ``(original_start, trimmed_start, duration)`` in seconds;
+    together they describe which parts of the original survived trimming.
+    """
+    segments: Tuple[Tuple[float, float, float], ...]
+    original_duration: float
+
+    @classmethod
+    def identity(cls, duration: float) -> 'TimingMap':
+        return cls(((0.0, 0.0, duration),), duration)
+
+    @property
+    def trimmed_duration(self) -> float:
+        if not self.segments:
+            return 0.0
+        _, trimmed_start, duration = self.segments[-1]
+        return trimmed_start + duration
+
+    @property
+    def removed_duration(self) -> float:
+        return self.original_duration - self.trimmed_duration
+
+    def to_original(self, trimmed_time: float) -> float:
+        """Convert a time in the trimmed audio into the original timeline"""
+        if not self.segments:
+            return trimmed_time
+        starts = [trimmed_start for _, trimmed_start, _ in self.segments]
+        index = max(0, int(np.searchsorted(starts, trimmed_time, side='right')) - 1)
+        original_start, trimmed_start, _ = self.segments[index]
+        return original_start + (trimmed_time - trimmed_start)
+
+
+class VoiceActivityDetector:
+    """Energy and zero-crossing voice activity detector used to trim silence
+
+    Frames louder than the adaptive threshold count as speech, as do
+    slightly quieter frames with a high zero-crossing rate (unvoiced
+    consonants such as "s" and "f"). Leading and trailing silence is
+    removed and internal gaps longer than ``max_gap_ms`` are shortened
+    to that length.
+    """
+
+    def __init__(self, frame_ms: int = 20, threshold_db: float = 12.0,
+                 min_level_dbfs: float = -50.0, zcr_threshold: float = 0.25,
+                 padding_ms: int = 200, max_gap_ms: int = 700):
+        self.frame_ms = frame_ms
+        self.threshold_db = threshold_db
+        self.min_level_dbfs = min_level_dbfs
+        self.zcr_threshold = zcr_threshold
+        self.padding_ms = padding_ms
+        self.max_gap_ms = max_gap_ms
+
+    def speech_mask(self, audio: DecodedAudio) -> np.ndarray:
+        """Per-frame boolean mask of detected speech"""
+        samples = audio.to_mono().samples
+        frame_length = max(1, audio.sample_rate * self.frame_ms // 1000)
+        if len(samples) < frame_length:
+            return np.zeros(0, dtype=bool)
+
+        level = 20 * np.log10(frame_rms(samples, frame_length) / 32768 + 1e-10)
+        noise_floor = np.percentile(level, 10)
+        threshold = max(noise_floor + self.threshold_db, self.min_level_dbfs)
+
+        voiced = level > threshold
+        unvoiced = ((level > threshold - 6)
+                    & (zero_crossing_rate(samples, frame_length) > self.zcr_threshold))
+        mask = voiced | unvoiced
+
+        # Pad speech regions so word onsets and tails are not clipped
+        padding = self.padding_ms // self.frame_ms
+        if padding and mask.any():
+            mask = np.convolve(mask, np.ones(2 * padding + 1), mode='same') > 0
+        return mask
+
+    def trim(self, audio: DecodedAudio) -> Tuple[DecodedAudio, TimingMap]:
+        """Remove leading/trailing silence and collapse long pauses
+
+        Returns the trimmed audio and the map back to original time. Audio
+        without any detected speech is returned unchanged.
+        """
+        audio = audio.to_mono()
+        mask = self.speech_mask(audio)
+        if not mask.any():
+            return audio, TimingMap.identity(audio.duration)
+
+        frame_length = audio.sample_rate * self.frame_ms // 1000
+        keep = self._kept_ranges(mask)
+
+        segments: List[Tuple[float, float, float]] = []
+        pieces = []
+        trimmed_frames = 0
+        for start_frame, end_frame in keep:
+            start = int(start_frame) * frame_length
+            # The last frame also takes the partial frame left over by framing
+            end = audio.frames if end_frame == len(mask) else int(end_frame) * frame_length
+            pieces.append(audio.samples[start:end])
+            segments.append((start / audio.sample_rate,
+                             trimmed_frames / audio.sample_rate,
+                             (end - start) / audio.sample_rate))
+            trimmed_frames += end - start
+
+        samples = pieces[0] if len(pieces) == 1 else np.concatenate(pieces)
+        return (DecodedAudio(samples, audio.sample_rate),
+                TimingMap(tuple(segments), audio.duration))
+
+    def _kept_ranges(self, mask: np.ndarray) -> List[Tuple[int, int]]:
+        """Frame ranges to keep: speech plus up to max_gap_ms of each pause"""
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+        starts, ends = edges[0::2], edges[1::2]
+
+        max_gap = self.max_gap_ms // self.frame_ms
+        head = max_gap // 2
+        ranges = []
+        range_start, range_end = starts[0], ends[0]
+        for start, end in zip(starts[1:], ends[1:]):
+            if start - range_end > max_gap:
+                # Keep the start of the pause here and its end before the next run
+                ranges.append((range_start, range_end + head))
+                range_start = start - (max_gap - head)
+            range_end = end
+        ranges.append((range_start, range_end))
+        return ranges
@@ -1,8 +1,10 @@
 import streamlit as st
 from components.practice.session_state import init_session_state
 from components.practice.sidebar import create_sidebar
+from components.test_mode.test_mode import (render_part_one, render_part_two,
+                                            render_part_three, render_test_report)
 
-def main():
+async def main():
     st.set_page_config(
         page_title="Test Mode",
         page_icon="📝",
@@ -23,25 +25,47 @@ def main():
     
     if not st.session_state.test_active:
         if st.button("Start Test", type="primary"):
+            # The whole script is generated now, so the timed test never waits on the LLM
+            with st.spinner("Preparing your test..."):
+                try:
+                    await st.session_state.test_manager.start_test()
+                except Exception as e:
+                    st.error(f"Could not prepare the test: {str(e)}")
+                    return
             st.session_state.test_active = True
+            st.session_state.test_complete = False
+            st.session_state.responses = []
             st.rerun()
     else:
-        render_test_interface()
+        await render_test_interface()
 
-def render_test_interface():
-    current_part = st.session_state.get('test_part', 1)
+async def render_test_interface():
+    session = st.session_state.test_manager.session
+    if session is None:
+        st.session_state.test_active = False
+        st.rerun()
+    if session.complete:
+        await render_test_report()
+        if st.button("New Test"):
+            st.session_state.test_active = False
+            st.rerun()
+        return
+
+    current_part = session.part
+    st.session_state.test_part = current_part
     
     # Show progress
-    st.progress(current_part/3)
+    st.progress(session.progress())
     st.caption(f"Part {current_part} of 3")
     
     # Render appropriate test section
     if current_part == 1:
-        render_part_one()
+        await render_part_one()
     elif current_part == 2:
-        render_part_two()
+        await render_part_two()
     else:
-        render_part_three()
+        await render_part_three()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import asyncio
+    asyncio.run(main())
@@ -0,0 +1,22 @@
+"""Synthetic speech and silence shared by the audio analysis tests"""
+import numpy as np
+
+from modules.audio import DecodedAudio
+
+SAMPLE_RATE = 16000
+
+
+def tone(seconds, frequency=200):
+    """A steady voiced sound standing in for speech"""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return 8000 * np.sin(2 * np.pi * frequency * t)
+
+
+def silence(seconds, rng=np.random.default_rng(0)):
+    """Low background noise"""
+    return rng.normal(0, 30, int(seconds * SAMPLE_RATE))
+
+
+def make_audio(*parts):
+    samples = np.concatenate(parts).astype(np.int16)
+    return DecodedAudio(samples[:, np.newaxis], SAMPLE_RATE)
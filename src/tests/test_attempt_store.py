@@ -0,0 +1,150 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from modules.attempt_store import Attempt, AttemptStore
+from modules.local_services import LocalChatClient
+from modules.practice_manager import PracticeModeManager
+from modules.question_generator import QuestionGenerator
+from modules.question_pool import QuestionPool
+from modules.services import ServiceRegistry
+
+
+def make_attempt(session_id='s1', topic='Travel', number=0, created_at=None, user_id='learner'):
+    evaluation = {'overall_score': 6.5,
+                  'feedback': {criterion: {'score': 6.5, 'suggestions': [], 'examples': []}
+                               for criterion in LocalChatClient.CRITERIA}}
+    return Attempt(user_id, session_id, topic, f"Question {number}?", f"Answer {number}",
+                   evaluation, 12.0, created_at if created_at is not None else 1000.0 + number)
+
+
+class TestAttemptStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.directory.name, 'attempts.db')
+        self.store = AttemptStore(self.db_path)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_database_uses_wal(self):
+        mode = sqlite3.connect(self.db_path).execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, 'wal')
+
+    def test_attempts_round_trip(self):
+        self.store.start_session('s1', 'learner', 'Travel')
+        for number in range(3):
+            self.store.record(make_attempt(number=number))
+        self.assertTrue(self.store.flush(timeout=5))
+
+        attempts = self.store.session_attempts('s1', 'learner')
+        self.assertEqual([attempt.question for attempt in attempts],
+                         ["Question 0?", "Question 1?", "Question 2?"])
+        self.assertEqual(attempts[0], make_attempt(number=0))
+
+    def test_writes_are_batched(self):
+        for number in range(500):
+            self.store.record(make_attempt(number=number))
+        self.store.flush(timeout=5)
+        stats = self.store.stats()
+        self.assertEqual(stats['written'], 500)
+        self.assertEqual(stats['pending'], 0)
+        self.assertLess(stats['batches'], 50)
+
+    def test_a_failing_row_does_not_drop_its_batch(self):
+        self.store.record(make_attempt(number=0))
+        # NOT NULL violation, rejected by SQLite
+        self.store.record(Attempt('learner', 's1', 'Travel', "Bad?", None, None, 1.0, 1001.0))
+        self.store.record(make_attempt(number=2))
+        self.assertTrue(self.store.flush(timeout=5))
+
+        attempts = self.store.session_attempts('s1', 'learner')
+        self.assertEqual([attempt.question for attempt in attempts], ["Question 0?", "Question 2?"])
+        self.assertEqual(self.store.stats()['written'], 2)
+
+    def test_history_is_newest_first_and_filtered(self):
+        self.store.record(make_attempt(topic='Travel', number=1))
+        self.store.record(make_attempt(topic='Food', number=2))
+        self.store.record(make_attempt(topic='Travel', number=3))
+        self.store.record(make_attempt(number=4, user_id='someone else'))
+        self.store.flush(timeout=5)
+
+        self.assertEqual([attempt.question for attempt in self.store.history('learner')],
+                         ["Question 3?", "Question 2?", "Question 1?"])
+        travel = self.store.history('learner', topic='Travel', since=1002.0)
+        self.assertEqual([attempt.question for attempt in travel], ["Question 3?"])
+
+    def test_history_survives_a_restart(self):
+        self.store.start_session('s1', 'learner', 'Travel')
+        self.store.record(make_attempt())
+        self.store.close()
+
+        self.store = AttemptStore(self.db_path)
+        self.assertEqual(len(self.store.session_attempts('s1', 'learner')), 1)
+        self.assertEqual(self.store.open_session('learner')['session_id'], 's1')
+
+    def test_ended_sessions_are_not_resumable(self):
+        self.store.start_session('s1', 'learner', 'Travel')
+        self.store.end_session('s1')
+        self.store.flush(timeout=5)
+        self.assertIsNone(self.store.open_session('learner'))
+
+
+class TestPracticeResume(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = AttemptStore(os.path.join(self.directory.name, 'attempts.db'))
+        self.services = ServiceRegistry(
+            {'question_generator': lambda: QuestionGenerator(client=LocalChatClient())})
+        self.pool = QuestionPool(self.services.question_generator)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def make_manager(self, user_id='learner'):
+        return PracticeModeManager(user_id=user_id, question_pool=self.pool,
+                                   services=self.services, attempt_store=self.store)
+
+    def test_session_resumes_in_a_new_manager(self):
+        manager = self.make_manager()
+        manager.start_session('Travel')
+        session_id = manager.session_state['session_id']
+        for number in range(2):
+            self.store.record(make_attempt(session_id=session_id, number=number))
+
+        # A reconnect starts over with a fresh manager
+        resumed = self.make_manager()
+        self.store.flush(timeout=5)
+        unfinished = resumed.resumable_session()
+        self.assertEqual(unfinished['session_id'], session_id)
+
+        exchanges = resumed.resume_session(unfinished)
+        self.assertEqual([exchange['response'] for exchange in exchanges],
+                         ["Answer 0", "Answer 1"])
+        self.assertEqual(resumed.session_state['current_topic'], 'Travel')
+        self.assertEqual(len(resumed.session_state['feedback_history']), 2)
+        self.assertTrue(resumed.session_state['active'])
+
+        resumed.end_session()
+        self.store.flush(timeout=5)
+        self.assertIsNone(resumed.resumable_session())
+
+    def test_other_learners_cannot_resume_a_session(self):
+        manager = self.make_manager()
+        manager.start_session('Travel')
+        session_id = manager.session_state['session_id']
+        self.store.record(make_attempt(session_id=session_id))
+        self.store.flush(timeout=5)
+
+        stranger = self.make_manager(user_id='stranger')
+        self.assertIsNone(stranger.resumable_session())
+        exchanges = stranger.resume_session({'session_id': session_id, 'topic': 'Travel'})
+        self.assertEqual(exchanges, [])
+        self.assertEqual(stranger.session_state['feedback_history'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import io
+import unittest
+import wave
+
+import numpy as np
+
+from modules.audio import DecodedAudio, decode_audio, iter_converted_blocks
+
+
+def make_wav_bytes(samples: np.ndarray, framerate: int, channels: int = 1) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(framerate)
+        wav_file.writeframes(samples.astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+class TestDecodedAudio(unittest.TestCase):
+    def test_decode_mono(self):
+        samples = np.arange(-800, 800, dtype=np.int16)
+        audio = decode_audio(io.BytesIO(make_wav_bytes(samples, 16000)))
+
+        self.assertEqual(audio.sample_rate, 16000)
+        self.assertEqual(audio.channels, 1)
+        self.assertAlmostEqual(audio.duration, 0.1)
+        np.testing.assert_array_equal(audio.samples[:, 0], samples)
+
+    def test_decode_does_not_copy_pcm(self):
+        data = make_wav_bytes(np.zeros(1600), 16000)
+        audio = decode_audio(data)
+
+        self.assertFalse(audio.samples.flags.owndata)
+        self.assertEqual(bytes(audio.pcm), data[-3200:])
+
+    def test_stereo_downmix(self):
+        interleaved = np.array([100, 300, -100, -300, 0, 2], dtype=np.int16)
+        audio = decode_audio(make_wav_bytes(interleaved, 16000, channels=2))
+
+        self.assertEqual(audio.channels, 2)
+        self.assertEqual(audio.frames, 3)
+        np.testing.assert_array_equal(audio.to_mono().samples[:, 0], [200, -200, 1])
+
+    def test_resample_and_encode(self):
+        audio = decode_audio(make_wav_bytes(np.zeros(44100), 44100)).resample(16000)
+
+        self.assertEqual(audio.frames, 16000)
+        with wave.open(io.BytesIO(audio.to_wav_bytes()), 'rb') as wav_file:
+            self.assertEqual(wav_file.getframerate(), 16000)
+            self.assertEqual(wav_file.getnframes(), 16000)
+
+    def test_decoded_audio_passes_through(self):
+        audio = DecodedAudio(np.zeros((10, 1), dtype=np.int16), 16000)
+        self.assertIs(decode_audio(audio), audio)
+
+    def test_rejects_non_wav(self):
+        with self.assertRaises(ValueError):
+            decode_audio(b'not a wav file at all')
+
+
+class TrickleStream(io.BytesIO):
+    """Returns at most a few odd-sized bytes per read, like a slow socket"""
+
+    def read(self, size=-1):
+        return super().read(min(size, 7) if size >= 0 else 7)
+
+
+class TestChunkedConversion(unittest.TestCase):
+    def setUp(self):
+        t = np.arange(44100 * 2) / 44100
+        tone = 8000 * np.sin(2 * np.pi * 440 * t)
+        self.stereo = np.column_stack((tone, tone / 2)).ravel()
+
+    def assert_matches_one_shot(self, data: bytes, block_frames: int, stream=None):
+        expected = decode_audio(data).to_mono().resample(16000).samples[:, 0]
+        blocks = list(iter_converted_blocks(stream or data, 16000, block_frames))
+
+        self.assertTrue(all(len(block) <= 2 * block_frames for block in blocks))
+        result = np.concatenate(blocks)
+        self.assertEqual(len(result), len(expected))
+        self.assertLessEqual(np.abs(result.astype(int) - expected).max(), 1)
+
+    def test_stereo_44k_matches_one_shot(self):
+        self.assert_matches_one_shot(make_wav_bytes(self.stereo, 44100, channels=2), 4096)
+
+    def test_16k_mono_passes_through(self):
+        data = make_wav_bytes(np.arange(-5000, 5000), 16000)
+        result = np.concatenate(list(iter_converted_blocks(data, 16000, 1000)))
+        np.testing.assert_array_equal(result, np.arange(-5000, 5000))
+
+    def test_partial_reads_keep_frames_aligned(self):
+        data = make_wav_bytes(self.stereo[:44100], 44100, channels=2)
+        self.assert_matches_one_shot(data, 1024, stream=TrickleStream(data))
+
+    def test_file_path(self):
+        import tempfile
+        data = make_wav_bytes(self.stereo, 44100, channels=2)
+        with tempfile.NamedTemporaryFile(suffix='.wav') as wav_file:
+            wav_file.write(data)
+            wav_file.flush()
+            self.assert_matches_one_shot(data, 8192, stream=wav_file.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import asyncio
+import csv
+import json
+import tempfile
+import unittest
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from modules.batch_grader import BatchGrader, discover_items
+from modules.local_services import LocalChatClient, SidecarTranscriber
+from modules.scoring import ScoringEngine
+
+
+def write_answer(path: Path, transcript: str, seconds: float = 1.0, framerate: int = 44100):
+    t = np.arange(int(seconds * framerate)) / framerate
+    samples = (6000 * np.sin(2 * np.pi * 200 * t)).astype(np.int16)
+    with wave.open(str(path), 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(framerate)
+        wav_file.writeframes(samples.tobytes())
+    path.with_suffix('.txt').write_text(transcript)
+
+
+class TestBatchGrader(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.answers = self.root / 'answers'
+        (self.answers / 'part1').mkdir(parents=True)
+        write_answer(self.answers / 'part1' / 'a.wav', "I usually travel by train to work.")
+        write_answer(self.answers / 'part1' / 'b.wav', "My hometown is small but lively.", 2.0)
+        (self.answers / 'c.txt').write_text("Technology has changed how we learn.")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def grade(self, output, client=None):
+        grader = BatchGrader(SidecarTranscriber(),
+                             ScoringEngine(client=client or LocalChatClient(),
+                                           requests_per_minute=100_000),
+                             workers=2, api_concurrency=2)
+        return asyncio.run(grader.run(self.answers, output))
+
+    def read_jsonl(self, output):
+        return [json.loads(line) for line in output.read_text().splitlines()]
+
+    def test_discovers_recordings_and_orphan_transcripts(self):
+        ids = [path.relative_to(self.answers).as_posix() for path in discover_items(self.answers)]
+        self.assertEqual(ids, ['c.txt', 'part1/a.wav', 'part1/b.wav'])
+
+    def test_grades_every_answer_offline(self):
+        output = self.root / 'results.jsonl'
+        stats = self.grade(output)
+
+        self.assertEqual(stats, {'skipped': 0, 'graded': 3, 'failed': 0})
+        results = {row['id']: row for row in self.read_jsonl(output)}
+        self.assertEqual(results['part1/a.wav']['transcript'], "I usually travel by train to work.")
+        self.assertAlmostEqual(results['part1/b.wav']['audio_duration'], 2.0, places=1)
+        self.assertTrue(results['c.txt']['duration_estimated'])
+        self.assertIn('metrics', results['part1/a.wav']['evaluation']['feedback']['fluency'])
+
+    def test_resumes_after_restart(self):
+        output = self.root / 'results.jsonl'
+        self.grade(output)
+        lines = output.read_text().splitlines()
+        # Simulate a crash that lost the last answer mid-write
+        output.write_text("\n".join(lines[:2]) + "\n" + lines[2][:10])
+
+        client = LocalChatClient()
+        stats = self.grade(output, client)
+
+        self.assertEqual(stats['skipped'], 2)
+        self.assertEqual(stats['graded'], 1)
+        self.assertEqual(client.calls, 1)
+        # The truncated fragment stays on its own line, followed by the regraded answer
+        lines = output.read_text().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(sorted(json.loads(line)['id'] for line in lines[:2] + lines[3:]),
+                         ['c.txt', 'part1/a.wav', 'part1/b.wav'])
+
+    def test_csv_output(self):
+        output = self.root / 'results.csv'
+        self.grade(output)
+        self.assertEqual(self.grade(output)['graded'], 0)
+
+        with open(output, newline='') as csv_file:
+            rows = list(csv.DictReader(csv_file))
+        self.assertEqual(len(rows), 3)
+        self.assertTrue(all(0 <= float(row['overall_score']) <= 9 for row in rows))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import asyncio
+import time
+import unittest
+
+from modules.fluency import FluencyFeatures
+from modules.local_services import LocalChatClient
+from modules.scoring import ScoringEngine
+
+
+RESPONSE = "I believe technology has changed the way we live and work."
+
+
+class ScriptedChatClient(LocalChatClient):
+    """Local client with a per-prompt delay; prompts containing ``hang_on`` never answer"""
+
+    def __init__(self, delay: float, hang_on: str = None):
+        super().__init__()
+        self.delay = delay
+        self.hang_on = hang_on
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def create(self, model: str, messages: list, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.hang_on and self.hang_on in messages[-1]['content']:
+                await asyncio.sleep(3600)
+            await asyncio.sleep(self.delay)
+            return await super().create(model, messages, **kwargs)
+        finally:
+            self.in_flight -= 1
+
+
+class TestDetailedScoring(unittest.TestCase):
+    def evaluate(self, chat, **kwargs):
+        engine = ScoringEngine(client=chat, requests_per_minute=100_000, **kwargs)
+        return asyncio.run(engine.evaluate_response(RESPONSE, 6.0, detailed=True))
+
+    def test_criteria_run_concurrently(self):
+        chat = ScriptedChatClient(delay=0.2)
+        start = time.perf_counter()
+        evaluation = self.evaluate(chat)
+        elapsed = time.perf_counter() - start
+
+        # Three LLM scores plus four feedback requests; serialized would be 1.4s
+        self.assertEqual(chat.calls, 7)
+        self.assertLess(elapsed, 0.8)
+        self.assertFalse(evaluation['partial'])
+        for criterion in ['fluency', 'lexical', 'grammar', 'pronunciation']:
+            self.assertIn(criterion, evaluation['scores'])
+            self.assertTrue(evaluation['feedback'][criterion]['suggestions'])
+
+    def test_concurrency_is_bounded(self):
+        chat = ScriptedChatClient(delay=0.05)
+        self.evaluate(chat, max_concurrent_requests=2)
+
+        self.assertLessEqual(chat.max_in_flight, 2)
+
+    def test_timed_out_criterion_keeps_other_results(self):
+        chat = ScriptedChatClient(delay=0.01, hang_on="grammatical accuracy")
+        evaluation = self.evaluate(chat, criterion_timeout=0.5)
+
+        self.assertTrue(evaluation['partial'])
+        self.assertEqual(evaluation['failed_criteria'], ['grammar'])
+        self.assertEqual(evaluation['scores']['grammar'], 5.0)
+        self.assertNotEqual(evaluation['feedback']['lexical']['suggestions'],
+                            ["Unable to evaluate lexical"])
+
+    def test_fluency_uses_measured_features(self):
+        features = FluencyFeatures(pause_count=0, mean_pause=0.0, max_pause=0.0,
+                                   articulation_rate=160.0, speech_to_silence=8.0,
+                                   speech_time=5.0, total_duration=6.0)
+        engine = ScoringEngine(client=ScriptedChatClient(delay=0.0),
+                               requests_per_minute=100_000)
+        evaluation = asyncio.run(engine.evaluate_response(
+            RESPONSE, 6.0, fluency_features=features, detailed=True))
+
+        self.assertEqual(evaluation['scores']['fluency'], 9.0)
+        self.assertEqual(evaluation['feedback']['fluency']['metrics'], features.to_dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import asyncio
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from modules.evaluation_cache import EvaluationCache
+from modules.local_services import LocalChatClient
+from modules.scoring import ScoringEngine
+
+
+class TestEvaluationCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.temp_dir.name) / 'evaluations.db')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_key_ignores_case_punctuation_and_nearby_durations(self):
+        cache = EvaluationCache()
+        key = cache.make_key("I like reading, mostly novels.", 6.0, 'v1')
+
+        self.assertEqual(key, cache.make_key("i like reading mostly novels", 8.5, 'v1'))
+        self.assertNotEqual(key, cache.make_key("I like reading, mostly novels.", 12.0, 'v1'))
+        self.assertNotEqual(key, cache.make_key("I like reading, mostly novels.", 6.0, 'v2'))
+
+    def test_hits_return_independent_copies(self):
+        cache = EvaluationCache()
+        cache.put('v1:a', {'scores': {'grammar': 6.0}}, latency=1.5)
+
+        cache.get('v1:a')['scores']['grammar'] = 9.0
+        self.assertEqual(cache.get('v1:a'), {'scores': {'grammar': 6.0}})
+        self.assertEqual(cache.stats()['saved_seconds'], 3.0)
+
+    def test_sqlite_tier_survives_restart(self):
+        EvaluationCache(db_path=self.db_path).put('v1:a', {'overall': 6.5}, latency=2.0)
+        cache = EvaluationCache(db_path=self.db_path)
+
+        self.assertEqual(cache.get('v1:a'), {'overall': 6.5})
+        stats = cache.stats()
+        self.assertEqual(stats['disk_hits'], 1)
+        self.assertEqual(stats['misses'], 0)
+        self.assertEqual(stats['hit_rate'], 1.0)
+
+    def test_entries_expire(self):
+        cache = EvaluationCache(db_path=self.db_path, ttl_seconds=0.05)
+        cache.put('v1:a', {'overall': 6.5}, latency=2.0)
+        time.sleep(0.1)
+
+        self.assertIsNone(cache.get('v1:a'))
+        self.assertIsNone(EvaluationCache(db_path=self.db_path, ttl_seconds=0.05).get('v1:a'))
+
+    def test_invalidate_settings(self):
+        cache = EvaluationCache(db_path=self.db_path)
+        cache.put('old:a', {'overall': 5.0}, latency=1.0)
+        cache.put('new:a', {'overall': 6.0}, latency=1.0)
+        cache.invalidate_settings('old')
+
+        self.assertIsNone(cache.get('old:a'))
+        self.assertIsNone(EvaluationCache(db_path=self.db_path).get('old:a'))
+        self.assertEqual(cache.get('new:a'), {'overall': 6.0})
+
+
+class TestScoringWithCache(unittest.TestCase):
+    def evaluate_twice(self, detailed: bool):
+        chat = LocalChatClient()
+        engine = ScoringEngine(client=chat, requests_per_minute=100_000,
+                               cache=EvaluationCache())
+
+        async def evaluate():
+            first = await engine.evaluate_response("My hometown is small.", 4.0,
+                                                   detailed=detailed)
+            second = await engine.evaluate_response("my hometown is small", 4.2,
+                                                    detailed=detailed)
+            return first, second
+
+        first, second = asyncio.run(evaluate())
+        return chat, engine, first, second
+
+    def test_repeated_answer_skips_llm(self):
+        chat, engine, first, second = self.evaluate_twice(detailed=False)
+
+        self.assertEqual(chat.calls, 1)
+        self.assertEqual(first['scores'], second['scores'])
+        self.assertEqual(engine.cache.stats()['hits'], 1)
+
+    def test_detailed_mode_is_cached_separately(self):
+        chat, engine, first, second = self.evaluate_twice(detailed=True)
+
+        self.assertEqual(chat.calls, 7)
+        self.assertEqual(first['scores'], second['scores'])
+
+
+if __name__ == '__main__':
+    unittest.main()
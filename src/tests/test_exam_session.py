@@ -0,0 +1,92 @@
+import asyncio
+import unittest
+
+from modules.exam_session import ExamScript, ExamSession
+from modules.local_services import LocalChatClient
+from modules.question_generator import QuestionGenerator
+from modules.scoring import ScoringEngine
+from modules.session_evaluator import SessionEvaluator
+
+ANSWER = "I usually travel with my family because we enjoy exploring new places together."
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_script():
+    reply = asyncio.run(QuestionGenerator(client=LocalChatClient()).generate_test_script('Travel'))
+    return ExamScript.from_reply('Travel', reply)
+
+
+class TestExamSession(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.script = make_script()
+        self.session = ExamSession(self.script, clock=self.clock)
+
+    def answer_current(self):
+        self.session.record_answer(self.session.current_question(), ANSWER, 12.0)
+
+    def test_script_covers_all_parts(self):
+        self.assertEqual(len(self.script.part_one), 6)
+        self.assertEqual(len(self.script.cue_card.points), 4)
+        self.assertEqual(len(self.script.part_three), 5)
+
+    def test_answers_move_through_the_parts(self):
+        for question in self.script.part_one:
+            self.assertEqual(self.session.current_question(), question)
+            self.answer_current()
+        self.assertEqual(self.session.phase, 'part2_prep')
+
+        self.session.finish_preparation()
+        self.assertEqual(self.session.current_question(), self.script.cue_card.task)
+        self.answer_current()
+        self.assertEqual(self.session.phase, 'part3')
+
+        for _ in self.script.part_three:
+            self.answer_current()
+        self.assertTrue(self.session.complete)
+        self.assertEqual([answer.part for answer in self.session.answers],
+                         [1] * 6 + [2] + [3] * 5)
+
+    def test_clock_ends_parts(self):
+        self.answer_current()
+        self.clock.now += 299
+        self.assertEqual(self.session.phase, 'part1')
+        self.assertAlmostEqual(self.session.remaining(), 1.0)
+
+        # Part 1 and the preparation minute both ran out while nobody was looking
+        self.clock.now += 61 + 30
+        self.assertEqual(self.session.phase, 'part2_talk')
+        self.assertAlmostEqual(self.session.remaining(), 90.0)
+
+        self.clock.now += 90 + 300
+        self.assertTrue(self.session.complete)
+
+    def test_late_answer_is_kept_for_its_question(self):
+        question = self.session.current_question()
+        self.clock.now += 301
+        self.session.record_answer(question, ANSWER, 20.0)
+        self.assertEqual(self.session.answers[-1].part, 1)
+        self.assertEqual(self.session.phase, 'part2_prep')
+
+    def test_whole_test_is_scored_at_the_end(self):
+        chat = LocalChatClient()
+        evaluator = SessionEvaluator(ScoringEngine(client=chat, requests_per_minute=100_000))
+        while not self.session.complete:
+            self.session.finish_preparation()
+            self.answer_current()
+
+        report = asyncio.run(evaluator.evaluate_test(self.session.answers))
+        self.assertEqual(sorted(report['parts']), [1, 2, 3])
+        self.assertEqual(report['unanswered'], 0)
+        self.assertLessEqual(chat.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
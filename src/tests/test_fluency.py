@@ -0,0 +1,69 @@
+import time
+import unittest
+
+from modules import ScoringEngine
+from modules.fluency import FluencyFeatureExtractor, FluencyFeatures
+
+from .audio_fixtures import make_audio, silence, tone
+
+
+class TestFluencyFeatureExtractor(unittest.TestCase):
+    def setUp(self):
+        self.extractor = FluencyFeatureExtractor()
+
+    def test_counts_internal_pauses_only(self):
+        audio = make_audio(silence(1.0), tone(2.0), silence(0.5), tone(2.0),
+                           silence(1.5), tone(2.0), silence(0.1), tone(1.0), silence(2.0))
+        features = self.extractor.extract(audio, " ".join(["word"] * 20))
+
+        self.assertEqual(features.pause_count, 2)
+        self.assertAlmostEqual(features.max_pause, 1.5, delta=0.05)
+        self.assertAlmostEqual(features.mean_pause, 1.0, delta=0.05)
+        self.assertAlmostEqual(features.speech_time, 7.0, delta=0.1)
+        self.assertAlmostEqual(features.articulation_rate, 20 / (7.0 / 60), delta=5)
+        self.assertAlmostEqual(features.speech_to_silence, 7.0 / 2.1, delta=0.2)
+        self.assertAlmostEqual(features.total_duration, audio.duration)
+
+    def test_silent_recording(self):
+        features = self.extractor.extract(make_audio(silence(2.0)), "")
+        self.assertEqual(features.speech_time, 0.0)
+        self.assertEqual(features.pause_count, 0)
+
+    def test_long_recording_is_fast(self):
+        audio = make_audio(*([tone(0.8), silence(0.4)] * 100))
+        start = time.perf_counter()
+        self.extractor.extract(audio, "word " * 300)
+        self.assertLess(time.perf_counter() - start, 0.05)
+
+
+class TestAcousticFluencyScore(unittest.TestCase):
+    def setUp(self):
+        self.scoring_engine = ScoringEngine()
+        self.response = " ".join(["word"] * 50)
+
+    def features(self, pause_count=2, mean_pause=0.5, max_pause=0.8, rate=160.0):
+        return FluencyFeatures(pause_count, mean_pause, max_pause, rate, 5.0, 18.75, 20.0)
+
+    def test_hesitant_delivery_scores_lower(self):
+        smooth = self.scoring_engine._score_fluency(self.response, 20.0, self.features())
+        hesitant = self.scoring_engine._score_fluency(
+            self.response, 20.0, self.features(pause_count=6, mean_pause=1.5, max_pause=4.0))
+
+        self.assertEqual(smooth, 9.0)
+        self.assertLess(hesitant, smooth)
+
+    def test_fluency_features_feed_evaluation(self):
+        scores = {'fluency': 8.0}
+        feedback = {'fluency': {'score': 8.0, 'suggestions': ['Good coherence'], 'examples': []}}
+        self.scoring_engine._apply_fluency_features(
+            scores, feedback, self.response, 20.0, self.features(pause_count=6, max_pause=4.0))
+
+        # Averaged with the acoustic band of 7.0 (two hesitation penalties)
+        self.assertEqual(scores['fluency'], 7.5)
+        self.assertEqual(feedback['fluency']['score'], scores['fluency'])
+        self.assertEqual(feedback['fluency']['metrics']['pause_count'], 6)
+        self.assertTrue(any('silences' in s for s in feedback['fluency']['suggestions']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import asyncio
+import unittest
+
+import numpy as np
+
+from modules.audio import DecodedAudio
+from modules.incremental_scoring import IncrementalEvaluation
+from modules.local_services import LocalChatClient
+from modules.scoring import ScoringEngine
+from modules.speech_to_text import TranscriptionSegment
+
+SAMPLE_RATE = 16000
+SEGMENTS = [
+    "In my opinion the government should take responsibility for the environment.",
+    "Many people make a decision to commute by car every day.",
+    "That has a significant impact on pollution and climate change.",
+]
+
+
+def make_audio():
+    t = np.arange(SAMPLE_RATE * 2) / SAMPLE_RATE
+    speech = 8000 * np.sin(2 * np.pi * 180 * t)
+    pause = np.random.default_rng(0).normal(0, 30, SAMPLE_RATE)
+    samples = np.concatenate([speech, pause, speech, pause, speech]).astype(np.int16)
+    return DecodedAudio(samples[:, np.newaxis], SAMPLE_RATE)
+
+
+class TestIncrementalEvaluation(unittest.TestCase):
+    def setUp(self):
+        self.engine = ScoringEngine(client=LocalChatClient(), requests_per_minute=100_000)
+        self.audio = make_audio()
+
+    def run_incremental(self, finish):
+        async def run():
+            incremental = IncrementalEvaluation(self.engine, self.audio, self.audio.duration)
+            for text in SEGMENTS:
+                incremental.add_segment(TranscriptionSegment(text[:10], is_final=False))
+                incremental.add_segment(TranscriptionSegment(text, is_final=True))
+            return incremental, await finish(incremental)
+        return asyncio.run(run())
+
+    def test_matches_one_shot_measurements(self):
+        incremental, (features, profile) = self.run_incremental(lambda inc: inc.finish())
+        text = " ".join(SEGMENTS)
+        self.assertEqual(incremental.text, text)
+        self.assertEqual(profile, self.engine.lexical_scorer.analyse(text))
+        self.assertEqual(features, self.engine.fluency_extractor.extract(self.audio, text))
+
+    def test_partial_segments_are_ignored(self):
+        incremental, snapshot = self.run_incremental(
+            lambda inc: asyncio.sleep(0, inc.snapshot()))
+        self.assertEqual(len(incremental.segments), len(SEGMENTS))
+        self.assertEqual(snapshot['words'], len(" ".join(SEGMENTS).split()))
+
+    def test_evaluation_matches_full_evaluation(self):
+        _, evaluation = self.run_incremental(lambda inc: inc.evaluate())
+        expected = asyncio.run(self.engine.evaluate_response(
+            " ".join(SEGMENTS), self.audio.duration, self.audio))
+        self.assertEqual(evaluation['scores'], expected['scores'])
+        self.assertEqual(evaluation['feedback']['lexical']['metrics'],
+                         expected['feedback']['lexical']['metrics'])
+
+    def test_streamed_evaluation(self):
+        async def collect(incremental):
+            return [criterion async for criterion, _ in incremental.stream()]
+        _, criteria = self.run_incremental(collect)
+        self.assertEqual(criteria[-1], 'overall')
+        self.assertEqual(set(criteria[:-1]), set(self.engine.criteria_weights))
+
+
+if __name__ == '__main__':
+    unittest.main()
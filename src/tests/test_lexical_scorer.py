@@ -0,0 +1,128 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from modules.lexical_scorer import LEXICON_DIR, LexicalScorer, Lexicon, mtld
+from modules.local_services import LocalChatClient
+from modules.resilience import ResilientCaller, RetryPolicy
+from modules.scoring import ScoringEngine
+
+
+BASIC = "I like it. I like it very much. It is good. It is very good and I like it."
+ADVANCED = ("In my opinion, the government should take responsibility for protecting the "
+            "environment. Many people make a decision to commute by car, which has a "
+            "significant impact on pollution and contributes to climate change. However, "
+            "I strongly believe that public transport is an essential alternative, and "
+            "it would reduce traffic considerably.")
+EVERYDAY = ("In my free time I usually watch television with my family. We really enjoy "
+            "football, so on Saturday evenings we often watch the big matches together. My "
+            "brother supports a different team, which makes it quite funny, because we always "
+            "argue about the players. Sometimes we also go to the stadium in our city, and the "
+            "atmosphere there is wonderful.")
+
+
+class FailingChatClient(LocalChatClient):
+    async def create(self, model: str, messages: list, **kwargs):
+        raise RuntimeError("rate_limit exceeded")
+
+
+class TestLexicon(unittest.TestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory)
+        for name in ('word_bands.tsv', 'collocations.tsv'):
+            shutil.copy(LEXICON_DIR / name, self.directory / name)
+
+    def test_compiled_arrays_are_memory_mapped(self):
+        lexicon = Lexicon.load(self.directory)
+        self.assertTrue((self.directory / 'words.npy').exists())
+        self.assertEqual(lexicon.words.__class__.__name__, 'memmap')
+
+    def test_rebuilds_when_source_changes(self):
+        Lexicon.load(self.directory)
+        with open(self.directory / 'word_bands.tsv', 'a') as tsv:
+            tsv.write("zyzzyva\t3\n")
+        later = time.time() + 10
+        os.utime(self.directory / 'word_bands.tsv', (later, later))
+        self.assertEqual(Lexicon.load(self.directory).band_of(['zyzzyva'])[0], 3)
+
+    def test_lemmas_and_lookups(self):
+        lexicon = Lexicon.load(self.directory)
+        self.assertEqual(lexicon.lemma('contributes'), 'contribute')
+        self.assertEqual(lexicon.lemma('went'), 'go')
+        bands = lexicon.band_of(['house', 'significant', 'qwertyuiop', 'x' * 200])
+        self.assertEqual(list(bands[2:]), [0, 0])
+        self.assertEqual(bands[1], 3)
+
+    def test_known_band_members(self):
+        lexicon = Lexicon.load(self.directory)
+        bands = lexicon.band_of(['house', 'friend', 'ability', 'analysis', 'economy', 'data'])
+        self.assertEqual(list(bands), [1, 1, 2, 3, 3, 3])
+
+    def test_academic_coverage_reflects_the_partial_list(self):
+        coverage = Lexicon.load(self.directory).academic_coverage
+        self.assertGreater(coverage, 0.5)
+        self.assertLess(coverage, 1.0)
+
+
+class TestLexicalScorer(unittest.TestCase):
+    def setUp(self):
+        self.scorer = LexicalScorer()
+
+    def test_mtld_rewards_diverse_text(self):
+        self.assertLess(mtld(BASIC.lower().split()), mtld(ADVANCED.lower().split()))
+
+    def test_is_deterministic(self):
+        self.assertEqual(self.scorer.analyse(ADVANCED), self.scorer.analyse(ADVANCED))
+
+    def test_advanced_answer_scores_higher(self):
+        basic = self.scorer.analyse(BASIC)
+        advanced = self.scorer.analyse(ADVANCED)
+        self.assertGreater(advanced.band, basic.band)
+        self.assertIn('significant', advanced.advanced_words)
+        self.assertIn('climate change', advanced.collocations)
+        self.assertIn('make decision', advanced.collocations)
+
+    def test_everyday_vocabulary_is_not_rewarded_as_less_common(self):
+        profile = self.scorer.analyse(EVERYDAY)
+        self.assertEqual(profile.advanced_words, ())
+        self.assertLessEqual(profile.band, 6.0)
+        self.assertFalse(any("less common vocabulary" in suggestion
+                             for suggestion in self.scorer.suggestions(profile)))
+
+    def test_short_answer_is_capped(self):
+        self.assertLessEqual(self.scorer.analyse("Consequently, sustainability matters.").band, 6.0)
+
+    def test_empty_answer(self):
+        self.assertEqual(self.scorer.analyse("").band, 0.0)
+
+
+class TestLexicalFallback(unittest.TestCase):
+    def test_evaluation_includes_local_evidence(self):
+        engine = ScoringEngine(client=LocalChatClient(), requests_per_minute=100_000)
+        evaluation = asyncio.run(engine.evaluate_response(ADVANCED, 30.0))
+        metrics = evaluation['feedback']['lexical']['metrics']
+        self.assertIn('climate change', metrics['collocations'])
+        self.assertIn('climate change', evaluation['feedback']['lexical']['examples'])
+
+    def test_local_band_used_when_llm_fails(self):
+        # Private callers keep the failures away from the shared circuit breakers
+        engine = ScoringEngine(client=FailingChatClient(), requests_per_minute=100_000,
+                               evaluation_caller=ResilientCaller('test', RetryPolicy(1)),
+                               analysis_caller=ResilientCaller('test', RetryPolicy(1)))
+        expected = engine.lexical_scorer.analyse(ADVANCED).band
+        evaluation = asyncio.run(engine.evaluate_response(ADVANCED, 30.0))
+        self.assertEqual(evaluation['scores']['lexical'], expected)
+        self.assertEqual(evaluation['scores']['grammar'], 5.0)
+
+        detailed = asyncio.run(engine.evaluate_response(ADVANCED, 30.0, detailed=True))
+        self.assertEqual(detailed['scores']['lexical'], expected)
+        self.assertIn('lexical', detailed['failed_criteria'])
+
+
+if __name__ == '__main__':
+    unittest.main()
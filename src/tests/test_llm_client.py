@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from modules.background_loop import BackgroundLoop
+from modules.llm_client import BackgroundClient, get_async_client
+from modules.local_services import LocalChatClient
+from modules.scoring import ScoringEngine
+
+
+class SlowChatClient(LocalChatClient):
+    """Local client that takes a fixed time to answer, like a network round trip"""
+
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+        self.timeouts = []
+
+    async def create(self, model: str, messages: list, **kwargs):
+        self.timeouts.append(kwargs.get('timeout'))
+        await asyncio.sleep(self.delay)
+        return await super().create(model, messages, **kwargs)
+
+
+class LoopRecordingClient(LocalChatClient):
+    """Local client that notes which loop each request ran on"""
+
+    def __init__(self):
+        super().__init__()
+        self.loops = set()
+
+    async def create(self, model: str, messages: list, **kwargs):
+        self.loops.add(asyncio.get_running_loop())
+        return await super().create(model, messages, **kwargs)
+
+
+class TestAsyncClient(unittest.TestCase):
+    def setUp(self):
+        self.background = BackgroundLoop()
+        self.addCleanup(self.background.stop)
+        self.built = []
+
+        def factory():
+            self.built.append(LoopRecordingClient())
+            return self.built[-1]
+
+        self.client = BackgroundClient(factory, loop=self.background)
+
+    def test_client_is_shared_across_loops(self):
+        self.assertIs(get_async_client(), get_async_client())
+
+    def test_reruns_reuse_one_client_on_the_background_loop(self):
+        async def rerun():
+            return await self.client.chat.completions.create(
+                model='test', messages=[{'role': 'user', 'content': "Hello there"}])
+
+        # Each Streamlit rerun is a fresh asyncio.run
+        replies = [asyncio.run(rerun()) for _ in range(5)]
+        self.assertEqual(len(self.built), 1)
+        self.assertEqual(self.built[0].calls, 5)
+        self.assertEqual(self.built[0].loops, {self.background.loop})
+        self.assertTrue(all(reply.choices[0].message.content for reply in replies))
+
+    def test_streams_are_read_from_the_callers_loop(self):
+        async def read_stream():
+            stream = await self.client.chat.completions.create(
+                model='test', messages=[{'role': 'user', 'content': "Hello there"}],
+                stream=True)
+            return "".join([chunk.choices[0].delta.content async for chunk in stream])
+
+        expected = asyncio.run(LocalChatClient().create(
+            'test', [{'role': 'user', 'content': "Hello there"}])).choices[0].message.content
+        self.assertEqual(asyncio.run(read_stream()), expected)
+
+    def test_cancelling_the_caller_cancels_the_request(self):
+        started = threading.Event()
+        cancelled = threading.Event()
+
+        async def hang():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        async def caller():
+            task = asyncio.ensure_future(self.client.run(hang()))
+            await asyncio.get_running_loop().run_in_executor(None, started.wait)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(caller())
+        self.assertTrue(cancelled.wait(1.0))
+
+    def test_concurrent_evaluations_overlap(self):
+        chat = SlowChatClient(delay=0.3)
+        engine = ScoringEngine(client=chat, requests_per_minute=100_000)
+
+        async def evaluate_all():
+            return await asyncio.gather(*(
+                engine.evaluate_response("I enjoy reading books at home.", 5.0)
+                for _ in range(4)))
+
+        start = time.perf_counter()
+        evaluations = asyncio.run(evaluate_all())
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(evaluations), 4)
+        self.assertEqual(chat.calls, 4)
+        # Serialized calls would take 1.2s
+        self.assertLess(elapsed, 0.9)
+        self.assertTrue(all(timeout for timeout in chat.timeouts))
+
+
+if __name__ == '__main__':
+    unittest.main()
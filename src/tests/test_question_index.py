@@ -0,0 +1,128 @@
+import asyncio
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from modules.local_services import LocalChatClient
+from modules.practice_manager import MAX_REGENERATIONS, PracticeModeManager
+from modules.question_generator import QuestionGenerator
+from modules.question_index import QuestionIndex, get_question_index
+from modules.question_pool import QuestionPool
+from modules.services import ServiceRegistry
+
+ASKED = [
+    "What do you like most about travelling to new countries?",
+    "Do you prefer travelling alone or with friends?",
+    "Describe a memorable journey you have taken.",
+    "How has tourism changed your hometown?",
+]
+
+
+class TestQuestionIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = QuestionIndex()
+        for question in ASKED:
+            self.index.add(question)
+
+    def test_rejects_repeats_and_paraphrases(self):
+        self.assertTrue(self.index.is_duplicate(ASKED[0]))
+        self.assertTrue(self.index.is_duplicate(
+            "What do you enjoy most about travelling to new countries?"))
+        self.assertTrue(self.index.is_duplicate("do you prefer travelling alone, or with friends"))
+
+    def test_accepts_new_questions(self):
+        self.assertFalse(self.index.is_duplicate(
+            "What kind of food do you usually eat for breakfast?"))
+        self.assertFalse(self.index.is_duplicate("How important is public transport in your city?"))
+        self.assertEqual(QuestionIndex().similarity(ASKED[0]), 0.0)
+
+    def test_shared_template_with_a_new_subject_is_not_a_duplicate(self):
+        for asked, candidate in (
+                ("Describe your best friend.", "Describe your hometown."),
+                ("Let's talk about your studies. What do you like most about your studies?",
+                 "Let's talk about your job. What do you like most about your job?"),
+                ("Describe a time you travelled by train.",
+                 "Describe a time you travelled abroad.")):
+            index = QuestionIndex()
+            index.add(asked)
+            self.assertFalse(index.is_duplicate(candidate), candidate)
+
+    def test_persists_across_restarts(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'learner.minhash'
+            index = QuestionIndex(path=path)
+            for question in ASKED:
+                index.add(question)
+            self.assertEqual(path.stat().st_size, len(ASKED) * index.num_perm * 4)
+
+            # A torn final write is ignored
+            with open(path, 'ab') as index_file:
+                index_file.write(b'\x01\x02')
+            reloaded = QuestionIndex(path=path)
+            self.assertEqual(len(reloaded), len(ASKED))
+            self.assertTrue(reloaded.is_duplicate(ASKED[2]))
+
+    def test_queries_stay_fast_at_scale(self):
+        for number in range(5000):
+            self.index.add(f"Question {number}: tell me about item {number * 7919} you own")
+        started = time.perf_counter()
+        for _ in range(100):
+            self.index.is_duplicate("What kind of food do you usually eat for breakfast?")
+        # Generous bound for slow CI machines; typically well under a millisecond
+        self.assertLess((time.perf_counter() - started) / 100, 0.01)
+
+
+class RepeatingQuestionGenerator(QuestionGenerator):
+    """Always comes up with the same, already asked question"""
+
+    def __init__(self):
+        super().__init__(client=LocalChatClient())
+        self.calls = 0
+
+    async def generate_question(self, context):
+        self.calls += 1
+        return True, ASKED[0]
+
+
+class TestRepeatedQuestions(unittest.TestCase):
+    def setUp(self):
+        self.generator = RepeatingQuestionGenerator()
+        # No background refills, so the test decides what is pooled
+        self.pool = QuestionPool(self.generator, low_watermark=0)
+        services = ServiceRegistry({'question_generator': lambda: self.generator})
+        self.manager = PracticeModeManager(user_id=f"learner-{id(self)}", question_pool=self.pool,
+                                           services=services)
+        for question in ASKED:
+            self.manager.question_index.add(question)
+        self.manager.start_session('Travel')
+        self.manager.session_state['conversation_history'].append(
+            {'question': ASKED[1], 'response': "With friends."})
+        self.addCleanup(self.manager.prefetcher.cancel)
+
+    def test_learners_have_separate_indexes(self):
+        self.assertIs(get_question_index('first'), get_question_index('first'))
+        self.assertIsNot(get_question_index('first'), get_question_index('second'))
+        self.assertFalse(get_question_index('second').is_duplicate(ASKED[0]))
+
+    def test_falls_back_to_an_unseen_pooled_question(self):
+        fresh = "What kind of food do you usually eat for breakfast?"
+        self.pool.put_back('Travel', 1.0, [ASKED[2], fresh])
+
+        success, question = asyncio.run(self.manager.get_next_question())
+        self.assertTrue(success)
+        self.assertEqual(question, fresh)
+        self.assertGreaterEqual(self.generator.calls, MAX_REGENERATIONS + 1)
+        self.assertFalse(self.manager.session_state['repeated_question'])
+        # Seen by this learner only, so it stays available to others
+        self.assertEqual(self.pool.take('Travel', 1.0), ASKED[2])
+
+    def test_repeat_is_flagged_when_nothing_unseen_is_left(self):
+        success, question = asyncio.run(self.manager.get_next_question())
+        self.assertTrue(success)
+        self.assertEqual(question, ASKED[0])
+        self.assertTrue(self.manager.session_state['repeated_question'])
+
+
+if __name__ == '__main__':
+    unittest.main()
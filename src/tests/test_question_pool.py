@@ -0,0 +1,72 @@
+import time
+import unittest
+
+from modules.background_loop import BackgroundLoop
+from modules.local_services import LocalChatClient
+from modules.question_generator import QuestionGenerator
+from modules.question_pool import QuestionPool, difficulty_bucket
+
+
+class CountingQuestionGenerator(QuestionGenerator):
+    """Numbers questions across batches so every one is distinct"""
+
+    def __init__(self):
+        super().__init__(client=LocalChatClient())
+        self.batches = []
+        self.issued = 0
+
+    async def generate_opening_questions(self, topic, difficulty, count):
+        self.batches.append(count)
+        self.issued += count
+        return [f"{topic} question {self.issued - count + number}" for number in range(count)]
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+class TestQuestionPool(unittest.TestCase):
+    def setUp(self):
+        self.loop = BackgroundLoop()
+        self.addCleanup(self.loop.stop)
+
+    def test_batches_fill_to_high_watermark(self):
+        generator = CountingQuestionGenerator()
+        pool = QuestionPool(generator, low_watermark=3, high_watermark=8, batch_size=5,
+                            loop=self.loop)
+        pool.warm(['Travel'])
+        self.assertTrue(wait_for(lambda: pool.size('Travel', 1.0) == 8))
+        self.assertEqual(generator.batches, [5, 3])
+
+    def test_take_serves_from_memory_and_refills_below_low_watermark(self):
+        generator = CountingQuestionGenerator()
+        pool = QuestionPool(generator, low_watermark=3, high_watermark=6, batch_size=6,
+                            loop=self.loop)
+        self.assertIsNone(pool.take('Work', 1.0))
+        self.assertTrue(wait_for(lambda: pool.size('Work', 1.0) == 6))
+
+        taken = [pool.take('Work', 1.1) for _ in range(4)]
+        self.assertEqual(len(set(taken)), 4)
+        self.assertTrue(wait_for(lambda: pool.size('Work', 1.0) == 6))
+        self.assertEqual(pool.stats()['hits'], 4)
+        self.assertEqual(pool.stats()['misses'], 1)
+
+    def test_local_client_batch_reply(self):
+        generator = QuestionGenerator(client=LocalChatClient())
+        pool = QuestionPool(generator, low_watermark=2, high_watermark=4, batch_size=4,
+                            loop=self.loop)
+        pool.warm(['Food'], difficulties=[0.0])
+        self.assertTrue(wait_for(lambda: pool.size('Food', 0.0) == 4))
+        self.assertEqual(pool.take('Food', 0.1), "Local question 1 about Food?")
+
+    def test_difficulty_buckets(self):
+        self.assertEqual(difficulty_bucket(1.2), 1.0)
+        self.assertEqual(difficulty_bucket(1.3), 1.5)
+        self.assertEqual(difficulty_bucket(5), 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
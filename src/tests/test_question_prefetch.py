@@ -0,0 +1,82 @@
+import asyncio
+import time
+import unittest
+
+from modules.background_loop import BackgroundLoop
+from modules.question_prefetch import QuestionPrefetcher
+
+
+class SlowQuestionGenerator:
+    """Answers after ``delay`` seconds with a question naming the last response"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.contexts = []
+        self.cancelled = 0
+
+    async def generate_question(self, context):
+        self.contexts.append(context)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        history = context['history']
+        answer = history[-1].get('response', 'none') if history else 'none'
+        return True, f"Question after {answer}"
+
+
+def context(*history):
+    return {'topic': 'Travel', 'difficulty': 1.0, 'history': list(history)}
+
+
+class TestQuestionPrefetcher(unittest.TestCase):
+    def setUp(self):
+        self.loop = BackgroundLoop()
+        self.addCleanup(self.loop.stop)
+
+    def test_prefetched_question_survives_event_loop(self):
+        generator = SlowQuestionGenerator(0.05)
+        prefetcher = QuestionPrefetcher(generator, self.loop)
+        # Started under one asyncio.run, taken under another, as across Streamlit reruns
+        asyncio.run(asyncio.sleep(0, prefetcher.prefetch(context({'question': 'Q1'}))))
+        time.sleep(0.2)
+
+        started = time.perf_counter()
+        question = asyncio.run(prefetcher.take(context({'question': 'Q1', 'response': 'yes'})))
+        self.assertEqual(question, "Question after none")
+        self.assertLess(time.perf_counter() - started, 0.05)
+        self.assertEqual(prefetcher.hits, 1)
+
+    def test_prefers_question_conditioned_on_the_answer(self):
+        generator = SlowQuestionGenerator(0.05)
+        prefetcher = QuestionPrefetcher(generator, self.loop)
+        prefetcher.prefetch(context({'question': 'Q1'}))
+        time.sleep(0.1)
+        answered = context({'question': 'Q1', 'response': 'yes'})
+        prefetcher.prefetch(answered, conditioned=True)
+        self.assertEqual(asyncio.run(prefetcher.take(answered)), "Question after yes")
+
+    def test_falls_back_to_speculative_question(self):
+        generator = SlowQuestionGenerator(0.05)
+        prefetcher = QuestionPrefetcher(generator, self.loop, grace=0.01)
+        prefetcher.prefetch(context({'question': 'Q1'}))
+        time.sleep(0.1)
+        generator.delay = 10
+        answered = context({'question': 'Q1', 'response': 'yes'})
+        prefetcher.prefetch(answered, conditioned=True)
+        self.assertEqual(asyncio.run(prefetcher.take(answered)), "Question after none")
+
+    def test_stale_prefetches_are_cancelled(self):
+        generator = SlowQuestionGenerator(10)
+        prefetcher = QuestionPrefetcher(generator, self.loop)
+        prefetcher.prefetch(context({'question': 'Q1'}))
+        time.sleep(0.05)
+        self.assertIsNone(asyncio.run(prefetcher.take(context({'question': 'Other'}))))
+        time.sleep(0.05)
+        self.assertEqual(generator.cancelled, 1)
+        self.assertEqual(prefetcher.misses, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import asyncio
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from modules.rate_limiter import (MemoryBucketStore, RateLimiter, SQLiteBucketStore,
+                                  get_rate_limiter)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_burst_then_steady_rate(self):
+        clock = FakeClock()
+        limiter = RateLimiter('gpt-4o-mini', requests_per_minute=60, burst=3, clock=clock)
+
+        self.assertEqual([limiter.reserve() for _ in range(3)], [0.0, 0.0, 0.0])
+        # Once the burst is spent, callers queue one second apart
+        self.assertAlmostEqual(limiter.reserve(), 1.0)
+        self.assertAlmostEqual(limiter.reserve(), 2.0)
+
+        clock.now += 10
+        self.assertEqual(limiter.reserve(), 0.0)
+
+    def test_deployments_have_separate_budgets(self):
+        clock = FakeClock()
+        store = MemoryBucketStore()
+        gpt4 = RateLimiter('gpt-4', 60, burst=1, store=store, clock=clock)
+        mini = RateLimiter('gpt-4o-mini', 60, burst=1, store=store, clock=clock)
+
+        gpt4.reserve()
+        self.assertEqual(mini.reserve(), 0.0)
+        self.assertAlmostEqual(gpt4.reserve(), 1.0)
+
+    def test_sqlite_store_is_shared_between_processes(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = str(Path(temp_dir) / 'limits.db')
+            clock = FakeClock()
+            # Two stores on one file stand in for two app processes
+            first = RateLimiter('gpt-4', 60, burst=2, store=SQLiteBucketStore(db_path), clock=clock)
+            second = RateLimiter('gpt-4', 60, burst=2, store=SQLiteBucketStore(db_path), clock=clock)
+
+            self.assertEqual(first.reserve(), 0.0)
+            self.assertEqual(second.reserve(), 0.0)
+            self.assertAlmostEqual(first.reserve(), 1.0)
+            self.assertAlmostEqual(second.reserve(), 2.0)
+
+    def test_acquire_waits_for_reserved_slot(self):
+        limiter = RateLimiter('gpt-4', requests_per_minute=600, burst=1)
+
+        async def acquire_three():
+            await asyncio.gather(*(limiter.acquire() for _ in range(3)))
+
+        start = time.perf_counter()
+        asyncio.run(acquire_three())
+        self.assertGreaterEqual(time.perf_counter() - start, 0.19)
+
+    def test_shared_limiter_per_deployment(self):
+        self.assertIs(get_rate_limiter('gpt-4', 60), get_rate_limiter('gpt-4', 60))
+        self.assertIsNot(get_rate_limiter('gpt-4', 60), get_rate_limiter('gpt-4o-mini', 60))
+
+    def test_shared_limiter_keeps_one_budget(self):
+        limiter = get_rate_limiter('budget-test', 60)
+
+        self.assertIs(get_rate_limiter('budget-test'), limiter)
+        with self.assertRaisesRegex(ValueError, "already 60"):
+            get_rate_limiter('budget-test', 120)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+import numpy as np
+
+from modules.resampler import (StreamingResampler, get_filter_bank, output_length,
+                               resample_poly, to_int16)
+
+
+def tone(frequency, sample_rate, seconds=1.0):
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    return 10000 * np.sin(2 * np.pi * frequency * t)
+
+
+class TestPolyphaseResampler(unittest.TestCase):
+    def test_output_length(self):
+        for orig_sr in (8000, 22050, 44100, 48000):
+            output = resample_poly(np.zeros(orig_sr * 2), orig_sr, 16000)
+            self.assertEqual(len(output), 32000)
+        self.assertEqual(output_length(441, 44100, 16000), 160)
+
+    def test_filter_bank_is_cached(self):
+        self.assertIs(get_filter_bank(44100, 16000), get_filter_bank(44100, 16000))
+
+    def test_passband_tone_is_preserved(self):
+        output = resample_poly(tone(1000, 44100), 44100, 16000)
+        reference = tone(1000, 16000)
+        self.assertLess(np.max(np.abs(output - reference)[200:-200]), 20)
+
+    def test_tone_above_nyquist_is_suppressed(self):
+        output = resample_poly(tone(12000, 48000), 48000, 16000)
+        self.assertLess(np.max(np.abs(output[200:-200])), 50)
+
+    def test_streaming_matches_one_shot(self):
+        signal = np.random.default_rng(0).normal(0, 3000, 44100)
+        expected = resample_poly(signal, 44100, 16000)
+
+        resampler = StreamingResampler(44100, 16000)
+        blocks, start = [], 0
+        for size in np.random.default_rng(1).integers(1, 3000, 200):
+            blocks.append(resampler.process(signal[start:start + size]))
+            start += size
+            if start >= len(signal):
+                break
+        blocks.append(resampler.process(signal[start:]))
+        blocks.append(resampler.flush())
+
+        np.testing.assert_allclose(np.concatenate(blocks), expected, atol=1e-6)
+
+    def test_equal_rates_pass_through(self):
+        signal = np.arange(10, dtype=np.int16)
+        np.testing.assert_array_equal(resample_poly(signal, 16000, 16000), signal)
+
+    def test_to_int16_clips(self):
+        np.testing.assert_array_equal(to_int16(np.array([40000.0, -40000.0, 1.6])),
+                                      np.array([32767, -32768, 2], dtype=np.int16))
+
+
+if __name__ == '__main__':
+    unittest.main()
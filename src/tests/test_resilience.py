@@ -0,0 +1,158 @@
+import asyncio
+import random
+import unittest
+
+import httpx
+import openai
+
+from modules.resilience import (CircuitBreaker, CircuitOpenError, ResilientCaller,
+                                RetryPolicy, retry_after)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def rate_limit_error(headers=None):
+    request = httpx.Request('POST', 'https://example.invalid/chat/completions')
+    response = httpx.Response(429, headers=headers or {}, request=request)
+    return openai.RateLimitError("rate_limit exceeded", response=response, body=None)
+
+
+def bad_request_error():
+    request = httpx.Request('POST', 'https://example.invalid/chat/completions')
+    response = httpx.Response(400, request=request)
+    return openai.BadRequestError("invalid prompt", response=response, body=None)
+
+
+class ScriptedRequest:
+    """Raises the scripted errors in turn, then returns ``result``"""
+
+    def __init__(self, errors=(), result='ok', delays=()):
+        self.errors = list(errors)
+        self.delays = list(delays)
+        self.result = result
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.delays:
+            await asyncio.sleep(self.delays.pop(0))
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.result
+
+
+def fast_caller(**kwargs):
+    policy = RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=1.0, rng=random.Random(0))
+    return ResilientCaller('test', policy=policy, **kwargs)
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_honors_retry_after(self):
+        policy = RetryPolicy(max_attempts=3)
+        self.assertEqual(retry_after(rate_limit_error({'retry-after-ms': '1500'})), 1.5)
+        self.assertEqual(policy.delay(0, rate_limit_error({'retry-after': '2'})), 2.0)
+
+    def test_gives_up_on_long_retry_after_and_bad_requests(self):
+        policy = RetryPolicy(max_attempts=3, max_delay=5.0)
+        self.assertIsNone(policy.delay(0, rate_limit_error({'retry-after': '60'})))
+        self.assertIsNone(policy.delay(0, bad_request_error()))
+        self.assertIsNone(policy.delay(2, rate_limit_error()))
+
+    def test_backoff_is_jittered_and_capped(self):
+        policy = RetryPolicy(base_delay=1.0, max_delay=3.0, rng=random.Random(0))
+        delays = [policy.delay(1, rate_limit_error()) for _ in range(50)]
+        self.assertTrue(all(0 <= delay <= 2.0 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_then_half_opens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker('test', failure_threshold=2, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        breaker.record_failure()
+        self.assertRaises(CircuitOpenError, breaker.before_call)
+
+        clock.now = 11
+        breaker.before_call()
+        # Only one trial call at a time
+        self.assertRaises(CircuitOpenError, breaker.before_call)
+        breaker.record_success()
+        self.assertEqual(breaker.state, 'closed')
+
+    def test_failed_trial_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker('test', failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 11
+        breaker.before_call()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, 'open')
+
+
+class TestResilientCaller(unittest.TestCase):
+    def test_retries_transient_errors(self):
+        request = ScriptedRequest([rate_limit_error(), rate_limit_error()])
+        caller = fast_caller()
+        self.assertEqual(asyncio.run(caller.call(request)), 'ok')
+        self.assertEqual(request.calls, 3)
+        self.assertEqual(caller.retries, 2)
+
+    def test_does_not_retry_bad_requests(self):
+        request = ScriptedRequest([bad_request_error()])
+        caller = fast_caller()
+        self.assertRaises(openai.BadRequestError, asyncio.run, caller.call(request))
+        self.assertEqual(request.calls, 1)
+        self.assertEqual(caller.breaker.state, 'closed')
+
+    def test_outage_fails_fast(self):
+        caller = fast_caller(breaker=CircuitBreaker('test', failure_threshold=3))
+        request = ScriptedRequest([rate_limit_error()] * 10)
+        self.assertRaises(openai.RateLimitError, asyncio.run, caller.call(request))
+        self.assertRaises(CircuitOpenError, asyncio.run, caller.call(request))
+        self.assertEqual(request.calls, 3)
+
+    def test_cancelled_trial_is_released(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker('test', failure_threshold=1, reset_timeout=10, clock=clock)
+        caller = fast_caller(breaker=breaker)
+        breaker.record_failure()
+        clock.now = 11
+
+        async def cancel_trial():
+            trial = asyncio.ensure_future(caller.call(ScriptedRequest(delays=[5.0])))
+            await asyncio.sleep(0.01)
+            trial.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await trial
+
+        asyncio.run(cancel_trial())
+        self.assertEqual(asyncio.run(caller.call(ScriptedRequest())), 'ok')
+        self.assertEqual(breaker.state, 'closed')
+
+    def test_hedges_slow_requests(self):
+        caller = fast_caller(hedge_percentile=90, hedge_min_samples=5)
+        for _ in range(5):
+            caller.latencies.add(0.01)
+        request = ScriptedRequest(delays=[5.0, 0.0])
+
+        async def timed():
+            started = asyncio.get_running_loop().time()
+            result = await caller.call(request)
+            return result, asyncio.get_running_loop().time() - started
+
+        result, elapsed = asyncio.run(timed())
+        self.assertEqual(result, 'ok')
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(caller.hedges, 1)
+        self.assertEqual(request.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,13 @@
 from modules import ScoringEngine
+from modules.local_services import LocalChatClient
+import asyncio
 import unittest
 
 
 class TestScoringEngine(unittest.TestCase):
     def setUp(self):
-        self.scoring_engine = ScoringEngine()
+        self.scoring_engine = ScoringEngine(client=LocalChatClient(),
+                                            requests_per_minute=100_000)
         self.sample_response = """
         I believe technology has dramatically changed the way we live and work. 
         For instance, smartphones have made communication instant and seamless. 
@@ -19,23 +22,23 @@ class TestScoringEngine(unittest.TestCase):
         self.assertTrue(0 <= score <= 9)
 
     def test_score_lexical(self):
-        score = self.scoring_engine._score_lexical(self.sample_response)
+        score = asyncio.run(self.scoring_engine._score_lexical(self.sample_response))
         self.assertIsInstance(score, float)
         self.assertTrue(0 <= score <= 9)
 
     def test_score_grammar(self):
-        score = self.scoring_engine._score_grammar(self.sample_response)
+        score = asyncio.run(self.scoring_engine._score_grammar(self.sample_response))
         self.assertIsInstance(score, float)
         self.assertTrue(0 <= score <= 9)
 
     def test_score_pronunciation(self):
-        score = self.scoring_engine._score_pronunciation(self.sample_response)
+        score = asyncio.run(self.scoring_engine._score_pronunciation(self.sample_response))
         self.assertIsInstance(score, float)
         self.assertTrue(0 <= score <= 9)
 
     def test_full_evaluation(self):
-        result = self.scoring_engine.evaluate_response(
-            self.sample_response, self.audio_duration)
+        result = asyncio.run(self.scoring_engine.evaluate_response(
+            self.sample_response, self.audio_duration))
 
         self.assertIn('scores', result)
         self.assertIn('feedback', result)
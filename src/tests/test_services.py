@@ -0,0 +1,67 @@
+import threading
+import time
+import unittest
+
+from modules.exam_session import ExamModeManager
+from modules.local_services import LocalChatClient
+from modules.practice_manager import PracticeModeManager
+from modules.question_generator import QuestionGenerator
+from modules.question_pool import QuestionPool
+from modules.services import ServiceRegistry
+
+
+class SlowFactory:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(0.05)
+        return object()
+
+
+class TestServiceRegistry(unittest.TestCase):
+    def setUp(self):
+        self.speech = SlowFactory()
+        self.registry = ServiceRegistry({
+            'speech_to_text': self.speech,
+            'question_generator': lambda: QuestionGenerator(client=LocalChatClient()),
+            'scoring_engine': SlowFactory()
+        })
+
+    def test_services_are_built_on_first_use(self):
+        self.assertEqual(self.registry.built(), [])
+        generator = self.registry.question_generator
+        self.assertIs(self.registry.question_generator, generator)
+        self.assertEqual(self.registry.built(), ['question_generator'])
+
+    def test_concurrent_first_use_builds_once(self):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.registry.speech_to_text))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.speech.calls, 1)
+        self.assertEqual(len({id(service) for service in results}), 1)
+
+    def test_session_evaluator_reuses_the_scoring_engine(self):
+        self.assertIs(self.registry.session_evaluator.scoring_engine, self.registry.scoring_engine)
+
+    def test_session_managers_share_services(self):
+        pool = QuestionPool(self.registry.question_generator)
+        first = PracticeModeManager(user_id='first', question_pool=pool, services=self.registry)
+        second = PracticeModeManager(user_id='second', question_pool=pool, services=self.registry)
+        exam = ExamModeManager(services=self.registry)
+
+        # Creating sessions builds no speech or scoring backends
+        self.assertEqual(self.registry.built(), ['question_generator'])
+        self.assertIs(first.speech_to_text, second.speech_to_text)
+        self.assertIs(first.scoring_engine, exam.session_evaluator.scoring_engine)
+        self.assertIs(exam.question_generator, second.question_generator)
+        self.assertEqual(self.speech.calls, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
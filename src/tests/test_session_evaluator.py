@@ -0,0 +1,111 @@
+import asyncio
+import json
+import unittest
+
+from modules.local_services import LocalChatClient
+from modules.resilience import ResilientCaller, RetryPolicy
+from modules.scoring import ScoringEngine
+from modules.session_evaluator import SessionAnswer, SessionEvaluator
+
+
+def make_answers():
+    part_one = [SessionAnswer(1, f"Question {n}?", f"I usually spend weekends with friends {n}.", 8.0)
+                for n in range(4)]
+    part_two = [SessionAnswer(2, "Describe a memorable journey.",
+                              "Last summer I travelled across the country by train, "
+                              "and every stop showed me a different landscape.", 110.0)]
+    part_three = [SessionAnswer(3, "Why do people travel?",
+                                "People travel to learn about other cultures.", 30.0),
+                  SessionAnswer(3, "Will tourism grow?", "", 0.0)]
+    return part_one + part_two + part_three
+
+
+class DroppingChatClient(LocalChatClient):
+    """Leaves the first answer of every batch out of its reply"""
+
+    async def create(self, model: str, messages: list, **kwargs):
+        response = await super().create(model, messages, **kwargs)
+        reply = json.loads(response.choices[0].message.content)
+        if 'answers' in reply:
+            reply['answers'] = reply['answers'][1:]
+            response.choices[0].message.content = json.dumps(reply)
+        return response
+
+
+class UnavailableChatClient(DroppingChatClient):
+    """Drops answers from batches and fails every other request"""
+
+    def __init__(self, fail_batches: bool = False):
+        super().__init__()
+        self.fail_batches = fail_batches
+
+    async def create(self, model: str, messages: list, **kwargs):
+        if self.fail_batches or '[Answer' not in messages[-1]['content']:
+            self.calls += 1
+            raise RuntimeError("service unavailable")
+        return await super().create(model, messages, **kwargs)
+
+
+class TestSessionEvaluator(unittest.TestCase):
+    def evaluator(self, chat, **kwargs):
+        # Private callers, so failing clients cannot trip the shared circuit breakers
+        engine = ScoringEngine(client=chat, requests_per_minute=100_000,
+                               evaluation_caller=ResilientCaller('test', RetryPolicy(1)),
+                               analysis_caller=ResilientCaller('test', RetryPolicy(1)))
+        return SessionEvaluator(engine, **kwargs)
+
+    def test_pack_respects_limits_and_skips_unanswered(self):
+        evaluator = self.evaluator(LocalChatClient(), max_answers_per_request=4)
+        self.assertEqual(evaluator.pack(make_answers()), [[0, 1, 2, 3], [4, 5]])
+
+        evaluator.max_words_per_request = 20
+        self.assertTrue(all(len(batch) <= 2 for batch in evaluator.pack(make_answers())))
+
+    def test_whole_test_in_one_request(self):
+        chat = LocalChatClient()
+        report = asyncio.run(self.evaluator(chat).evaluate_test(make_answers()))
+
+        self.assertEqual(chat.calls, 1)
+        self.assertEqual(report['requests'], 1)
+        self.assertEqual(sorted(report['parts']), [1, 2, 3])
+        self.assertEqual(report['unanswered'], 1)
+        self.assertIsNone(report['answers'][-1]['evaluation'])
+        for criterion in ['fluency', 'lexical', 'grammar', 'pronunciation']:
+            self.assertEqual(report['scores'][criterion] * 2 % 1, 0)
+        self.assertEqual(report['overall_score'] * 2 % 1, 0)
+
+    def test_answers_missing_from_batch_are_scored_individually(self):
+        chat = DroppingChatClient()
+        evaluator = self.evaluator(chat, max_answers_per_request=3)
+        report = asyncio.run(evaluator.evaluate_test(make_answers()))
+
+        # Two batches, each dropping one answer that is then re-scored alone
+        self.assertEqual(chat.calls, 4)
+        self.assertEqual(report['requests'], 4)
+        self.assertEqual(report['unanswered'], 1)
+        self.assertTrue(all(answer['evaluation'] for answer in report['answers'][:-1]))
+
+    def test_failed_answers_are_left_out_of_the_bands(self):
+        evaluator = self.evaluator(UnavailableChatClient(), max_answers_per_request=3)
+        report = asyncio.run(evaluator.evaluate_test(make_answers()))
+        expected = asyncio.run(self.evaluator(LocalChatClient()).evaluate_test(
+            [answer for index, answer in enumerate(make_answers()) if index not in (0, 3)]))
+
+        self.assertEqual(report['unscored'], 2)
+        self.assertEqual(report['unanswered'], 1)
+        self.assertIsNone(report['answers'][0]['evaluation'])
+        self.assertIsNone(report['answers'][3]['evaluation'])
+        self.assertEqual(report['scores'], expected['scores'])
+
+    def test_no_band_without_scored_answers(self):
+        evaluator = self.evaluator(UnavailableChatClient(fail_batches=True))
+        report = asyncio.run(evaluator.evaluate_test(make_answers()))
+
+        self.assertIsNone(report['overall_score'])
+        self.assertEqual(report['scores'], {})
+        self.assertEqual(report['parts'], {})
+        self.assertEqual(report['unscored'], 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
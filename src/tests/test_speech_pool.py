@@ -0,0 +1,68 @@
+import unittest
+from unittest import mock
+
+from modules.speech_pool import SpeechServicePool
+
+
+class FakeConfig:
+    def __init__(self, language):
+        self.speech_recognition_language = language
+
+
+class TestSpeechServicePool(unittest.TestCase):
+    def setUp(self):
+        self.created = []
+
+        def recognizer_factory(speech_config):
+            pair = (object(), object())
+            self.created.append((speech_config.speech_recognition_language, pair))
+            return pair
+
+        self.pool = SpeechServicePool(warm_per_language=2, config_factory=FakeConfig,
+                                      recognizer_factory=recognizer_factory)
+
+    def test_configs_are_shared_per_language(self):
+        self.assertIs(self.pool.get_config("en-US"), self.pool.get_config("en-US"))
+        self.assertIsNot(self.pool.get_config("en-US"), self.pool.get_config("en-GB"))
+
+        metrics = self.pool.metrics()
+        self.assertEqual(metrics['config_creations'], 2)
+        self.assertEqual(metrics['config_hits'], 2)
+
+    def test_prewarmed_recognizers_are_hits(self):
+        self.pool.prewarm("en-US")
+        first = self.pool.acquire("en-US")
+        self.pool._refiller.submit(lambda: None).result()
+
+        self.assertEqual(first, self.created[0][1])
+        metrics = self.pool.metrics()
+        self.assertEqual(metrics['recognizer_hits'], 1)
+        self.assertEqual(metrics['recognizer_cold_creations'], 0)
+        # The background refill tops the pool back up
+        self.assertEqual(metrics['idle_recognizers'], 2)
+
+    def test_cold_creation_for_new_language(self):
+        self.pool.prewarm("en-US")
+        self.pool.acquire("en-AU")
+
+        self.assertEqual(self.pool.metrics()['recognizer_cold_creations'], 1)
+
+    def test_unhealthy_workers_are_discarded(self):
+        self.pool.prewarm("en-US")
+        self.pool.max_idle_seconds = 0.0
+        self.pool.acquire("en-US")
+
+        metrics = self.pool.metrics()
+        self.assertEqual(metrics['recognizers_discarded'], 2)
+        self.assertEqual(metrics['recognizer_cold_creations'], 1)
+
+    def test_missing_credentials_fail_clearly(self):
+        pool = SpeechServicePool()
+        with mock.patch.dict('os.environ', {}, clear=True), \
+                mock.patch('modules.settings.load_dotenv'):
+            with self.assertRaisesRegex(RuntimeError, "AZURE_SPEECH_KEY is not set"):
+                pool.get_config("en-US")
+
+
+if __name__ == '__main__':
+    unittest.main()
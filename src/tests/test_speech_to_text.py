@@ -0,0 +1,286 @@
+import asyncio
+import io
+import tempfile
+import threading
+import tracemalloc
+import unittest
+import wave
+from unittest import mock
+
+import azure.cognitiveservices.speech as speechsdk
+import numpy as np
+
+from modules.audio import decode_audio, iter_converted_blocks
+from modules.speech_pool import SpeechServicePool
+from modules.speech_to_text import SpeechToText, TICKS_PER_SECOND
+from modules.transcription_cache import TranscriptionCache
+
+from .test_speech_pool import FakeConfig
+
+
+def make_wav(duration: float = 1.0, framerate: int = 16000, channels: int = 1) -> io.BytesIO:
+    """Build an in-memory WAV file containing a quiet tone"""
+    t = np.arange(int(duration * framerate)) / framerate
+    tone = (3000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+    if channels == 2:
+        tone = np.repeat(tone, 2)
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(framerate)
+        wav_file.writeframes(tone.tobytes())
+    buffer.seek(0)
+    return buffer
+
+
+class FakeSignal:
+    def __init__(self):
+        self.callbacks = []
+
+    def connect(self, callback):
+        self.callbacks.append(callback)
+
+    def fire(self, evt):
+        for callback in self.callbacks:
+            callback(evt)
+
+
+class FakeFuture:
+    def __init__(self, action=None):
+        self.action = action
+
+    def get(self):
+        if self.action:
+            self.action()
+
+
+class FakeResult:
+    def __init__(self, text, reason, offset=0.0, duration=0.0):
+        self.text = text
+        self.reason = reason
+        self.offset = int(offset * TICKS_PER_SECOND)
+        self.duration = int(duration * TICKS_PER_SECOND)
+
+
+class FakeEvent:
+    def __init__(self, result=None, cancellation_details=None):
+        self.result = result
+        self.cancellation_details = cancellation_details
+
+
+class FakeCancellation:
+    def __init__(self, reason, error_details=""):
+        self.reason = reason
+        self.error_details = error_details
+
+
+class FakeStream:
+    def __init__(self):
+        self.chunks = []
+        self.closed = threading.Event()
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+
+    def close(self):
+        self.closed.set()
+
+
+class FakeRecognizer:
+    """Replays a scripted list of (signal, event) pairs once the stream is closed"""
+
+    def __init__(self, stream, script):
+        self.stream = stream
+        self.script = script
+        self.recognizing = FakeSignal()
+        self.recognized = FakeSignal()
+        self.canceled = FakeSignal()
+        self.session_stopped = FakeSignal()
+        self.stopped = False
+
+    def start_continuous_recognition_async(self):
+        return FakeFuture(lambda: threading.Thread(target=self._replay, daemon=True).start())
+
+    def stop_continuous_recognition_async(self):
+        return FakeFuture(lambda: setattr(self, 'stopped', True))
+
+    def _replay(self):
+        self.stream.closed.wait(timeout=5)
+        for signal, evt in self.script:
+            getattr(self, signal).fire(evt)
+
+
+def recognized(text, offset, duration):
+    return 'recognized', FakeEvent(FakeResult(
+        text, speechsdk.ResultReason.RecognizedSpeech, offset, duration))
+
+
+def recognizing(text, offset):
+    return 'recognizing', FakeEvent(FakeResult(
+        text, speechsdk.ResultReason.RecognizingSpeech, offset))
+
+
+def stopped():
+    return 'session_stopped', FakeEvent()
+
+
+class RecognizerTestCase(unittest.TestCase):
+    def make_stt(self, script, cache=None):
+        self.recognizers = []
+        self.languages = []
+
+        def factory(speech_config):
+            self.languages.append(speech_config.speech_recognition_language)
+            stream = FakeStream()
+            recognizer = FakeRecognizer(stream, script)
+            self.recognizers.append(recognizer)
+            return stream, recognizer
+
+        return SpeechToText(recognizer_factory=factory, cache=cache,
+                            pool=SpeechServicePool(config_factory=FakeConfig))
+
+    async def collect(self, stt, audio_file):
+        return [segment async for segment in stt.transcribe_stream(audio_file)]
+
+
+class TestStreamingTranscription(RecognizerTestCase):
+    def test_stream_yields_partial_and_final_segments(self):
+        stt = self.make_stt([
+            recognizing("I think", 0.2),
+            recognized("I think travel is great.", 0.2, 1.5),
+            recognizing("It broadens", 2.0),
+            recognized("It broadens the mind.", 2.0, 1.2),
+            stopped(),
+        ])
+        segments = asyncio.run(self.collect(stt, make_wav()))
+
+        self.assertEqual([s.is_final for s in segments], [False, True, False, True])
+        self.assertEqual(segments[1].text, "I think travel is great.")
+        self.assertAlmostEqual(segments[3].offset, 2.0)
+        self.assertAlmostEqual(segments[3].duration, 1.2)
+        self.assertTrue(self.recognizers[0].stopped)
+
+    def test_audio_is_fed_in_chunks(self):
+        stt = self.make_stt([stopped()])
+        asyncio.run(self.collect(stt, make_wav(duration=1.0)))
+
+        chunks = self.recognizers[0].stream.chunks
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) <= stt.chunk_size for chunk in chunks))
+
+    def test_transcribe_joins_all_utterances(self):
+        stt = self.make_stt([
+            recognized("First sentence.", 0.0, 1.0),
+            recognized("Second sentence.", 1.5, 1.0),
+            stopped(),
+        ])
+        success, text = asyncio.run(stt.transcribe(make_wav()))
+
+        self.assertTrue(success)
+        self.assertEqual(text, "First sentence. Second sentence.")
+
+    def test_cancellation_error_is_reported(self):
+        stt = self.make_stt([
+            ('canceled', FakeEvent(cancellation_details=FakeCancellation(
+                speechsdk.CancellationReason.Error, "quota exceeded"))),
+        ])
+        success, message = asyncio.run(stt.transcribe(make_wav()))
+
+        self.assertFalse(success)
+        self.assertIn("quota exceeded", message)
+
+    def test_language_is_chosen_per_call(self):
+        stt = self.make_stt([recognized("Cheers.", 0.0, 1.0), stopped()])
+        asyncio.run(stt.transcribe(make_wav(), language="en-GB"))
+        asyncio.run(stt.transcribe(make_wav()))
+
+        self.assertEqual(self.languages, ["en-GB", "en-US"])
+        # The instance is shared by every session, so its default never changes
+        self.assertEqual(stt.language, "en-US")
+        self.assertEqual(asyncio.run(stt.transcribe(make_wav(), language="fr-FR")),
+                         (False, "Unsupported recognition language: fr-FR"))
+
+    def test_no_speech(self):
+        stt = self.make_stt([stopped()])
+        success, message = stt.transcribe_audio(make_wav())
+
+        self.assertFalse(success)
+        self.assertEqual(message, "No speech recognized")
+
+
+class TestPrepareAudio(RecognizerTestCase):
+    def test_matches_one_shot_conversion(self):
+        stt = self.make_stt([stopped()])
+        prepared = stt.prepare_audio(make_wav(duration=2.0, framerate=48000, channels=2))
+        expected = decode_audio(make_wav(duration=2.0, framerate=48000, channels=2)) \
+            .to_mono().resample(16000)
+
+        self.assertEqual(prepared.sample_rate, 16000)
+        np.testing.assert_array_equal(prepared.samples, expected.samples)
+
+    def test_app_path_converts_block_by_block(self):
+        stt = self.make_stt(self.script_for_cache(), cache=TranscriptionCache())
+        with mock.patch('modules.speech_to_text.iter_converted_blocks',
+                        wraps=iter_converted_blocks) as converter:
+            asyncio.run(stt.transcribe(make_wav(framerate=48000, channels=2)))
+
+        converter.assert_called_once()
+
+    def test_peak_memory_is_set_by_the_converted_clip(self):
+        stt = self.make_stt([stopped()])
+        upload = make_wav(duration=20.0, framerate=48000, channels=2)
+        tracemalloc.start()
+        try:
+            stt.prepare_audio(upload)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        # 20s of 16kHz int16 is 640KB, held twice while the blocks are joined;
+        # the full-length float copies of the 48kHz stereo upload need ~18MB
+        self.assertLess(peak, 3 * 640_000)
+
+    @staticmethod
+    def script_for_cache():
+        return [recognized("Answer.", 0.0, 1.0), stopped()]
+
+
+class TestTranscriptionCache(RecognizerTestCase):
+    script = [recognized("Cached answer.", 0.5, 1.0), stopped()]
+
+    def test_repeat_submission_skips_recognition(self):
+        stt = self.make_stt(self.script, cache=TranscriptionCache())
+
+        first = asyncio.run(stt.transcribe(make_wav()))
+        second = asyncio.run(stt.transcribe(make_wav()))
+
+        self.assertEqual(first, (True, "Cached answer."))
+        self.assertEqual(second, first)
+        self.assertEqual(len(self.recognizers), 1)
+        self.assertEqual(stt.cache.stats()['hits'], 1)
+
+    def test_key_depends_on_audio_and_language(self):
+        stt = self.make_stt(self.script, cache=TranscriptionCache())
+        asyncio.run(stt.transcribe(make_wav(duration=1.0)))
+        asyncio.run(stt.transcribe(make_wav(duration=0.5)))
+        asyncio.run(stt.transcribe(make_wav(duration=1.0), language="en-GB"))
+
+        self.assertEqual(len(self.recognizers), 3)
+
+    def test_disk_tier_survives_restart(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            stt = self.make_stt(self.script, cache=TranscriptionCache(cache_dir=cache_dir))
+            asyncio.run(stt.transcribe(make_wav()))
+
+            restarted = self.make_stt([stopped()], cache=TranscriptionCache(cache_dir=cache_dir))
+            segments = asyncio.run(self.collect(restarted, make_wav()))
+
+            self.assertEqual(len(self.recognizers), 0)
+            self.assertEqual(segments[0].text, "Cached answer.")
+            self.assertAlmostEqual(segments[0].offset, 0.5)
+            self.assertEqual(restarted.cache.stats()['disk_hits'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
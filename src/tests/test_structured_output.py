@@ -0,0 +1,179 @@
+import asyncio
+import json
+import unittest
+
+from modules.evaluation_cache import EvaluationCache
+from modules.local_services import LocalChatClient
+from modules.scoring import EVALUATION_SCHEMA, ScoringEngine
+from modules.structured_output import (IncrementalObjectParser, StructuredOutputMetrics,
+                                       compile_schema, parse_json_reply)
+
+
+class BrokenFirstChatClient(LocalChatClient):
+    """Replies with ``bad_replies`` invalid answers before behaving normally"""
+
+    def __init__(self, bad_replies: int, bad_content: str):
+        super().__init__()
+        self.bad_replies = bad_replies
+        self.bad_content = bad_content
+        self.prompts = []
+
+    async def create(self, model: str, messages: list, **kwargs):
+        self.prompts.append(messages[-1]['content'])
+        response = await super().create(model, messages, **kwargs)
+        if self.bad_replies:
+            self.bad_replies -= 1
+            response.choices[0].message.content = self.bad_content
+        return response
+
+
+class TestSchemaValidation(unittest.TestCase):
+    def setUp(self):
+        self.validate = compile_schema(EVALUATION_SCHEMA)
+        self.valid = {criterion: {'score': 6.5, 'feedback': "Good"}
+                      for criterion in ['fluency', 'lexical', 'grammar', 'pronunciation']}
+
+    def test_valid_evaluation(self):
+        self.assertEqual(self.validate(self.valid), [])
+
+    def test_reports_missing_and_out_of_range_fields(self):
+        del self.valid['grammar']
+        self.valid['lexical']['score'] = 12
+        self.valid['fluency']['score'] = True
+
+        errors = self.validate(self.valid)
+        self.assertIn("$.grammar is missing", errors)
+        self.assertIn("$.lexical.score should be between 0 and 9", errors)
+        self.assertIn("$.fluency.score should be number", errors)
+
+    def test_parse_tolerates_code_fences(self):
+        reply = "```json\n" + json.dumps(self.valid) + "\n```"
+        self.assertEqual(parse_json_reply(reply), self.valid)
+        with self.assertRaises(ValueError):
+            parse_json_reply("Fluency & Coherence|6|Good")
+
+
+class TestStructuredEvaluation(unittest.TestCase):
+    def evaluate(self, chat, cache=None):
+        metrics = StructuredOutputMetrics()
+        engine = ScoringEngine(client=chat, requests_per_minute=100_000,
+                               cache=cache, output_metrics=metrics)
+        evaluation = asyncio.run(engine.evaluate_response("I like to cook at home.", 5.0))
+        return evaluation, metrics.stats()
+
+    def test_invalid_reply_is_repaired_once(self):
+        chat = BrokenFirstChatClient(1, json.dumps({'fluency': {'score': 'seven'}}))
+        evaluation, stats = self.evaluate(chat)
+
+        self.assertEqual(chat.calls, 2)
+        self.assertIn("$.fluency.score should be number", chat.prompts[-1])
+        self.assertNotEqual(evaluation['feedback']['lexical']['suggestions'],
+                            ['Evaluation unavailable'])
+        self.assertEqual(stats['validation_failures'], 1)
+        self.assertEqual(stats['repairs'], 1)
+        self.assertEqual(stats['repairs_succeeded'], 1)
+        self.assertEqual(stats['repair_rate'], 0.5)
+
+    def test_unrepairable_reply_falls_back_without_caching(self):
+        cache = EvaluationCache()
+        chat = BrokenFirstChatClient(2, "Fluency & Coherence|6|Good")
+        evaluation, stats = self.evaluate(chat, cache)
+
+        self.assertEqual(chat.calls, 2)
+        self.assertEqual(evaluation['feedback']['grammar']['suggestions'],
+                         ['Evaluation unavailable'])
+        self.assertEqual(stats['parse_failures'], 2)
+        self.assertEqual(stats['repairs_succeeded'], 0)
+        self.assertEqual(len(cache.memory), 0)
+
+
+class CountingStreamClient(LocalChatClient):
+    """Streams like the local client and counts delivered chunks; can cut the stream short"""
+
+    def __init__(self, cut_after: int = None):
+        super().__init__()
+        self.delivered = 0
+        self.cut_after = cut_after
+
+    async def _stream(self, content: str, chunk_size: int = 16):
+        async for chunk in super()._stream(content, chunk_size):
+            if self.cut_after is not None and self.delivered >= self.cut_after:
+                raise ConnectionError("stream interrupted")
+            self.delivered += 1
+            yield chunk
+
+
+class TestIncrementalParser(unittest.TestCase):
+    def test_members_are_emitted_as_they_complete(self):
+        text = '```json\n{"fluency": {"score": 6.5, "feedback": "Say \\"so\\", {not} this"}, "lexical": '
+        parser = IncrementalObjectParser()
+
+        self.assertEqual(parser.feed(text[:20]), [])
+        members = parser.feed(text[20:])
+        self.assertEqual(members, [('fluency', {'score': 6.5, 'feedback': 'Say "so", {not} this'})])
+
+        members = parser.feed('{"score": 7, "feedback": "ok"}}\n```')
+        self.assertEqual(members, [('lexical', {'score': 7, 'feedback': 'ok'})])
+        self.assertEqual(sorted(parser.value()), ['fluency', 'lexical'])
+
+
+class TestStreamedEvaluation(unittest.TestCase):
+    def stream(self, chat, cache=None):
+        engine = ScoringEngine(client=chat, requests_per_minute=100_000, cache=cache,
+                               output_metrics=StructuredOutputMetrics())
+        delivered_at_event = []
+
+        async def collect():
+            events = []
+            async for criterion, details in engine.stream_evaluation("I like to cook.", 5.0):
+                delivered_at_event.append(getattr(chat, 'delivered', None))
+                events.append((criterion, details))
+            return events
+
+        return asyncio.run(collect()), delivered_at_event
+
+    def test_criteria_arrive_before_the_stream_ends(self):
+        chat = CountingStreamClient()
+        events, delivered_at_event = self.stream(chat)
+
+        self.assertEqual([criterion for criterion, _ in events],
+                         ['fluency', 'lexical', 'grammar', 'pronunciation', 'overall'])
+        self.assertLess(delivered_at_event[0], chat.delivered)
+        overall = events[-1][1]
+        self.assertEqual(overall['scores']['grammar'], events[2][1]['score'])
+        self.assertIn('overall_score', overall)
+
+    def test_interrupted_stream_falls_back_to_a_regular_request(self):
+        chat = CountingStreamClient(cut_after=6)
+        events, _ = self.stream(chat)
+
+        self.assertEqual(chat.calls, 2)
+        self.assertEqual([criterion for criterion, _ in events][-1], 'overall')
+        self.assertEqual(sorted(set(criterion for criterion, _ in events[:-1])),
+                         ['fluency', 'grammar', 'lexical', 'pronunciation'])
+
+    def test_fallback_replaces_every_streamed_criterion(self):
+        chat = CountingStreamClient(cut_after=6)
+        events, _ = self.stream(chat)
+
+        # At least one criterion streamed before the cut, then all four again
+        self.assertGreater(len(events), 5)
+        # What a display keyed by criterion ends up showing
+        shown = dict(events[:-1])
+        overall = events[-1][1]
+        self.assertEqual(shown, overall['feedback'])
+        self.assertEqual([criterion for criterion, _ in events[-5:-1]],
+                         ['fluency', 'lexical', 'grammar', 'pronunciation'])
+
+    def test_streamed_evaluation_is_cached(self):
+        cache = EvaluationCache()
+        chat = CountingStreamClient()
+        self.stream(chat, cache)
+        events, _ = self.stream(chat, cache)
+
+        self.assertEqual(chat.calls, 1)
+        self.assertEqual(len(events), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+from modules.vad import TimingMap, VoiceActivityDetector
+
+from .audio_fixtures import make_audio, silence, tone
+
+
+class TestVoiceActivityDetector(unittest.TestCase):
+    def setUp(self):
+        self.vad = VoiceActivityDetector(padding_ms=100, max_gap_ms=600)
+
+    def test_trims_leading_and_trailing_silence(self):
+        audio = make_audio(silence(2.0), tone(1.0), silence(3.0))
+        trimmed, timing = self.vad.trim(audio)
+
+        self.assertAlmostEqual(trimmed.duration, 1.2, delta=0.05)
+        self.assertAlmostEqual(timing.original_duration, 6.0)
+        self.assertAlmostEqual(timing.to_original(0.0), 1.9, delta=0.05)
+
+    def test_collapses_long_internal_gaps(self):
+        audio = make_audio(silence(1.0), tone(1.0), silence(4.0), tone(1.0), silence(1.0))
+        trimmed, timing = self.vad.trim(audio)
+
+        self.assertEqual(len(timing.segments), 2)
+        # Two padded tones plus a pause shortened to max_gap_ms
+        self.assertAlmostEqual(trimmed.duration, 1.2 + 0.6 + 1.2, delta=0.05)
+        self.assertAlmostEqual(timing.trimmed_duration, trimmed.duration)
+        # The second tone still maps back to where it started in the original
+        second_start = timing.segments[1][1] + 0.4
+        self.assertAlmostEqual(timing.to_original(second_start), 6.0, delta=0.05)
+
+    def test_short_pauses_are_kept(self):
+        audio = make_audio(tone(1.0), silence(0.3), tone(1.0))
+        trimmed, timing = self.vad.trim(audio)
+
+        self.assertEqual(len(timing.segments), 1)
+        self.assertAlmostEqual(trimmed.duration, audio.duration, delta=0.05)
+
+    def test_silence_only_is_returned_unchanged(self):
+        audio = make_audio(silence(2.0))
+        trimmed, timing = self.vad.trim(audio)
+
+        self.assertIs(trimmed, audio)
+        self.assertEqual(timing, TimingMap.identity(audio.duration))
+
+    def test_identity_map(self):
+        timing = TimingMap.identity(5.0)
+        self.assertEqual(timing.to_original(2.5), 2.5)
+        self.assertEqual(timing.removed_duration, 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()